@@ -0,0 +1,36 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+# Users change rarely between requests; saves and point awards invalidate the entry
+USER_CACHE_TIMEOUT = 5 * 60
+
+
+def _user_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_cached_user(*user_ids):
+    cache.delete_many([_user_key(pk) for pk in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that serves request.user from cache instead of a query per request
+
+    Only with a cache shared by all workers: invalidating a per-process
+    cache would leave the other workers serving a stale password hash,
+    is_active or total_points, so with one it behaves as ModelBackend.
+    """
+
+    def get_user(self, user_id):
+        if isinstance(caches['default'], LocMemCache):
+            return super().get_user(user_id)
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
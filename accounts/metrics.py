@@ -0,0 +1,3 @@
+from eduvolve.metrics import Counter
+
+POINTS_AWARDED = Counter('eduvolve_points_awarded', 'Gamification points awarded to students')
@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinValueValidator
 
+from .metrics import POINTS_AWARDED
+
 class User(AbstractUser):
     """Extended User model with role-based access"""
     
@@ -35,6 +37,10 @@ class User(AbstractUser):
     
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            # Leaderboard and a student's rank
+            models.Index(fields=['role', '-total_points'], name='user_leaderboard_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -74,12 +80,22 @@ class User(AbstractUser):
             self.longest_streak = 1
         
         self.last_activity_date = today
-        self.save()
+        # A copy of the user loaded earlier may hold a stale total_points
+        self.save(update_fields=['current_streak', 'longest_streak', 'last_activity_date'])
     
     def add_points(self, points):
         """Add points to user's total"""
+        # Increment in the database so concurrent awards are not lost
+        User.objects.filter(pk=self.pk).update(
+            total_points=models.F('total_points') + points
+        )
         self.total_points += points
-        self.save()
+        if points > 0:
+            POINTS_AWARDED.inc(points)
+        
+        # update() sends no post_save
+        from .backends import invalidate_cached_user
+        invalidate_cached_user(self.pk)
 
 
 class Badge(models.Model):
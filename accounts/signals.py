@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+
+from .backends import invalidate_cached_user
+from .models import User
+
+
+def user_changed(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+for signal in (post_save, post_delete):
+    signal.connect(user_changed, sender=User)
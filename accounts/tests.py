@@ -1,3 +1,123 @@
-from django.test import TestCase
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from courses.benchmarks import load_baseline, run_benchmarks
+from eduvolve.testing import QueryPlanTestCase
+from .backends import CachedModelBackend
+from .models import User
+
+
+class LeaderboardBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_scale', students=30, courses=4, lessons=3, stdout=StringIO())
+
+    def test_query_count_does_not_grow_with_students(self):
+        result = run_benchmarks(iterations=2, names=['leaderboard'])['leaderboard']
+        self.assertLessEqual(result['queries'], load_baseline()['leaderboard']['queries'])
+
+
+class LeaderboardIndexTests(QueryPlanTestCase):
+    def test_top_students(self):
+        self.assertUsesIndex(
+            User.objects.filter(role=User.Role.STUDENT).order_by('-total_points')[:50],
+            'user_leaderboard_idx', ordered=True)
+
+    def test_rank_count(self):
+        self.assertUsesIndex(
+            User.objects.filter(role=User.Role.STUDENT, total_points__gt=100).order_by(), 'user_leaderboard_idx')
+
+
+class CachedUserTests(TestCase):
+    """With a cache shared by all workers, such as a file-based one"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.cache_dir.cleanup)
+        cls.enterClassContext(override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cls.cache_dir.name,
+            }},
+        ))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='student', role=User.Role.STUDENT)
+
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+
+    def test_user_is_read_once(self):
+        self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_save_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Ada'
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Ada')
+
+    def test_add_points_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        self.user.add_points(10)
+        self.assertEqual(self.backend.get_user(self.user.pk).total_points, 10)
+
+    def test_inactive_user_is_rejected(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_deleted_user(self):
+        self.backend.get_user(self.user.pk)
+        pk = self.user.pk
+        User.objects.get(pk=pk).delete()
+        self.assertIsNone(self.backend.get_user(pk))
+
+    def test_requests_do_not_query_sessions_or_users(self):
+        self.client.force_login(self.user)
+        url = reverse('accounts:profile')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        sql = ' '.join(query['sql'] for query in captured)
+        self.assertNotIn('"django_session"', sql)
+        self.assertNotIn('FROM "accounts_user"', sql)
+
+    def test_streak_update_keeps_points_awarded_since(self):
+        user = self.backend.get_user(self.user.pk)
+        self.user.add_points(10)
+        user.update_streak()
+        self.assertEqual(User.objects.get(pk=self.user.pk).total_points, 10)
+
+
+class LocalCacheUserTests(TestCase):
+    def test_per_process_cache_is_not_used(self):
+        user = User.objects.create(username='student', role=User.Role.STUDENT)
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.get_user(user.pk), user)
+
+
+class NavbarCacheTests(TestCase):
+    def test_renamed_user_sees_the_new_name(self):
+        user = User.objects.create(username='student', role=User.Role.STUDENT)
+        self.client.force_login(user)
+        url = reverse('accounts:profile')
+        self.client.get(url)
+        self.client.post(reverse('accounts:edit_profile'), {
+            'username': 'renamed', 'email': 'renamed@example.com', 'first_name': '', 'last_name': ''})
+        self.assertContains(self.client.get(url), '<i class="bi bi-person-circle"></i> renamed')
@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.generic import CreateView, UpdateView
 from django.urls import reverse_lazy
+from eduvolve.replicas import read_from_replica
 from .forms import UserRegistrationForm, UserUpdateForm, ProfileUpdateForm
 from .models import User, Badge, UserBadge
 
@@ -108,6 +109,7 @@ def edit_profile(request):
 
 
 @login_required
+@read_from_replica()
 def leaderboard(request):
     """Display student leaderboard"""
     top_students = User.objects.filter(
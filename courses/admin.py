@@ -1,9 +1,46 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Count, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from .caching import bump_namespace
+from .dashboards import invalidate_instructor_summary
 from .models import (
     Course, Lesson, Quiz, Question, Answer,
     Assignment, Enrollment, LessonProgress,
-    QuizAttempt, AssignmentSubmission, Certificate
+    QuizAttempt, AssignmentSubmission, Certificate, SlowQuery
 )
+from .pagination import EstimatedCountPaginator
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    Admin for tables that grow with the number of students
+
+    The related rows shown by list_display are joined in every queryset
+    (autocomplete results render __str__ too), list_defer columns are left
+    out of the changelist, and page counts come from EstimatedCountPaginator.
+    """
+    list_select_related = ()
+    list_defer = ()
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).select_related(*self.list_select_related)
+        match = request.resolver_match
+        if self.list_defer and match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.defer(*self.list_defer)
+        return queryset
+
+
+def _invalidate_course_instructors(courses):
+    invalidate_instructor_summary(*courses.values_list('instructor_id', flat=True).distinct())
+
+
+def _courses_updated(courses):
+    """What the course_changed signal does; queryset.update() sends none"""
+    _invalidate_course_instructors(courses)
+    bump_namespace('catalog')
+
 
 class LessonInline(admin.TabularInline):
     model = Lesson
@@ -12,11 +49,26 @@ class LessonInline(admin.TabularInline):
 
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(ScalableModelAdmin):
     list_display = ['title', 'instructor', 'level', 'is_published', 'created_at']
     list_filter = ['level', 'is_published', 'created_at']
     search_fields = ['title', 'description', 'instructor__username']
+    list_select_related = ['instructor']
+    autocomplete_fields = ['instructor']
     inlines = [LessonInline]
+    actions = ['publish_courses', 'unpublish_courses']
+
+    @admin.action(description='Publish selected courses')
+    def publish_courses(self, request, queryset):
+        updated = queryset.update(is_published=True)
+        _courses_updated(queryset)
+        self.message_user(request, f'{updated} course(s) published.', messages.SUCCESS)
+
+    @admin.action(description='Unpublish selected courses')
+    def unpublish_courses(self, request, queryset):
+        updated = queryset.update(is_published=False)
+        _courses_updated(queryset)
+        self.message_user(request, f'{updated} course(s) unpublished.', messages.SUCCESS)
 
 
 class AnswerInline(admin.TabularInline):
@@ -28,58 +80,117 @@ class AnswerInline(admin.TabularInline):
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ['question_text', 'quiz', 'question_type', 'points', 'order']
     list_filter = ['question_type', 'quiz']
+    list_select_related = ['quiz']
     inlines = [AnswerInline]
 
 
 @admin.register(Quiz)
-class QuizAdmin(admin.ModelAdmin):
+class QuizAdmin(ScalableModelAdmin):
     list_display = ['title', 'lesson', 'passing_score', 'time_limit_minutes']
     list_filter = ['passing_score']
     search_fields = ['title', 'lesson__title']
+    list_select_related = ['lesson__course']
+    autocomplete_fields = ['lesson']
 
 
 @admin.register(Lesson)
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(ScalableModelAdmin):
     list_display = ['title', 'course', 'order', 'duration_minutes', 'is_published']
     list_filter = ['is_published', 'course']
     search_fields = ['title', 'course__title']
+    list_select_related = ['course']
+    autocomplete_fields = ['course']
 
 
 @admin.register(Assignment)
-class AssignmentAdmin(admin.ModelAdmin):
+class AssignmentAdmin(ScalableModelAdmin):
     list_display = ['title', 'lesson', 'due_date', 'max_points']
     list_filter = ['due_date']
     search_fields = ['title', 'lesson__title']
+    list_select_related = ['lesson__course']
+    autocomplete_fields = ['lesson']
 
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(ScalableModelAdmin):
     list_display = ['student', 'course', 'progress', 'enrolled_at', 'is_active']
     list_filter = ['is_active', 'enrolled_at']
     search_fields = ['student__username', 'course__title']
+    list_select_related = ['student', 'course']
+    autocomplete_fields = ['student', 'course']
+    date_hierarchy = 'enrolled_at'
+    actions = ['recompute_progress']
+
+    @admin.action(description='Recompute progress of selected enrollments')
+    def recompute_progress(self, request, queryset):
+        """Same formula as Enrollment.update_progress, in a single UPDATE"""
+        completed = LessonProgress.objects.filter(
+            enrollment=OuterRef('pk'), is_completed=True
+        ).order_by().values('enrollment').annotate(count=Count('id')).values('count')
+        total = Lesson.objects.filter(
+            course=OuterRef('course')
+        ).order_by().values('course').annotate(count=Count('id')).values('count')
+
+        updated = queryset.update(progress=Coalesce(
+            Round(
+                Cast(Subquery(completed), FloatField()) * 100
+                / NullIf(Subquery(total), 0),
+                2,
+            ),
+            Value(0.0),
+        ))
+        _invalidate_course_instructors(Course.objects.filter(enrollments__in=queryset))
+        self.message_user(request, f'Progress recomputed for {updated} enrollment(s).', messages.SUCCESS)
 
 
 @admin.register(LessonProgress)
-class LessonProgressAdmin(admin.ModelAdmin):
+class LessonProgressAdmin(ScalableModelAdmin):
     list_display = ['enrollment', 'lesson', 'is_completed', 'completed_at']
     list_filter = ['is_completed', 'completed_at']
+    list_select_related = ['enrollment__student', 'enrollment__course', 'lesson__course']
+    autocomplete_fields = ['enrollment', 'lesson']
+    date_hierarchy = 'completed_at'
 
 
 @admin.register(QuizAttempt)
-class QuizAttemptAdmin(admin.ModelAdmin):
+class QuizAttemptAdmin(ScalableModelAdmin):
     list_display = ['student', 'quiz', 'score', 'is_passed', 'submitted_at']
     list_filter = ['is_passed', 'submitted_at']
     search_fields = ['student__username', 'quiz__title']
+    list_select_related = ['student', 'quiz']
+    autocomplete_fields = ['student', 'quiz']
+    date_hierarchy = 'submitted_at'
 
 
 @admin.register(AssignmentSubmission)
-class AssignmentSubmissionAdmin(admin.ModelAdmin):
+class AssignmentSubmissionAdmin(ScalableModelAdmin):
     list_display = ['student', 'assignment', 'status', 'grade', 'submitted_at']
     list_filter = ['status', 'submitted_at']
     search_fields = ['student__username', 'assignment__title']
+    list_select_related = ['student', 'assignment__lesson__course']
+    list_defer = ['submission_text', 'feedback']
+    autocomplete_fields = ['student', 'assignment', 'graded_by']
+    date_hierarchy = 'submitted_at'
 
 
 @admin.register(Certificate)
-class CertificateAdmin(admin.ModelAdmin):
+class CertificateAdmin(ScalableModelAdmin):
     list_display = ['certificate_id', 'enrollment', 'issued_at']
-    search_fields = ['certificate_id', 'enrollment__student__username']
\ No newline at end of file
+    search_fields = ['certificate_id', 'enrollment__student__username']
+    list_select_related = ['enrollment__student', 'enrollment__course']
+    autocomplete_fields = ['enrollment']
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['recorded_at', 'duration_ms', 'view', 'call_site', 'database']
+    list_filter = ['database', 'view']
+    search_fields = ['sql', 'call_site']
+    readonly_fields = ['sql', 'params', 'plan', 'duration_ms', 'database', 'view', 'call_site', 'recorded_at']
+    fields = readonly_fields
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,141 @@
+import statistics
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from eduvolve.replicas import read_from_primary
+from .models import CourseStats, Enrollment, LessonProgress
+
+# Progress histogram: ten 10% buckets, 100% counted in the last one
+PROGRESS_BUCKETS = 10
+
+# Upper bounds (days) of the time-to-complete buckets; the last is open-ended
+COMPLETION_DAY_BOUNDS = (7, 14, 30, 60, 90)
+
+# Stats are recomputed nightly, so a day in cache is never staler than the table
+COURSE_STATS_TIMEOUT = 24 * 60 * 60
+
+
+def _course_stats_key(course_id):
+    return f'course_stats:{course_id}'
+
+
+def progress_histogram(progress_values):
+    """Number of students in each 10% progress bucket"""
+    buckets = Counter(
+        min(int(progress // (100 / PROGRESS_BUCKETS)), PROGRESS_BUCKETS - 1)
+        for progress in progress_values
+    )
+    step = 100 // PROGRESS_BUCKETS
+    return [
+        {'label': f'{index * step}-{(index + 1) * step}%', 'count': buckets[index]}
+        for index in range(PROGRESS_BUCKETS)
+    ]
+
+
+def lesson_funnel(lessons, completions, total):
+    """Students completing each lesson in course order, with drop-off from the previous lesson"""
+    funnel = []
+    previous = total
+    for lesson_id, title in lessons:
+        completed = completions.get(lesson_id, 0)
+        funnel.append({
+            'lesson': title,
+            'completed': completed,
+            'percent': round(completed * 100 / total, 1) if total else 0,
+            'drop_off': max(previous - completed, 0),
+        })
+        previous = completed
+    return funnel
+
+
+def completion_distribution(durations):
+    """Time-to-complete buckets and percentiles from durations in days"""
+    labels = []
+    lower = 0
+    for bound in COMPLETION_DAY_BOUNDS:
+        labels.append(f'{lower}-{bound} days')
+        lower = bound + 1
+    labels.append(f'{COMPLETION_DAY_BOUNDS[-1]}+ days')
+
+    buckets = Counter()
+    for days in durations:
+        index = next(
+            (i for i, bound in enumerate(COMPLETION_DAY_BOUNDS) if days <= bound),
+            len(COMPLETION_DAY_BOUNDS),
+        )
+        buckets[index] += 1
+
+    summary = {
+        'buckets': [{'label': label, 'count': buckets[index]} for index, label in enumerate(labels)],
+        'median_days': None,
+        'p90_days': None,
+    }
+    if durations:
+        summary['median_days'] = round(statistics.median(durations), 1)
+        summary['p90_days'] = round(
+            statistics.quantiles(durations, n=10, method='inclusive')[-1] if len(durations) > 1
+            else durations[0], 1
+        )
+    return summary
+
+
+def compute_course_stats(course):
+    """
+    Cohort analytics of a course's active enrollments
+
+    Reads flat rows with values_list() and lets the database group the
+    lesson completions, so the cost is two scans regardless of how the
+    cohort is spread over lessons.
+    """
+    rows = list(
+        Enrollment.objects.filter(course=course, is_active=True)
+        .order_by()
+        .values_list('progress', 'enrolled_at', 'completed_at')
+    )
+    completions = dict(
+        LessonProgress.objects.filter(
+            enrollment__course=course, enrollment__is_active=True, is_completed=True
+        ).order_by().values('lesson').annotate(count=Count('id')).values_list('lesson', 'count')
+    )
+    lessons = course.lessons.order_by('order').values_list('id', 'title')
+
+    durations = [
+        (completed_at - enrolled_at).total_seconds() / 86400
+        for _, enrolled_at, completed_at in rows
+        if completed_at
+    ]
+    return {
+        'students': len(rows),
+        'completed': len(durations),
+        'average_progress': round(statistics.fmean(row[0] for row in rows), 1) if rows else 0,
+        'progress_histogram': progress_histogram(row[0] for row in rows),
+        'funnel': lesson_funnel(lessons, completions, len(rows)),
+        'time_to_complete': completion_distribution(durations),
+    }
+
+
+def refresh_course_stats(course):
+    """Recompute a course's stats from the primary and store them in the table and the cache"""
+    with read_from_primary():
+        data = compute_course_stats(course)
+    stats, _ = CourseStats.objects.update_or_create(
+        course=course, defaults={'data': data, 'computed_at': timezone.now()},
+    )
+    cache.set(_course_stats_key(course.pk), stats, COURSE_STATS_TIMEOUT)
+    return stats
+
+
+def course_stats(course):
+    """Stats of a course from cache, then the table, computing them on first use"""
+    key = _course_stats_key(course.pk)
+    stats = cache.get(key)
+    if stats is None:
+        with read_from_primary():
+            stats = CourseStats.objects.filter(course=course).first()
+        if stats is None:
+            return refresh_course_stats(course)
+        cache.set(key, stats, COURSE_STATS_TIMEOUT)
+    return stats
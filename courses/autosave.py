@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import QuizSession
+
+# Extra seconds accepted after the time limit to absorb network latency
+GRACE_SECONDS = 30
+
+
+def _answer_key(session, question_id):
+    return f'quiz_autosave:{session.pk}:{question_id}'
+
+
+def _timeout(quiz):
+    """Keep the buffer a little longer than the quiz itself can run"""
+    return quiz.time_limit_minutes * 60 + GRACE_SECONDS + 300
+
+
+def start_session(student, quiz):
+    """
+    Return the student's session of the quiz, started on first access
+
+    The start time lives in the database, so reloading the page after the
+    buffer expired, was evicted or sits on another worker's cache never
+    restarts the timer.
+    """
+    session, _ = QuizSession.objects.get_or_create(student=student, quiz=quiz)
+    return session
+
+
+def get_session(student, quiz):
+    return QuizSession.objects.filter(student=student, quiz=quiz).first()
+
+
+def _elapsed(session):
+    return (timezone.now() - session.started_at).total_seconds()
+
+
+def seconds_remaining(quiz, session):
+    """Seconds left before the server-side time limit is reached"""
+    return max(0, int(quiz.time_limit_minutes * 60 - _elapsed(session)))
+
+
+def is_expired(quiz, session):
+    return _elapsed(session) > quiz.time_limit_minutes * 60 + GRACE_SECONDS
+
+
+def saved_answers(session, questions):
+    """Buffered answers of the session as {question_id: answer_id}"""
+    keys = {_answer_key(session, question.id): question.id for question in questions}
+    return {keys[key]: answer_id for key, answer_id in cache.get_many(keys).items()}
+
+
+def save_answers(quiz, session, answers):
+    """
+    Buffer partial answers ({question_id: answer_id})
+
+    Every answer has its own cache key, so concurrent autosaves of different
+    questions never overwrite each other with a stale copy of the buffer.
+    """
+    cache.set_many({_answer_key(session, question_id): answer_id
+                    for question_id, answer_id in answers.items()}, _timeout(quiz))
+
+
+def clear_session(session, questions):
+    cache.delete_many([_answer_key(session, question.id) for question in questions])
+    session.delete()
+
+
+def parse_answers(data, questions):
+    """Extract question_<id> fields that refer to a valid answer of that question"""
+    answers = {}
+    for question in questions:
+        answer_id = data.get(f'question_{question.id}')
+        if not answer_id:
+            continue
+        try:
+            answer_id = int(answer_id)
+        except (TypeError, ValueError):
+            continue
+        if any(answer.id == answer_id for answer in question.answers.all()):
+            answers[question.id] = answer_id
+    return answers
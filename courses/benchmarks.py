@@ -0,0 +1,174 @@
+"""
+Latency and query-count benchmarks of the hot views
+
+Each scenario requests one view through the test client as a user found
+in the current database (seed one with seed_scale). Requests use a
+private in-memory cache that is cleared before every one, so the numbers
+are those of a cold cache, the query counts do not depend on what ran
+before, and a shared cache such as Redis is never flushed. Every request
+runs in a transaction that is rolled back, so points awarded and quiz
+sessions started do not change the data later iterations and runs
+measure; savepoints that adds are not counted as queries.
+run_benchmarks() returns per-scenario query counts and p50/p95 latencies;
+regressions() compares them with a stored baseline: any extra query is a
+regression, latency only when p95 exceeds the baseline by
+LATENCY_TOLERANCE. The stored baseline is measured on the
+seed_small_scale() data set the tests use.
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from .models import Enrollment, LessonProgress, Quiz
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'benchmark_baseline.json'
+
+# p95 may grow by this factor over the baseline before it counts as a regression
+LATENCY_TOLERANCE = 1.5
+
+
+class Scenario:
+    def __init__(self, name, role, url, method='get', setup=None):
+        self.name = name
+        self.role = role
+        self.url = url
+        self.method = method
+        self.setup = setup
+
+
+def scenarios():
+    """Scenarios for the users and content of the current database"""
+    admin = User.objects.filter(role=User.Role.ADMIN, is_active=True).order_by('pk').first()
+    enrollment = None
+    quiz = None
+    # A student with a quiz left to take in a published course
+    for candidate in Enrollment.objects.filter(
+        is_active=True, course__is_published=True
+    ).select_related('student', 'course').order_by('pk')[:50]:
+        quiz = Quiz.objects.filter(
+            lesson__course=candidate.course, lesson__is_published=True
+        ).exclude(attempts__student=candidate.student).select_related('lesson').first()
+        if quiz is not None:
+            enrollment = candidate
+            break
+    if enrollment is None:
+        return [], {}
+
+    course = enrollment.course
+    lesson = quiz.lesson
+    users = {'student': enrollment.student, 'instructor': course.instructor}
+    if admin is not None:
+        users['admin'] = admin
+
+    def reset_lesson():
+        LessonProgress.objects.filter(enrollment=enrollment, lesson=lesson).update(
+            is_completed=False, completed_at=None)
+
+    found = [
+        Scenario('course_list', 'student', reverse('courses:course_list')),
+        Scenario('course_detail', 'student', reverse('courses:course_detail', args=[course.pk])),
+        Scenario('lesson_view', 'student', reverse('courses:lesson_view', args=[lesson.pk])),
+        Scenario('complete_lesson', 'student', reverse('courses:complete_lesson', args=[lesson.pk]),
+                 method='post', setup=reset_lesson),
+        Scenario('quiz_take', 'student', reverse('courses:quiz_take', args=[quiz.pk])),
+        Scenario('leaderboard', 'student', reverse('accounts:leaderboard')),
+        Scenario('student_dashboard', 'student', reverse('courses:dashboard')),
+        Scenario('instructor_dashboard', 'instructor', reverse('courses:dashboard')),
+    ]
+    if admin is not None:
+        found.append(Scenario('admin_dashboard', 'admin', reverse('courses:dashboard')))
+    return found, users
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+
+# Statements the rollback transaction adds around the views' atomic blocks
+_TRANSACTION_CONTROL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK', 'BEGIN', 'COMMIT')
+
+
+def _query_count(captured):
+    return sum(not query['sql'].startswith(_TRANSACTION_CONTROL) for query in captured)
+
+
+# Never clear the configured cache: it may be shared with running servers
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmarks',
+    },
+}
+
+
+# Profiling would add its own overhead to every measured request; the test
+# client's host must pass ALLOWED_HOSTS outside the test runner as well
+@override_settings(PROFILING_SAMPLE_RATE=0, CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=['testserver'])
+def run_benchmarks(iterations=20, names=None):
+    """{scenario: {'queries', 'p50_ms', 'p95_ms'}} measured on the default database"""
+    found, users = scenarios()
+    clients = {}
+    for role, user in users.items():
+        clients[role] = Client()
+        clients[role].force_login(user)
+
+    results = {}
+    for scenario in found:
+        if names and scenario.name not in names:
+            continue
+        client = clients[scenario.role]
+        timings = []
+        queries = 0
+        for _ in range(iterations):
+            with transaction.atomic():
+                if scenario.setup:
+                    scenario.setup()
+                cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = getattr(client, scenario.method)(scenario.url)
+                    timings.append((time.perf_counter() - start) * 1000)
+                transaction.set_rollback(True)
+            if response.status_code != 200:
+                raise AssertionError(f'{scenario.name}: {scenario.url} returned {response.status_code}')
+            queries = max(queries, _query_count(captured))
+        results[scenario.name] = {
+            'queries': queries,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(_percentile(timings, 95), 2),
+        }
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(results, baseline, latency_tolerance=LATENCY_TOLERANCE):
+    """Messages for every scenario doing worse than its baseline"""
+    found = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['queries'] > expected['queries']:
+            found.append(f"{name}: {result['queries']} queries (baseline {expected['queries']})")
+        if latency_tolerance and result['p95_ms'] > expected['p95_ms'] * latency_tolerance:
+            found.append(f"{name}: p95 {result['p95_ms']} ms (baseline {expected['p95_ms']} ms)")
+    return found
@@ -0,0 +1,133 @@
+import math
+import random
+import time
+from functools import wraps
+
+from django.contrib import messages
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+
+from eduvolve.replicas import read_from_primary
+
+# Seconds the recompute lock of a hot key is held at most
+LOCK_TIMEOUT = 30
+
+# How long a cold miss waits for another worker already computing the value
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.05
+
+
+def namespace_version(namespace):
+    """
+    Current version of a group of cache keys
+
+    Keys built with the version are all invalidated at once by
+    bump_namespace(). A fresh version starts at the current time so an
+    evicted counter never resurrects entries of an old version.
+    """
+    return cache.get_or_set(f'ns:{namespace}', time.time_ns, None)
+
+
+def bump_namespace(namespace):
+    key = f'ns:{namespace}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_or_compute(key, compute, timeout, beta=1.0):
+    """
+    cache.get_or_set() for hot keys, with stampede protection
+
+    Entries are refreshed early with a probability that grows as they
+    near expiry, scaled by how long compute took (XFetch), and only the
+    worker that wins a lock recomputes while the others keep serving the
+    current value. On a cold miss the losers wait briefly for the winner.
+    """
+    entry = cache.get(key)
+    lock_key = f'lock:{key}'
+    if entry is not None:
+        value, delta, expires = entry
+        if time.time() - delta * beta * math.log(random.random() or 1e-12) < expires:
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return value
+    elif not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+        # The winner is slow or gone; compute rather than fail
+
+    try:
+        return refresh_computed(key, compute, timeout)
+    finally:
+        cache.delete(lock_key)
+
+
+def refresh_computed(key, compute, timeout):
+    """Compute a get_or_compute() entry now, from the primary, and store it"""
+    start = time.time()
+    with read_from_primary():
+        value = compute()
+    delta = time.time() - start
+    cache.set(key, (value, delta, time.time() + timeout), timeout)
+    return value
+
+
+def role_segment(request):
+    user = request.user
+    return f'role:{user.role}' if user.is_authenticated else 'anonymous'
+
+
+def user_segment(request):
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    # base.html shows the username, streak and points of the user
+    return f'user:{user.pk}:{user.current_streak}:{user.total_points}'
+
+
+SEGMENTS = {
+    'role': role_segment,
+    'user': user_segment,
+}
+
+
+def cache_per_segment(timeout, segment='role', namespaces=()):
+    """
+    Cache GET responses of a view per role or per user
+
+    The key is the full path plus the segment and the current version of
+    each namespace, so bump_namespace() drops every cached page built
+    from it. Requests with pending flash messages skip the cache,
+    role-wide pages are only stored when they contain no CSRF token, and
+    pages that may be stored are rendered from the primary.
+    """
+    segment_key = SEGMENTS[segment]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                return view(request, *args, **kwargs)
+
+            versions = ':'.join(str(namespace_version(namespace)) for namespace in namespaces)
+            key = f'view:{view.__module__}.{view.__name__}:{segment_key(request)}:{versions}:{request.get_full_path()}'
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            with read_from_primary():
+                response = view(request, *args, **kwargs)
+            shared = segment != 'user'
+            if (response.status_code == 200 and not response.streaming and not response.cookies
+                    and not (shared and request.META.get('CSRF_COOKIE_NEEDS_UPDATE'))):
+                patch_cache_control(response, private=True)
+                cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.models import User
+from .caching import get_or_compute, refresh_computed
+from .models import AssignmentSubmission, Course, Enrollment, PlatformSnapshot
+
+# Safety net in case an invalidation is missed (e.g. queryset.update())
+INSTRUCTOR_SUMMARY_TIMEOUT = 10 * 60
+
+# Platform counts may lag this far behind; each refresh also updates today's snapshot
+PLATFORM_STATS_KEY = 'platform_stats'
+PLATFORM_STATS_TIMEOUT = 5 * 60
+
+# Days of history shown on the admin dashboard
+TREND_DAYS = 30
+
+
+def _instructor_summary_key(instructor_id):
+    return f'instructor_summary:{instructor_id}'
+
+
+def instructor_courses(instructor):
+    """Courses of an instructor annotated with their dashboard figures in one query"""
+    pending = AssignmentSubmission.objects.filter(
+        assignment__lesson__course=OuterRef('pk'),
+        status=AssignmentSubmission.Status.PENDING,
+    ).order_by().values('assignment__lesson__course').annotate(
+        count=Count('id')
+    ).values('count')
+
+    return Course.objects.filter(instructor=instructor).annotate(
+        enrolled_count=Count('enrollments', filter=Q(enrollments__is_active=True)),
+        average_progress=Avg('enrollments__progress', filter=Q(enrollments__is_active=True)),
+        pending_count=Coalesce(Subquery(pending, output_field=IntegerField()), Value(0)),
+    )
+
+
+def instructor_summary(instructor):
+    """Cached courses and totals for the instructor dashboard"""
+    def compute():
+        courses = list(instructor_courses(instructor))
+        return {
+            'my_courses': courses,
+            'total_students': sum(course.enrolled_count for course in courses),
+            'pending_submissions': sum(course.pending_count for course in courses),
+        }
+
+    return get_or_compute(_instructor_summary_key(instructor.pk), compute, INSTRUCTOR_SUMMARY_TIMEOUT)
+
+
+def invalidate_instructor_summary(*instructor_ids):
+    cache.delete_many([_instructor_summary_key(pk) for pk in instructor_ids if pk])
+
+
+def _single_row(queryset):
+    """Aggregate queryset into one row even when the table is empty (grouped by a constant)"""
+    return queryset.order_by().annotate(one=Value(1)).values('one')
+
+
+def _count(queryset):
+    """Scalar subquery counting the rows of queryset"""
+    return Subquery(
+        _single_row(queryset).annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField(),
+    )
+
+
+def compute_platform_stats():
+    """
+    Platform-wide counts in a single query
+
+    Users are counted with conditional aggregates and the other tables with
+    scalar subqueries in the same SELECT, so the snapshot is one round trip
+    and every count is read from the same database snapshot.
+    """
+    today = timezone.localdate()
+    counts = {
+        'total_users': Count('id'),
+        'students': Count('id', filter=Q(role=User.Role.STUDENT)),
+        'instructors': Count('id', filter=Q(role=User.Role.INSTRUCTOR)),
+        'admins': Count('id', filter=Q(role=User.Role.ADMIN)),
+        'active_students': Count('id', filter=Q(role=User.Role.STUDENT, last_activity_date=today)),
+        'courses': _count(Course.objects.all()),
+        'published_courses': _count(Course.objects.filter(is_published=True)),
+        'enrollments': _count(Enrollment.objects.all()),
+        'completions': _count(Enrollment.objects.filter(completed_at__isnull=False)),
+        'pending_submissions': _count(
+            AssignmentSubmission.objects.filter(status=AssignmentSubmission.Status.PENDING)
+        ),
+    }
+    return _single_row(User.objects.all()).annotate(**counts).values(*counts).get()
+
+
+def record_platform_stats():
+    """Recompute the platform counts and record them as today's snapshot"""
+    stats = compute_platform_stats()
+    PlatformSnapshot.objects.update_or_create(taken_on=timezone.localdate(), defaults=stats)
+    return stats
+
+
+def refresh_platform_stats():
+    """Record today's snapshot and replace the cached counts with it"""
+    return refresh_computed(PLATFORM_STATS_KEY, record_platform_stats, PLATFORM_STATS_TIMEOUT)
+
+
+def platform_stats():
+    """Cached platform counts for the admin dashboard"""
+    return get_or_compute(PLATFORM_STATS_KEY, record_platform_stats, PLATFORM_STATS_TIMEOUT)
+
+
+def platform_trend(days=TREND_DAYS):
+    """Daily snapshots of the last days, oldest first"""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return PlatformSnapshot.objects.filter(taken_on__gte=since).order_by('taken_on')
@@ -0,0 +1,147 @@
+import csv
+import io
+import os
+import zipfile
+
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .gradebook import gradebook_columns, gradebook_enrollments, gradebook_rows
+
+
+class _Echo:
+    """Pseudo-buffer for csv.writer that returns each line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+class _StreamBuffer:
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _submission_arcname(submission, used):
+    """Archive name for a submission: the student's username plus the file extension"""
+    extension = os.path.splitext(submission.submission_file.name)[1].lower()
+    base = get_valid_filename(submission.student.username) or f'student_{submission.student_id}'
+    arcname = f'{base}{extension}'
+    counter = 2
+    while arcname in used:
+        arcname = f'{base}_{counter}{extension}'
+        counter += 1
+    used.add(arcname)
+    return arcname
+
+
+def stream_submissions_zip(assignment, submissions):
+    """
+    Yield a ZIP archive of every submission file plus a manifest.csv
+
+    Files are copied chunk by chunk and each piece of the archive is
+    yielded as soon as it is written, so memory use does not grow with
+    the size of the assignment. Entries are stored uncompressed: most
+    submissions (PDF, ZIP, images) are already compressed.
+    """
+    buffer = _StreamBuffer()
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow([
+        'username', 'full_name', 'email', 'submitted_at', 'late',
+        'status', 'grade', 'file', 'notes',
+    ])
+    used = set()
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for submission in submissions:
+            student = submission.student
+            arcname = ''
+            try:
+                size = submission.submission_file.size
+            except (OSError, ValueError):
+                size = None
+
+            if size is not None:
+                arcname = _submission_arcname(submission, used)
+                info = zipfile.ZipInfo(
+                    f'submissions/{arcname}',
+                    date_time=timezone.localtime(submission.submitted_at).timetuple()[:6],
+                )
+                info.file_size = size
+                with submission.submission_file.open('rb') as source, archive.open(info, 'w') as destination:
+                    for chunk in source.chunks():
+                        destination.write(chunk)
+                        yield buffer.pop()
+                yield buffer.pop()
+
+            writer.writerow([
+                student.username,
+                student.get_full_name(),
+                student.email,
+                timezone.localtime(submission.submitted_at).isoformat(),
+                'yes' if submission.submitted_at > assignment.due_date else 'no',
+                submission.get_status_display(),
+                '' if submission.grade is None else submission.grade,
+                f'submissions/{arcname}' if arcname else 'missing',
+                submission.submission_text,
+            ])
+
+        archive.writestr('manifest.csv', manifest.getvalue())
+
+    yield buffer.pop()
+
+
+def stream_gradebook_csv(course, chunk_size=500):
+    """
+    Yield a course gradebook as CSV lines
+
+    Enrollments are read with iterator(chunk_size) and their scores are
+    fetched one chunk of students at a time, so exporting a 10k-student
+    course never holds more than one chunk in memory.
+    """
+    quizzes, assignments = gradebook_columns(course)
+    writer = csv.writer(_Echo())
+
+    yield writer.writerow(
+        ['username', 'first_name', 'last_name', 'email', 'progress']
+        + [f'Quiz: {quiz["title"]} (%)' for quiz in quizzes]
+        + [f'Assignment: {assignment["title"]} (%)' for assignment in assignments]
+    )
+
+    def write_rows(batch):
+        for row in gradebook_rows(course, batch, quizzes, assignments):
+            yield writer.writerow(
+                [
+                    row['student__username'], row['student__first_name'],
+                    row['student__last_name'], row['student__email'], row['progress'],
+                ]
+                + ['' if score is None else round(score, 2) for score in row['quiz_scores']]
+                + [
+                    '' if cell is None or cell['grade'] is None else cell['grade']
+                    for cell in row['assignment_grades']
+                ]
+            )
+
+    batch = []
+    enrollments = gradebook_enrollments(course).order_by('student__username', 'id')
+    for enrollment in enrollments.iterator(chunk_size=chunk_size):
+        batch.append(enrollment)
+        if len(batch) == chunk_size:
+            yield from write_rows(batch)
+            batch = []
+    if batch:
+        yield from write_rows(batch)
@@ -1,5 +1,5 @@
 from django import forms
-from django.forms import inlineformset_factory
+from django.forms import inlineformset_factory, modelformset_factory
 from .models import (
     Course, Lesson, Quiz, Question, Answer,
     Assignment, AssignmentSubmission
@@ -105,7 +105,8 @@ class AssignmentForm(forms.ModelForm):
     
     class Meta:
         model = Assignment
-        fields = ['title', 'description', 'due_date', 'max_points', 'attachment']
+        fields = ['title', 'description', 'due_date', 'max_points', 'attachment',
+                  'max_upload_mb', 'allowed_extensions']
         widgets = {
             'description': forms.Textarea(attrs={'rows': 4}),
             'due_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
@@ -128,10 +129,17 @@ class AssignmentSubmissionForm(forms.ModelForm):
             'submission_text': forms.Textarea(attrs={'rows': 5, 'placeholder': 'Additional notes or comments...'}),
         }
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, assignment=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.assignment = assignment
         self.fields['submission_text'].widget.attrs.update({'class': 'form-control'})
         self.fields['submission_text'].required = False
+    
+    def clean_submission_file(self):
+        submission_file = self.cleaned_data.get('submission_file')
+        if submission_file and self.assignment:
+            self.assignment.validate_upload(submission_file.name, submission_file.size)
+        return submission_file
 
 
 class AssignmentGradeForm(forms.ModelForm):
@@ -147,4 +155,22 @@ class AssignmentGradeForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         for field in self.fields:
-            self.fields[field].widget.attrs.update({'class': 'form-control'})
\ No newline at end of file
+            self.fields[field].widget.attrs.update({'class': 'form-control'})
+
+
+# Formset for grading many submissions at once
+AssignmentGradeFormSet = modelformset_factory(
+    AssignmentSubmission,
+    form=AssignmentGradeForm,
+    extra=0
+)
+
+
+class GradeUploadForm(forms.Form):
+    """Form for uploading a CSV grade sheet"""
+    
+    csv_file = forms.FileField(label='CSV file')
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['csv_file'].widget.attrs.update({'class': 'form-control', 'accept': '.csv'})
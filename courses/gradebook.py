@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from .models import AssignmentSubmission, Enrollment, Quiz, QuizAttempt, Assignment
+
+# Columns fetched for each student row
+STUDENT_FIELDS = [
+    'id', 'student_id', 'student__username', 'student__first_name',
+    'student__last_name', 'student__email', 'progress',
+]
+
+
+def gradebook_columns(course):
+    """Quizzes and assignments of a course in lesson order"""
+    quizzes = list(
+        Quiz.objects.filter(lesson__course=course)
+        .order_by('lesson__order', 'id')
+        .values('id', 'title')
+    )
+    assignments = list(
+        Assignment.objects.filter(lesson__course=course)
+        .order_by('lesson__order', 'due_date', 'id')
+        .values('id', 'title', 'max_points')
+    )
+    return quizzes, assignments
+
+
+def gradebook_enrollments(course):
+    return Enrollment.objects.filter(course=course, is_active=True).values(*STUDENT_FIELDS)
+
+
+def gradebook_rows(course, enrollments, quizzes, assignments):
+    """
+    Pivot quiz attempts and submissions of some enrollments into rows
+
+    Runs two queries whatever the number of students or columns. Each row
+    holds the enrollment values plus 'quiz_scores' and 'assignment_grades'
+    lists aligned with the columns (None where nothing was submitted).
+    """
+    student_ids = [enrollment['student_id'] for enrollment in enrollments]
+
+    quiz_scores = defaultdict(dict)
+    for student_id, quiz_id, score in QuizAttempt.objects.filter(
+        quiz__lesson__course=course, student_id__in=student_ids
+    ).order_by().values_list('student_id', 'quiz_id', 'score'):
+        quiz_scores[student_id][quiz_id] = score
+
+    submissions = defaultdict(dict)
+    for student_id, assignment_id, grade, status in AssignmentSubmission.objects.filter(
+        assignment__lesson__course=course, student_id__in=student_ids
+    ).order_by().values_list('student_id', 'assignment_id', 'grade', 'status'):
+        submissions[student_id][assignment_id] = {'grade': grade, 'status': status}
+
+    rows = []
+    for enrollment in enrollments:
+        student_id = enrollment['student_id']
+        rows.append({
+            **enrollment,
+            'quiz_scores': [quiz_scores[student_id].get(quiz['id']) for quiz in quizzes],
+            'assignment_grades': [
+                submissions[student_id].get(assignment['id']) for assignment in assignments
+            ],
+        })
+    return rows
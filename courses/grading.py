@@ -0,0 +1,151 @@
+import csv
+import io
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from accounts.backends import invalidate_cached_user
+from accounts.metrics import POINTS_AWARDED
+from accounts.models import User
+from .dashboards import invalidate_instructor_summary
+from .forms import AssignmentGradeForm
+from .metrics import SUBMISSIONS_GRADED, record_grading_turnaround
+from .models import AssignmentSubmission
+
+GRADE_FIELDS = ['grade', 'feedback', 'status', 'graded_by', 'graded_at']
+
+# Rows per bulk grading page; at 4 fields a row the POST stays well below
+# DATA_UPLOAD_MAX_NUMBER_FIELDS
+BULK_GRADING_PAGE_SIZE = 100
+
+
+def posted_pks(data, prefix='form'):
+    """Primary keys of the rows posted with a model formset"""
+    pattern = re.compile(rf'{re.escape(prefix)}-\d+-id')
+    return [value for key, value in data.items() if pattern.fullmatch(key) and value.isdigit()]
+
+
+def submission_points(submission):
+    """Points a graded submission is worth for its student"""
+    return int((submission.grade / 100) * submission.assignment.max_points)
+
+
+def award_points(points_by_student):
+    """Add points to several students with a single UPDATE"""
+    points_by_student = {pk: points for pk, points in points_by_student.items() if points}
+    if not points_by_student:
+        return
+
+    User.objects.filter(pk__in=points_by_student).update(
+        total_points=F('total_points') + Case(
+            *[When(pk=pk, then=Value(points)) for pk, points in points_by_student.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+    invalidate_cached_user(*points_by_student)
+    POINTS_AWARDED.inc(sum(points for points in points_by_student.values() if points > 0))
+
+
+def apply_grades(submissions, grader):
+    """
+    Save many graded submissions in one transaction
+
+    submissions already carry their new grade/feedback/status. Points are
+    only awarded for submissions that become GRADED here, judged from their
+    stored status under a row lock, so re-applying the same grades or two
+    concurrent imports do not pay students twice.
+    """
+    now = timezone.now()
+    points_by_student = defaultdict(int)
+    newly_graded = []
+
+    with transaction.atomic():
+        previous_status = dict(
+            AssignmentSubmission.objects.select_for_update().filter(
+                pk__in=[submission.pk for submission in submissions]
+            ).values_list('pk', 'status')
+        )
+        for submission in submissions:
+            submission.graded_by = grader
+            submission.graded_at = now
+            if (submission.status == AssignmentSubmission.Status.GRADED
+                    and previous_status.get(submission.pk) != AssignmentSubmission.Status.GRADED):
+                newly_graded.append(submission)
+                if submission.grade:
+                    points_by_student[submission.student_id] += submission_points(submission)
+
+        AssignmentSubmission.objects.bulk_update(submissions, GRADE_FIELDS, batch_size=500)
+        award_points(points_by_student)
+
+    # bulk_update() sends no signals
+    invalidate_instructor_summary(grader.pk)
+    SUBMISSIONS_GRADED.inc(len(newly_graded), mode='bulk')
+    record_grading_turnaround(newly_graded)
+
+
+def parse_grade_csv(assignment, csv_file):
+    """
+    Validate an uploaded grade sheet for an assignment
+
+    Expected columns: username, grade, and optionally feedback and status;
+    a submission keeps its feedback or status when the sheet has no such
+    column. Returns (submissions, errors) where errors is a list of
+    (line number, message); nothing should be applied while errors is
+    non-empty.
+    """
+    try:
+        content = csv_file.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return [], [(0, 'File is not valid UTF-8 text.')]
+
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames or not {'username', 'grade'} <= set(reader.fieldnames):
+        return [], [(1, 'Header must contain "username" and "grade" columns.')]
+
+    rows = list(reader)
+    usernames = {(row.get('username') or '').strip() for row in rows}
+    submissions_by_username = {
+        submission.student.username: submission
+        for submission in assignment.submissions.select_related('student', 'assignment').filter(
+            student__username__in=usernames
+        )
+    }
+
+    has_feedback = 'feedback' in reader.fieldnames
+    has_status = 'status' in reader.fieldnames
+
+    submissions = []
+    errors = []
+    seen = set()
+
+    # Line 1 is the header
+    for line, row in enumerate(rows, start=2):
+        username = (row.get('username') or '').strip()
+        submission = submissions_by_username.get(username)
+        if submission is None:
+            errors.append((line, f'No submission from "{username}".'))
+            continue
+        if username in seen:
+            errors.append((line, f'Duplicate row for "{username}".'))
+            continue
+        seen.add(username)
+
+        form = AssignmentGradeForm(
+            {
+                'grade': (row.get('grade') or '').strip(),
+                'feedback': (row.get('feedback') or '') if has_feedback else submission.feedback,
+                'status': (row.get('status') or '').strip().upper() if has_status else submission.status,
+            },
+            instance=submission,
+        )
+        if form.is_valid():
+            submissions.append(form.instance)
+        else:
+            for field, field_errors in form.errors.items():
+                errors.append((line, f'{field}: {" ".join(field_errors)}'))
+
+    return submissions, errors
@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, RequestFactory, override_settings
+
+from accounts.models import User
+
+# Without a cache every request reads its session, user and page from the
+# database, so each one needs a connection
+DUMMY_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Compares per-request reconnection (CONN_MAX_AGE=0) with persistent connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per run')
+        parser.add_argument('--path', default='/courses/', help='URL to request')
+        parser.add_argument(
+            '--username',
+            help='User the requests are made as (default: the first active user)',
+        )
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            default=600,
+            help='CONN_MAX_AGE used for the persistent run',
+        )
+
+    # Profiling would add its own overhead to every measured request
+    @override_settings(PROFILING_SAMPLE_RATE=0, CACHES=DUMMY_CACHES, ALLOWED_HOSTS=['localhost'])
+    def handle(self, *args, **options):
+        # Requests go through the full WSGI handler so request_started and
+        # request_finished close connections exactly as they do in production
+        user = User.objects.filter(is_active=True).order_by('pk')
+        if options['username']:
+            user = user.filter(username=options['username'])
+        user = user.first()
+        if user is None:
+            raise CommandError('No active user to make the requests as.')
+
+        client = Client()
+        client.force_login(user)
+        session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+        handler = WSGIHandler()
+        environ = RequestFactory().get(
+            options['path'],
+            HTTP_HOST='localhost',
+            HTTP_COOKIE=f'{settings.SESSION_COOKIE_NAME}={session_key}',
+        ).environ
+        connection = connections['default']
+        configured = connection.settings_dict['CONN_MAX_AGE']
+
+        self.stdout.write(
+            f"{connection.vendor}, {options['requests']} x GET {options['path']}"
+        )
+        try:
+            for label, max_age in (('per-request', 0), ('persistent', options['conn_max_age'])):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                opened, elapsed = self.run(handler, environ, options['requests'])
+                self.stdout.write(
+                    f'{label:>12} (CONN_MAX_AGE={max_age}): {opened} connection(s) opened, '
+                    f"{elapsed * 1000 / options['requests']:.2f} ms/request"
+                )
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = configured
+            client.logout()
+
+    def run(self, handler, environ, count):
+        opened = 0
+
+        def count_connection(sender, **kwargs):
+            nonlocal opened
+            opened += 1
+
+        connection_created.connect(count_connection)
+        try:
+            start = time.perf_counter()
+            for _ in range(count):
+                response = handler(dict(environ), lambda status, headers: None)
+                response.close()
+                if response.status_code != 200:
+                    raise CommandError(f'{environ["PATH_INFO"]} returned {response.status_code}')
+            elapsed = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(count_connection)
+        return opened, elapsed
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.benchmarks import (
+    BASELINE_PATH, LATENCY_TOLERANCE, load_baseline, regressions, run_benchmarks, save_baseline
+)
+
+
+class Command(BaseCommand):
+    help = 'Measures latency and query counts of the hot views and compares them with the stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Requests per view')
+        parser.add_argument('--view', action='append', dest='views', help='Only this scenario (repeatable)')
+        parser.add_argument('--baseline', default=str(BASELINE_PATH), help='Baseline JSON file')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=LATENCY_TOLERANCE,
+            help='Allowed p95 growth over the baseline as a factor (0 ignores latency)',
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(options['iterations'], options['views'])
+        if not results:
+            raise CommandError('No student with a quiz left to take; seed data with "manage.py seed_scale".')
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>22}: {result['queries']:3d} queries, "
+                f"p50 {result['p50_ms']:8.2f} ms, p95 {result['p95_ms']:8.2f} ms"
+            )
+
+        if options['save_baseline']:
+            save_baseline(results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Successfully saved the baseline to {options['baseline']}!"))
+            return
+
+        try:
+            baseline = load_baseline(options['baseline'])
+        except FileNotFoundError:
+            raise CommandError(f"No baseline at {options['baseline']}; run with --save-baseline first.")
+        found = regressions(results, baseline, options['tolerance'])
+        if found:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(found))
+        self.stdout.write(self.style.SUCCESS('Successfully matched the baseline!'))
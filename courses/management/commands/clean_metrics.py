@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from eduvolve.metrics import remove_dead_process_files
+
+
+class Command(BaseCommand):
+    help = 'Removes the metrics files of exited processes from METRICS_DIR'
+
+    def handle(self, *args, **options):
+        removed = remove_dead_process_files()
+        self.stdout.write(self.style.SUCCESS(f'Successfully removed {removed} metrics file(s)!'))
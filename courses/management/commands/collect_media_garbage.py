@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import StoredFile
+from courses.storage import BLOB_DIR, content_addressed_storage
+
+
+class Command(BaseCommand):
+    help = 'Deletes content-addressed files that are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=24,
+            help='Only delete files older than this, so uploads still being saved are kept',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List unreferenced files without deleting them',
+        )
+
+    def handle(self, *args, **options):
+        storage = content_addressed_storage
+        cutoff = time.time() - options['min_age_hours'] * 3600
+        # Cheap first pass; every candidate is checked again before it is deleted
+        referenced = set(
+            StoredFile.objects.filter(ref_count__gt=0).values_list('name', flat=True)
+        )
+
+        deleted = 0
+        freed = 0
+        if storage.exists(BLOB_DIR):
+            prefixes, _ = storage.listdir(BLOB_DIR)
+            for prefix in prefixes:
+                _, files = storage.listdir(f'{BLOB_DIR}/{prefix}')
+                for filename in files:
+                    name = f'{BLOB_DIR}/{prefix}/{filename}'
+                    if name in referenced:
+                        continue
+                    if options['dry_run']:
+                        size = self.unused_size(storage, name, cutoff)
+                        if size is not None:
+                            self.stdout.write(name)
+                    else:
+                        with transaction.atomic():
+                            size = self.unused_size(storage, name, cutoff, lock=True)
+                            if size is not None:
+                                storage.delete(name)
+                    if size is not None:
+                        deleted += 1
+                        freed += size
+
+        if not options['dry_run']:
+            StoredFile.objects.filter(ref_count__lte=0).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} unreferenced file(s), {freed / (1024 * 1024):.1f} MB.'
+        ))
+
+    @staticmethod
+    def unused_size(storage, name, cutoff, lock=False):
+        """
+        Size of a file that is unreferenced and old enough to delete, else None
+
+        The reference count is read again (and locked) right before deleting,
+        since it may have been referenced after the first pass, and so is the
+        modification time, which a deduplicated upload refreshes.
+        """
+        stored = StoredFile.objects.filter(name=name)
+        if lock:
+            stored = stored.select_for_update()
+        if stored.values_list('ref_count', flat=True).first():
+            return None
+        try:
+            if storage.get_modified_time(name).timestamp() > cutoff:
+                return None
+            return storage.size(name)
+        except FileNotFoundError:
+            return None
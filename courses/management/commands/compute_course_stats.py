@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from courses.analytics import refresh_course_stats
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the cohort analytics of every course (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=int,
+            help='Only recompute the stats of this course id',
+        )
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options['course']:
+            courses = courses.filter(pk=options['course'])
+
+        total = 0
+        for course in courses.iterator():
+            refresh_course_stats(course)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully computed stats for {total} course(s)!'))
@@ -0,0 +1,82 @@
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import StoredFile
+from courses.signals import STORED_FILE_FIELDS
+from courses.storage import BLOB_DIR, content_addressed_storage
+
+
+class Command(BaseCommand):
+    help = 'Moves uploaded files into content-addressed storage and rebuilds reference counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be migrated without changing anything',
+        )
+        parser.add_argument(
+            '--keep-originals',
+            action='store_true',
+            help='Leave the original files in place after migrating them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        migrated = {}
+        missing = 0
+
+        for model, fields in STORED_FILE_FIELDS.items():
+            for field in fields:
+                rows = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                for pk, name in rows.values_list('pk', field).iterator(chunk_size=500):
+                    if name.startswith(f'{BLOB_DIR}/'):
+                        continue
+                    if not default_storage.exists(name):
+                        missing += 1
+                        self.stderr.write(f'Missing file for {model.__name__} {pk}: {name}')
+                        continue
+
+                    if name not in migrated:
+                        if dry_run:
+                            migrated[name] = name
+                        else:
+                            with default_storage.open(name) as source:
+                                migrated[name] = content_addressed_storage.save(name, source)
+
+                    if not dry_run:
+                        # update() skips the reference signals; counts are rebuilt below
+                        model.objects.filter(pk=pk).update(**{field: migrated[name]})
+
+        unique = len(set(migrated.values()))
+        self.stdout.write(f'{len(migrated)} file(s) to migrate, {unique} unique, {missing} missing.')
+
+        if dry_run:
+            return
+
+        self.rebuild_reference_counts()
+
+        if not options['keep_originals']:
+            for name in migrated:
+                default_storage.delete(name)
+
+        self.stdout.write(self.style.SUCCESS('Successfully deduplicated media files!'))
+
+    def rebuild_reference_counts(self):
+        counts = Counter()
+        for model, fields in STORED_FILE_FIELDS.items():
+            for field in fields:
+                names = model.objects.exclude(**{field: ''}).exclude(
+                    **{f'{field}__isnull': True}
+                ).values_list(field, flat=True)
+                counts.update(names.iterator(chunk_size=2000))
+
+        with transaction.atomic():
+            StoredFile.objects.all().delete()
+            StoredFile.objects.bulk_create(
+                [StoredFile(name=name, ref_count=count) for name, count in counts.items()],
+                batch_size=500,
+            )
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from courses.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes abandoned chunked uploads and their partial files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours',
+            type=float,
+            default=settings.CHUNKED_UPLOAD_EXPIRY_HOURS,
+            help='Delete uploads that have not received a chunk for this long',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count abandoned uploads without deleting them',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = time.time() - options['max_age_hours'] * 3600
+        uploads, files = expire_uploads(cutoff, options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully expired {uploads} upload(s) and {files} orphaned partial file(s)!'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Assignment
+from courses.similarity import index_assignment
+
+
+class Command(BaseCommand):
+    help = 'Computes MinHash fingerprints for submissions that have none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assignment',
+            type=int,
+            help='Only index submissions of this assignment id',
+        )
+
+    def handle(self, *args, **options):
+        assignments = Assignment.objects.filter(submissions__fingerprint__isnull=True).distinct()
+        if options['assignment']:
+            assignments = assignments.filter(pk=options['assignment'])
+
+        total = 0
+        for assignment in assignments.iterator():
+            total += index_assignment(assignment)
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed {total} submission(s)!'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from courses.risk import score_enrollments
+
+
+class Command(BaseCommand):
+    help = 'Scores every active enrollment for the risk of falling behind (run nightly)'
+
+    def handle(self, *args, **options):
+        total = score_enrollments()
+        self.stdout.write(self.style.SUCCESS(f'Successfully scored {total} enrollment(s)!'))
@@ -0,0 +1,248 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import (
+    Answer, Course, Enrollment, Lesson, LessonProgress, Question, Quiz, QuizAttempt
+)
+
+PASSWORD = 'scale-password'
+
+# Points the views award, so seeded totals match what students would have earned
+ENROLL_POINTS = 10
+LESSON_POINTS = 20
+QUESTION_POINTS = 2
+
+
+class Command(BaseCommand):
+    help = 'Generates a large synthetic data set with bulk_create for load testing and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--instructors', type=int, default=50)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--lessons', type=int, default=12, help='Lessons per course')
+        parser.add_argument('--quiz-every', type=int, default=3, help='Every n-th lesson gets a quiz')
+        parser.add_argument('--questions', type=int, default=5, help='Questions per quiz')
+        parser.add_argument('--enrollments', type=int, default=4, help='Average enrollments per student')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Students generated per transaction')
+        parser.add_argument('--prefix', default='scale', help='Prefix of the generated usernames')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Users prefixed "{prefix}_" already exist; pick another --prefix.')
+
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.password = make_password(PASSWORD)
+        self.counts = dict.fromkeys(
+            ['users', 'courses', 'lessons', 'quizzes', 'questions', 'enrollments', 'progress', 'attempts'], 0)
+
+        with transaction.atomic():
+            self.create_users([
+                User(username=f'{prefix}_admin', role=User.Role.ADMIN, is_staff=True, is_superuser=True)
+            ])
+            instructors = self.create_users([
+                User(username=f'{prefix}_instructor_{n}', role=User.Role.INSTRUCTOR)
+                for n in range(options['instructors'])
+            ])
+            catalog = self.create_catalog(instructors, options)
+
+        published = [course for course in catalog if course[1]]
+        if not published:
+            raise CommandError('No published course to enroll students in.')
+        batch_size = options['batch_size']
+        for start in range(0, options['students'], batch_size):
+            with transaction.atomic():
+                self.create_students(
+                    prefix, range(start, min(start + batch_size, options['students'])), published, options)
+            self.stdout.write(f"  {min(start + batch_size, options['students'])} students")
+
+        summary = ', '.join(f'{count} {name}' for name, count in self.counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Successfully generated {summary}!'))
+        self.stdout.write(f'Every generated user has the password "{PASSWORD}".')
+
+    def create_users(self, users):
+        for user in users:
+            user.password = self.password
+            user.email = f'{user.username}@example.com'
+        users = User.objects.bulk_create(users)
+        self.counts['users'] += len(users)
+        return users
+
+    def create_catalog(self, instructors, options):
+        """Courses with lessons and quizzes; returns (course id, published, [(lesson id, quiz)])"""
+        courses = Course.objects.bulk_create([
+            Course(
+                title=f'Course {n}',
+                description=f'Generated course {n}',
+                instructor=self.random.choice(instructors),
+                level=self.random.choice(Course.Level.values),
+                # One course in ten stays a draft
+                is_published=n % 10 != 9,
+            )
+            for n in range(options['courses'])
+        ])
+        lessons = Lesson.objects.bulk_create([
+            Lesson(
+                course=course,
+                title=f'Lesson {order}',
+                description=f'Lesson {order} of {course.title}',
+                order=order,
+                video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+                is_published=True,
+            )
+            for course in courses
+            for order in range(1, options['lessons'] + 1)
+        ])
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(lesson=lesson, title=f'Quiz: {lesson.title}')
+            for lesson in lessons
+            if lesson.order % options['quiz_every'] == 0
+        ])
+        questions = Question.objects.bulk_create([
+            Question(quiz=quiz, question_text=f'Question {order}?', points=QUESTION_POINTS, order=order)
+            for quiz in quizzes
+            for order in range(1, options['questions'] + 1)
+        ])
+        Answer.objects.bulk_create([
+            Answer(question=question, answer_text=f'Answer {order}', is_correct=order == 1, order=order)
+            for question in questions
+            for order in range(1, 5)
+        ], batch_size=5000)
+
+        quiz_by_lesson = {quiz.lesson_id: quiz for quiz in quizzes}
+        for quiz in quizzes:
+            quiz.question_count = options['questions']
+        lessons_by_course = {}
+        for lesson in lessons:
+            lessons_by_course.setdefault(lesson.course_id, []).append(
+                (lesson.pk, quiz_by_lesson.get(lesson.pk)))
+
+        self.counts['courses'] += len(courses)
+        self.counts['lessons'] += len(lessons)
+        self.counts['quizzes'] += len(quizzes)
+        self.counts['questions'] += len(questions)
+        return [(course.pk, course.is_published, lessons_by_course.get(course.pk, [])) for course in courses]
+
+    def timeline(self, completed, finished):
+        """
+        Enrollment time, lesson completion times and course completion time
+
+        Lessons are completed in order after the enrollment; a finished
+        course is completed when its last lesson is.
+        """
+        rand = self.random
+        enrolled_at = self.now - timedelta(days=rand.randint(1, 180), minutes=rand.randint(0, 1440))
+        # Finished students took part of the time since enrolling, the others are still going
+        span = (self.now - enrolled_at) * (rand.uniform(0.2, 1) if finished else 1)
+        lesson_times = sorted(enrolled_at + span * rand.random() for _ in range(completed))
+        return enrolled_at, lesson_times, lesson_times[-1] if finished else None
+
+    def create_students(self, prefix, numbers, published, options):
+        rand = self.random
+        # Decide every enrollment first so each student's points and last activity are known up front
+        plans = []
+        for _ in numbers:
+            count = min(rand.randint(1, 2 * options['enrollments'] - 1), len(published))
+            plan = []
+            for course_id, _, lessons in rand.sample(published, count):
+                completed = rand.choice([0, len(lessons), rand.randint(0, len(lessons))])
+                # Correct answers of each quiz taken; most completed lessons have an attempt
+                scores = {
+                    quiz.pk: rand.randint(0, quiz.question_count)
+                    for _, quiz in lessons[:completed] if quiz is not None and rand.random() < 0.8
+                }
+                finished = bool(lessons) and completed == len(lessons)
+                plan.append((course_id, lessons, completed, scores, self.timeline(completed, finished)))
+            plans.append(plan)
+
+        students = []
+        for number, plan in zip(numbers, plans):
+            last_activity = timezone.localdate(max(
+                max([enrolled_at, *lesson_times]) for _, _, _, _, (enrolled_at, lesson_times, _) in plan
+            ))
+            # A streak only runs while the student was active today or yesterday
+            active = (timezone.localdate(self.now) - last_activity).days <= 1
+            streak = rand.randint(1, 30) if active else 0
+            students.append(User(
+                username=f'{prefix}_student_{number}',
+                total_points=sum(
+                    ENROLL_POINTS + LESSON_POINTS * completed + sum(
+                        self.quiz_points(quiz, scores[quiz.pk])
+                        for _, quiz in lessons if quiz is not None and quiz.pk in scores
+                    )
+                    for _, lessons, completed, scores, _ in plan
+                ),
+                current_streak=streak,
+                longest_streak=streak + rand.randint(0, 10),
+                last_activity_date=last_activity,
+            ))
+        students = self.create_users(students)
+
+        enrollments = []
+        for student, plan in zip(students, plans):
+            for course_id, lessons, completed, _, (_, _, completed_at) in plan:
+                enrollments.append(Enrollment(
+                    student=student,
+                    course_id=course_id,
+                    progress=round(completed * 100 / len(lessons), 2) if lessons else 0,
+                    completed_at=completed_at,
+                ))
+        enrollments = Enrollment.objects.bulk_create(enrollments)
+
+        # enrolled_at is auto_now_add, which bulk_create() overwrites; bulk_update() does not
+        plan_rows = [row for plan in plans for row in plan]
+        for enrollment, (_, _, _, _, (enrolled_at, _, _)) in zip(enrollments, plan_rows):
+            enrollment.enrolled_at = enrolled_at
+        Enrollment.objects.bulk_update(enrollments, ['enrolled_at'], batch_size=1000)
+
+        progress = []
+        attempts = []
+        for enrollment, (_, lessons, completed, scores, (_, lesson_times, _)) in zip(enrollments, plan_rows):
+            for index, (lesson_id, quiz) in enumerate(lessons[:completed + 1]):
+                done = index < completed
+                progress.append(LessonProgress(
+                    enrollment=enrollment,
+                    lesson_id=lesson_id,
+                    is_completed=done,
+                    completed_at=lesson_times[index] if done else None,
+                    time_spent_minutes=rand.randint(1, 60),
+                ))
+                if done and quiz is not None and quiz.pk in scores:
+                    score = self.quiz_score(quiz, scores[quiz.pk])
+                    attempts.append(QuizAttempt(
+                        student_id=enrollment.student_id,
+                        quiz=quiz,
+                        score=score,
+                        points_earned=QUESTION_POINTS * scores[quiz.pk],
+                        is_passed=score >= quiz.passing_score,
+                        submitted_at=lesson_times[index],
+                    ))
+        LessonProgress.objects.bulk_create(progress, batch_size=5000)
+        attempts = QuizAttempt.objects.bulk_create(attempts, batch_size=5000)
+        # started_at is auto_now_add too
+        for attempt in attempts:
+            minutes = rand.randint(1, attempt.quiz.time_limit_minutes)
+            attempt.started_at = attempt.submitted_at - timedelta(minutes=minutes)
+        QuizAttempt.objects.bulk_update(attempts, ['started_at'], batch_size=1000)
+
+        self.counts['enrollments'] += len(enrollments)
+        self.counts['progress'] += len(progress)
+        self.counts['attempts'] += len(attempts)
+
+    @staticmethod
+    def quiz_score(quiz, correct):
+        return correct * 100 / quiz.question_count if quiz.question_count else 0
+
+    def quiz_points(self, quiz, correct):
+        """Points quiz_take awards: the earned points, only when passed"""
+        passed = self.quiz_score(quiz, correct) >= quiz.passing_score
+        return QUESTION_POINTS * correct if passed else 0
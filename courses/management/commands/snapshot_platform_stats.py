@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.dashboards import refresh_platform_stats
+
+
+class Command(BaseCommand):
+    help = "Records today's platform statistics snapshot (run at least daily)"
+
+    def handle(self, *args, **options):
+        stats = refresh_platform_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully recorded snapshot: {stats['total_users']} user(s), "
+            f"{stats['enrollments']} enrollment(s)!"
+        ))
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+
+ALIAS = 'sqlite_stress'
+
+
+class Command(BaseCommand):
+    help = 'Runs concurrent readers and writers on a scratch SQLite file with and without SQLITE_PERFORMANCE_MODE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+
+    def handle(self, *args, **options):
+        base = connections['default'].settings_dict
+        for label, performance_mode in (('default', False), ('performance', True)):
+            with tempfile.TemporaryDirectory() as directory:
+                settings_dict = {
+                    **base,
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': os.path.join(directory, 'stress.sqlite3'),
+                    'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if performance_mode else {},
+                    'TEST': {},
+                }
+                with override_settings(SQLITE_PERFORMANCE_MODE=performance_mode):
+                    connections.settings[ALIAS] = settings_dict
+                    try:
+                        results = self.run(options)
+                    finally:
+                        connections[ALIAS].close()
+                        del connections[ALIAS]
+                        del connections.settings[ALIAS]
+
+            seconds = options['seconds']
+            self.stdout.write(
+                f"{label:>11}: {results['writes'] / seconds:8.1f} writes/s "
+                f"({results['write_errors']} locked), "
+                f"{results['reads'] / seconds:8.1f} reads/s ({results['read_errors']} locked)"
+            )
+
+    def run(self, options):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)')
+            cursor.execute('CREATE TABLE log (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)')
+            cursor.execute('INSERT INTO counter (id, value) VALUES (1, 0)')
+        connections[ALIAS].close()
+
+        results = {'writes': 0, 'write_errors': 0, 'reads': 0, 'read_errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def count(key):
+            with lock:
+                results[key] += 1
+
+        def writer():
+            # Read then write in one transaction, like quiz_take awarding points
+            while time.monotonic() < deadline:
+                try:
+                    with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+                        cursor.execute('SELECT value FROM counter WHERE id = 1')
+                        value = cursor.fetchone()[0] + 1
+                        cursor.execute('UPDATE counter SET value = %s WHERE id = 1', [value])
+                        cursor.execute('INSERT INTO log (value) VALUES (%s)', [value])
+                    count('writes')
+                except OperationalError:
+                    count('write_errors')
+            connections[ALIAS].close()
+
+        def reader():
+            while time.monotonic() < deadline:
+                try:
+                    with connections[ALIAS].cursor() as cursor:
+                        cursor.execute('SELECT COUNT(*), MAX(value) FROM log')
+                        cursor.fetchone()
+                    count('reads')
+                except OperationalError:
+                    count('read_errors')
+            connections[ALIAS].close()
+
+        threads = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
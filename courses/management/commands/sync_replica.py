@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from eduvolve.replicas import replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Copies the primary SQLite database onto the SQLite replica stand-ins (local development)'
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        replicas = replica_aliases()
+        if primary.vendor != 'sqlite':
+            raise CommandError('Only SQLite primaries can be copied; real replicas replicate themselves.')
+        if not replicas:
+            raise CommandError('No replica configured (set REPLICA_DATABASE_URLS).')
+
+        primary.ensure_connection()
+        for alias in replicas:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f'Replica "{alias}" is not an SQLite database.')
+            replica.ensure_connection()
+            # SQLite online backup: a consistent snapshot even while the primary is in use
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f'Copied to {alias} ({replica.settings_dict["NAME"]})')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully synced {len(replicas)} replica(s)!'))
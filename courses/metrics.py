@@ -0,0 +1,45 @@
+from eduvolve.metrics import Counter, Histogram
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+ENROLLMENTS = Counter('eduvolve_enrollments', 'New course enrollments')
+
+LESSON_COMPLETIONS = Counter('eduvolve_lesson_completions', 'Lessons marked complete by students')
+
+QUIZ_SUBMISSIONS = Counter('eduvolve_quiz_submissions', 'Graded quiz attempts', ['result'])
+
+QUIZ_GRADING_SECONDS = Histogram(
+    'eduvolve_quiz_grading_seconds',
+    'Time to score a quiz submission and save the attempt',
+)
+
+SUBMISSIONS_GRADED = Counter(
+    'eduvolve_submissions_graded',
+    'Assignment submissions graded, one at a time (single) or from a formset or CSV (bulk)',
+    ['mode'],
+)
+
+GRADING_TURNAROUND_SECONDS = Histogram(
+    'eduvolve_grading_turnaround_seconds',
+    'Time from assignment submission to its grade',
+    buckets=(HOUR, 6 * HOUR, DAY, 3 * DAY, 7 * DAY, 14 * DAY, 30 * DAY),
+)
+
+UPLOAD_BYTES = Histogram(
+    'eduvolve_upload_bytes',
+    'Size of submitted assignment files, by form or chunked upload',
+    ['method'],
+    buckets=tuple(64 * 1024 * 4 ** power for power in range(8)),
+)
+
+UPLOAD_SECONDS = Histogram(
+    'eduvolve_upload_duration_seconds',
+    'Time from starting a chunked upload to completing it',
+    buckets=(1, 5, 15, 60, 5 * 60, 15 * 60, HOUR, DAY),
+)
+
+
+def record_grading_turnaround(submissions):
+    for submission in submissions:
+        GRADING_TURNAROUND_SECONDS.observe((submission.graded_at - submission.submitted_at).total_seconds())
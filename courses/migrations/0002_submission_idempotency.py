@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:07
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+
+def remove_duplicate_attempts(apps, schema_editor):
+    """
+    Keep only the first attempt per (student, quiz) before adding the constraint
+
+    Every passed attempt awarded its points, so the points of each removed
+    passed duplicate are taken back from the student.
+    """
+    QuizAttempt = apps.get_model('courses', 'QuizAttempt')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    seen = set()
+    duplicate_ids = []
+    awarded = Counter()
+    for attempt in QuizAttempt.objects.order_by('submitted_at', 'id').values(
+        'id', 'student_id', 'quiz_id', 'is_passed', 'points_earned'
+    ):
+        key = (attempt['student_id'], attempt['quiz_id'])
+        if key in seen:
+            duplicate_ids.append(attempt['id'])
+            if attempt['is_passed']:
+                awarded[attempt['student_id']] += attempt['points_earned']
+        else:
+            seen.add(key)
+    for student_id, points in awarded.items():
+        User.objects.filter(pk=student_id).update(
+            total_points=Greatest(F('total_points') - points, Value(0)))
+    QuizAttempt.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attempts, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='submission_token',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='submission_token',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='quizattempt',
+            unique_together={('student', 'quiz')},
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_submission_idempotency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['assignment', 'status', 'submitted_at'], name='submission_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:13
+
+import courses.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_chunked_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='assignment_files/'),
+        ),
+        migrations.AlterField(
+            model_name='assignmentsubmission',
+            name='submission_file',
+            field=models.FileField(storage=courses.storage.ContentAddressedStorage(), upload_to='submissions/'),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='attachments',
+            field=models.FileField(blank=True, null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='lesson_attachments/'),
+        ),
+    ]
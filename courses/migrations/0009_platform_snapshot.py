@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_enrollment_risk_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_on', models.DateField(unique=True)),
+                ('total_users', models.IntegerField(default=0)),
+                ('students', models.IntegerField(default=0)),
+                ('instructors', models.IntegerField(default=0)),
+                ('admins', models.IntegerField(default=0)),
+                ('courses', models.IntegerField(default=0)),
+                ('published_courses', models.IntegerField(default=0)),
+                ('enrollments', models.IntegerField(default=0)),
+                ('completions', models.IntegerField(default=0)),
+                ('active_students', models.IntegerField(default=0)),
+                ('pending_submissions', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-taken_on'],
+            },
+        ),
+    ]
@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from accounts.models import User
+from .storage import content_addressed_storage
+from pathlib import Path
+import os
 import re
+import uuid
 
 class Course(models.Model):
     """Main Course model"""
@@ -29,6 +35,10 @@ class Course(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Published catalog, newest first
+            models.Index(fields=['-created_at'], condition=models.Q(is_published=True), name='course_catalog_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -63,7 +73,12 @@ class Lesson(models.Model):
     
     # Additional content
     content = models.TextField(blank=True, help_text="Additional lesson text content")
-    attachments = models.FileField(upload_to='lesson_attachments/', blank=True, null=True)
+    attachments = models.FileField(
+        upload_to='lesson_attachments/',
+        storage=content_addressed_storage,
+        blank=True,
+        null=True
+    )
     
     is_published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -199,7 +214,24 @@ class Assignment(models.Model):
     due_date = models.DateTimeField()
     max_points = models.IntegerField(default=100, validators=[MinValueValidator(1)])
     
-    attachment = models.FileField(upload_to='assignment_files/', blank=True, null=True)
+    attachment = models.FileField(
+        upload_to='assignment_files/',
+        storage=content_addressed_storage,
+        blank=True,
+        null=True
+    )
+    
+    # Submission upload limits
+    max_upload_mb = models.IntegerField(
+        default=20,
+        validators=[MinValueValidator(1)],
+        help_text="Maximum submission file size in MB"
+    )
+    allowed_extensions = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Comma-separated file extensions, e.g. pdf,zip,txt (leave blank to allow any)"
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -209,6 +241,19 @@ class Assignment(models.Model):
     
     def __str__(self):
         return f"{self.lesson.course.title} - {self.title}"
+    
+    def get_allowed_extensions(self):
+        return [ext.strip().lstrip('.').lower() for ext in self.allowed_extensions.split(',') if ext.strip()]
+    
+    def validate_upload(self, filename, size):
+        """Check a submission file against this assignment's limits"""
+        if size > self.max_upload_mb * 1024 * 1024:
+            raise ValidationError(f'File is larger than {self.max_upload_mb} MB.')
+        
+        allowed = self.get_allowed_extensions()
+        extension = os.path.splitext(filename)[1].lstrip('.').lower()
+        if allowed and extension not in allowed:
+            raise ValidationError(f'Only these file types are accepted: {", ".join(allowed)}.')
 
 
 class Enrollment(models.Model):
@@ -222,7 +267,7 @@ class Enrollment(models.Model):
     )
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     
-    enrolled_at = models.DateTimeField(auto_now_add=True)
+    enrolled_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_active = models.BooleanField(default=True)
     progress = models.FloatField(
         default=0.0,
@@ -230,9 +275,20 @@ class Enrollment(models.Model):
     )
     completed_at = models.DateTimeField(blank=True, null=True)
     
+    # 0-100 likelihood of falling behind, set by the score_at_risk command
+    risk_score = models.FloatField(blank=True, null=True)
+    risk_scored_at = models.DateTimeField(blank=True, null=True)
+    
     class Meta:
         unique_together = ['student', 'course']
         ordering = ['-enrolled_at']
+        indexes = [
+            models.Index(fields=['course', 'is_active', '-risk_score'], name='enrollment_risk_idx'),
+            # Active students of a course, newest first
+            models.Index(
+                fields=['course', '-enrolled_at'], condition=models.Q(is_active=True), name='enrollment_active_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.course.title}"
@@ -263,11 +319,15 @@ class LessonProgress(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
     
     is_completed = models.BooleanField(default=False)
-    completed_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True, db_index=True)
     time_spent_minutes = models.IntegerField(default=0)
     
     class Meta:
         unique_together = ['enrollment', 'lesson']
+        indexes = [
+            # Completed lessons of an enrollment, counted from the index alone
+            models.Index(fields=['enrollment'], condition=models.Q(is_completed=True), name='progress_completed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.enrollment.student.username} - {self.lesson.title}"
@@ -284,15 +344,33 @@ class QuizAttempt(models.Model):
     is_passed = models.BooleanField(default=False)
     
     started_at = models.DateTimeField(auto_now_add=True)
-    submitted_at = models.DateTimeField()
+    submitted_at = models.DateTimeField(db_index=True)
+    
+    # Idempotency token sent with the quiz form to recognise replayed submits
+    submission_token = models.UUIDField(blank=True, null=True, unique=True, editable=False)
     
     class Meta:
+        unique_together = ['student', 'quiz']
         ordering = ['-submitted_at']
     
     def __str__(self):
         return f"{self.student.username} - {self.quiz.title} ({self.score}%)"
 
 
+class QuizSession(models.Model):
+    """Start of a quiz not yet submitted; the time limit counts from started_at"""
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_sessions')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='sessions')
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['student', 'quiz']
+
+    def __str__(self):
+        return f"{self.student.username} - {self.quiz.title} (started {self.started_at})"
+
+
 class AssignmentSubmission(models.Model):
     """Student assignment submissions"""
     
@@ -304,12 +382,15 @@ class AssignmentSubmission(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='submissions')
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='submissions')
     
-    submission_file = models.FileField(upload_to='submissions/')
+    submission_file = models.FileField(upload_to='submissions/', storage=content_addressed_storage)
     submission_text = models.TextField(blank=True)
     
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     
+    # Idempotency token sent with the submission form to recognise replayed submits
+    submission_token = models.UUIDField(blank=True, null=True, unique=True, editable=False)
+    
     # Grading
     grade = models.FloatField(
         blank=True,
@@ -329,11 +410,156 @@ class AssignmentSubmission(models.Model):
     class Meta:
         unique_together = ['student', 'assignment']
         ordering = ['-submitted_at']
+        indexes = [
+            # Grading queue: submissions of an assignment by status, oldest first
+            models.Index(fields=['assignment', 'status', 'submitted_at'], name='submission_queue_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.assignment.title}"
 
 
+class ChunkedUpload(models.Model):
+    """An in-progress chunked upload of an assignment submission file"""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='chunked_uploads')
+    
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.student.username} - {self.filename}"
+    
+    def get_path(self):
+        return Path(settings.CHUNKED_UPLOAD_ROOT) / f'{self.id}.part'
+    
+    def get_offset(self):
+        """Bytes received so far, read from the partial file itself"""
+        try:
+            return self.get_path().stat().st_size
+        except FileNotFoundError:
+            return 0
+    
+    def last_activity(self):
+        """Timestamp of the last received chunk, or of the start when none arrived yet"""
+        try:
+            return max(self.created_at.timestamp(), self.get_path().stat().st_mtime)
+        except FileNotFoundError:
+            return self.created_at.timestamp()
+
+
+class SubmissionFingerprint(models.Model):
+    """MinHash signature of a submission's text for near-duplicate detection"""
+    
+    submission = models.OneToOneField(
+        AssignmentSubmission,
+        on_delete=models.CASCADE,
+        related_name='fingerprint'
+    )
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='fingerprints')
+    
+    signature = models.BinaryField()
+    shingle_count = models.IntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Fingerprint - {self.submission}"
+
+
+class FingerprintBand(models.Model):
+    """One LSH band of a fingerprint; equal buckets mark candidate duplicates"""
+    
+    fingerprint = models.ForeignKey(SubmissionFingerprint, on_delete=models.CASCADE, related_name='bands')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    band = models.SmallIntegerField()
+    bucket = models.BigIntegerField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['assignment', 'band', 'bucket'], name='fingerprint_bucket_idx'),
+        ]
+
+
+class StoredFile(models.Model):
+    """Reference count of a content-addressed file in media storage"""
+    
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.IntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
+class CourseStats(models.Model):
+    """Precomputed cohort analytics of a course, refreshed nightly"""
+    
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    data = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name_plural = 'Course stats'
+    
+    def __str__(self):
+        return f"Stats - {self.course.title}"
+
+
+class PlatformSnapshot(models.Model):
+    """Daily platform-wide counts kept for trend charts"""
+    
+    taken_on = models.DateField(unique=True)
+    total_users = models.IntegerField(default=0)
+    students = models.IntegerField(default=0)
+    instructors = models.IntegerField(default=0)
+    admins = models.IntegerField(default=0)
+    courses = models.IntegerField(default=0)
+    published_courses = models.IntegerField(default=0)
+    enrollments = models.IntegerField(default=0)
+    completions = models.IntegerField(default=0)
+    active_students = models.IntegerField(default=0)
+    pending_submissions = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-taken_on']
+    
+    def __str__(self):
+        return f"Platform snapshot - {self.taken_on}"
+
+
+class SlowQuery(models.Model):
+    """Query over SLOW_QUERY_THRESHOLD_MS with its plan; only the latest SLOW_QUERY_LOG_SIZE are kept"""
+    
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=100)
+    view = models.CharField(max_length=200, blank=True)
+    call_site = models.CharField(max_length=300, blank=True)
+    plan = models.TextField(blank=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-id']
+        verbose_name_plural = 'Slow queries'
+    
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms - {self.view or self.call_site}"
+
+
 class Certificate(models.Model):
     """Course completion certificates"""
     
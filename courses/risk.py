@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from .models import Assignment, AssignmentSubmission, Enrollment, QuizAttempt
+
+# Weights of each signal in the 0-100 score
+WEIGHTS = {
+    'behind_schedule': 0.35,
+    'inactivity': 0.30,
+    'missing_assignments': 0.20,
+    'quiz_scores': 0.15,
+}
+
+# Days without activity at which the inactivity signal saturates
+INACTIVE_DAYS = 14
+
+# Students at or above this score are listed as at risk
+AT_RISK_THRESHOLD = 50
+
+BATCH_SIZE = 1000
+
+
+def _past_due_counts(now):
+    """Number of assignments past their due date per course"""
+    return dict(
+        Assignment.objects.filter(due_date__lt=now).order_by()
+        .values('lesson__course').annotate(count=Count('id'))
+        .values_list('lesson__course', 'count')
+    )
+
+
+def _submitted_counts(now):
+    """Past-due assignments submitted per (student, course)"""
+    rows = AssignmentSubmission.objects.filter(assignment__due_date__lt=now).order_by().values(
+        'student', 'assignment__lesson__course'
+    ).annotate(count=Count('assignment', distinct=True)).values_list(
+        'student', 'assignment__lesson__course', 'count'
+    )
+    return {(student, course): count for student, course, count in rows}
+
+
+def _quiz_averages():
+    """Average quiz score per (student, course)"""
+    rows = QuizAttempt.objects.order_by().values('student', 'quiz__lesson__course').annotate(
+        average=Avg('score')
+    ).values_list('student', 'quiz__lesson__course', 'average')
+    return {(student, course): average for student, course, average in rows}
+
+
+def risk_score(progress, days_enrolled, duration_days, days_inactive, missing, past_due, quiz_average):
+    """Combine the signals of one enrollment into a 0-100 score"""
+    expected = min(days_enrolled / duration_days, 1) if duration_days else 1
+    signals = {
+        'behind_schedule': max(expected - progress / 100, 0),
+        'inactivity': min(days_inactive / INACTIVE_DAYS, 1),
+        'missing_assignments': missing / past_due if past_due else 0,
+        # No attempt yet is neither good nor bad
+        'quiz_scores': 0 if quiz_average is None else 1 - quiz_average / 100,
+    }
+    return round(sum(WEIGHTS[name] * value for name, value in signals.items()) * 100, 1)
+
+
+def score_enrollments():
+    """
+    Score every active enrollment
+
+    Each signal is computed for all students at once by one grouped query,
+    then the enrollments are streamed, scored and written back with
+    bulk_update() in batches, so the job runs a handful of queries no
+    matter how many students there are. Returns the number scored.
+    """
+    now = timezone.now()
+    today = timezone.localdate()
+    past_due = _past_due_counts(now)
+    submitted = _submitted_counts(now)
+    quiz_averages = _quiz_averages()
+
+    enrollments = Enrollment.objects.filter(is_active=True).order_by().values_list(
+        'pk', 'student_id', 'course_id', 'progress', 'enrolled_at',
+        'course__duration_weeks', 'student__last_activity_date',
+    )
+
+    scored = 0
+    batch = []
+    for pk, student_id, course_id, progress, enrolled_at, weeks, last_activity in enrollments.iterator(
+            chunk_size=BATCH_SIZE):
+        last_active = last_activity or timezone.localdate(enrolled_at)
+        course_past_due = past_due.get(course_id, 0)
+        score = risk_score(
+            progress=progress,
+            days_enrolled=(now - enrolled_at) / timedelta(days=1),
+            duration_days=weeks * 7,
+            days_inactive=(today - last_active).days,
+            missing=max(course_past_due - submitted.get((student_id, course_id), 0), 0),
+            past_due=course_past_due,
+            quiz_average=quiz_averages.get((student_id, course_id)),
+        )
+        batch.append(Enrollment(pk=pk, risk_score=score, risk_scored_at=now))
+
+        if len(batch) == BATCH_SIZE:
+            scored += _save_scores(batch)
+            batch = []
+    if batch:
+        scored += _save_scores(batch)
+
+    return scored
+
+
+def _save_scores(batch):
+    with transaction.atomic():
+        Enrollment.objects.bulk_update(batch, ['risk_score', 'risk_scored_at'])
+    return len(batch)
+
+
+def at_risk_enrollments(course):
+    """Active enrollments of a course at or above the threshold, riskiest first"""
+    return course.enrollments.filter(
+        is_active=True, risk_score__gte=AT_RISK_THRESHOLD
+    ).select_related('student').order_by('-risk_score')
@@ -0,0 +1,132 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+
+from .caching import bump_namespace
+from .dashboards import invalidate_instructor_summary
+from .models import Assignment, AssignmentSubmission, Course, Enrollment, Lesson, StoredFile
+
+# File fields whose files live in content-addressed storage
+STORED_FILE_FIELDS = {
+    Lesson: ['attachments'],
+    Assignment: ['attachment'],
+    AssignmentSubmission: ['submission_file'],
+}
+
+
+def add_references(names):
+    """Increment the reference count of each stored file name"""
+    for name, count in Counter(names).items():
+        if StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + count):
+            continue
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(name=name, ref_count=count)
+        except IntegrityError:
+            # Created concurrently by another request
+            StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + count)
+
+
+def remove_references(names):
+    for name, count in Counter(names).items():
+        StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') - count)
+
+
+def _loaded_file_names(instance):
+    """Stored file names of the instance; deferred fields are skipped rather than fetched"""
+    return {
+        field: getattr(instance, field).name or ''
+        for field in STORED_FILE_FIELDS[type(instance)] if field in instance.__dict__
+    }
+
+
+def _snapshot_stored_names(instance, fields):
+    """Add the database names of fields missing from the snapshot (deferred at load time)"""
+    missing = [field for field in fields if field not in instance._stored_files]
+    if missing and not instance._state.adding:
+        stored = type(instance)._base_manager.filter(pk=instance.pk).values(*missing).first() or {}
+        instance._stored_files.update({field: stored.get(field) or '' for field in missing})
+
+
+def remember_files(sender, instance, **kwargs):
+    # Snapshot the loaded names so post_save can tell which files changed
+    instance._stored_files = _loaded_file_names(instance)
+
+
+def remember_deferred_files(sender, instance, **kwargs):
+    # A field deferred at load time may have been loaded and changed since
+    _snapshot_stored_names(instance, _loaded_file_names(instance))
+
+
+def update_references(sender, instance, created, **kwargs):
+    # Names passed to the constructor are in the snapshot but not referenced yet
+    previous = {} if created else instance._stored_files
+    current = _loaded_file_names(instance)
+    added = [name for field, name in current.items() if name and name != previous.get(field)]
+    removed = [name for field, name in previous.items() if name and name != current.get(field, name)]
+    if added:
+        add_references(added)
+    if removed:
+        remove_references(removed)
+    instance._stored_files = {**previous, **current}
+
+
+def remember_all_files(sender, instance, **kwargs):
+    # The row is gone by post_delete, so deferred names are read now
+    _snapshot_stored_names(instance, STORED_FILE_FIELDS[sender])
+
+
+def release_files(sender, instance, **kwargs):
+    remove_references([name for name in instance._stored_files.values() if name])
+
+
+for model in STORED_FILE_FIELDS:
+    post_init.connect(remember_files, sender=model)
+    pre_save.connect(remember_deferred_files, sender=model)
+    post_save.connect(update_references, sender=model)
+    pre_delete.connect(remember_all_files, sender=model)
+    post_delete.connect(release_files, sender=model)
+
+
+def course_changed(sender, instance, **kwargs):
+    invalidate_instructor_summary(instance.instructor_id)
+    bump_namespace('catalog')
+
+
+def enrollment_changed(sender, instance, signal, created=False, **kwargs):
+    invalidate_instructor_summary(
+        *Course.objects.filter(pk=instance.course_id).values_list('instructor_id', flat=True)
+    )
+    # The catalog shows enrollment counts; progress updates do not change them
+    if signal is post_delete or created or not instance.is_active:
+        bump_namespace('catalog')
+
+
+def submission_changed(sender, instance, **kwargs):
+    invalidate_instructor_summary(
+        *Course.objects.filter(lessons__assignments=instance.assignment_id).values_list(
+            'instructor_id', flat=True
+        )
+    )
+
+
+# Foreign keys the receivers above read after a delete
+DELETE_KEYS = {Course: 'instructor_id', Enrollment: 'course_id', AssignmentSubmission: 'assignment_id'}
+
+
+def load_delete_key(sender, instance, **kwargs):
+    # A deferred key can no longer be loaded once the row is gone
+    field = DELETE_KEYS[sender]
+    if field in instance.get_deferred_fields():
+        instance.refresh_from_db(fields=[field])
+
+
+for model in DELETE_KEYS:
+    pre_delete.connect(load_delete_key, sender=model)
+
+for signal in (post_save, post_delete):
+    signal.connect(course_changed, sender=Course)
+    signal.connect(enrollment_changed, sender=Enrollment)
+    signal.connect(submission_changed, sender=AssignmentSubmission)
@@ -0,0 +1,238 @@
+import hashlib
+import logging
+import os
+import queue
+import random
+import re
+import struct
+import threading
+from collections import defaultdict
+from itertools import combinations
+
+from django.db import IntegrityError, connections, transaction
+
+from .models import AssignmentSubmission, FingerprintBand, SubmissionFingerprint
+
+logger = logging.getLogger('courses.similarity')
+
+# Word n-grams compared between submissions
+SHINGLE_SIZE = 5
+
+# 32 bands of 4 rows: pairs above ~0.42 Jaccard similarity are likely to
+# share a bucket, pairs far below it rarely do
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+# Pairs reported to the instructor
+DEFAULT_THRESHOLD = 0.5
+
+# Texts with fewer shingles ("See attached PDF.") are too short to tell a
+# copy from boilerplate and are never banded
+MIN_SHINGLES = 10
+
+# Buckets shared by more submissions than this hold a common template,
+# not a copy, and would yield a pair for every two members
+MAX_BUCKET_SIZE = 50
+
+# Submissions waiting for the background fingerprinting thread; more are
+# left for the index_submissions command
+QUEUE_SIZE = 500
+
+# Uploaded files read as plain text, and how much of them
+TEXT_EXTENSIONS = ('.txt', '.md', '.py')
+MAX_TEXT_BYTES = 1024 * 1024
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+_SIGNATURE_FORMAT = f'<{NUM_PERM}Q'
+
+_pending = queue.Queue(maxsize=QUEUE_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def submission_text(submission):
+    """Notes plus the content of a plain-text upload, if any"""
+    parts = [submission.submission_text]
+    name = submission.submission_file.name or ''
+    if os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS:
+        try:
+            with submission.submission_file.open('rb') as source:
+                parts.append(source.read(MAX_TEXT_BYTES).decode('utf-8', errors='ignore'))
+        except OSError:
+            pass
+    return '\n'.join(parts)
+
+
+def shingles(text):
+    """Set of 32-bit hashes of the word n-grams of text"""
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return set()
+    if len(words) < SHINGLE_SIZE:
+        grams = [' '.join(words)]
+    else:
+        grams = (' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=4).digest(), 'little')
+        for gram in grams
+    }
+
+
+def minhash(hashes):
+    """MinHash signature of a set of shingle hashes"""
+    return [
+        min((a * x + b) % _PRIME for x in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_buckets(signature):
+    """(band, bucket) pairs used as LSH keys"""
+    for band in range(BANDS):
+        rows = struct.pack(f'<{ROWS}Q', *signature[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        yield band, int.from_bytes(digest, 'little', signed=True)
+
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the share of equal MinHash values"""
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / NUM_PERM
+
+
+def unpack_signature(data):
+    return list(struct.unpack(_SIGNATURE_FORMAT, bytes(data)))
+
+
+def fingerprint_submission(submission):
+    """
+    Store the MinHash fingerprint of a submission
+
+    A submission with fewer than MIN_SHINGLES shingles gets an empty
+    signature and no bands, so it is never fingerprinted again and never
+    matches anything. Returns False if it already had a fingerprint.
+    """
+    hashes = shingles(submission_text(submission))
+    signature = minhash(hashes) if len(hashes) >= MIN_SHINGLES else []
+    try:
+        with transaction.atomic():
+            fingerprint = SubmissionFingerprint.objects.create(
+                submission=submission,
+                assignment_id=submission.assignment_id,
+                signature=struct.pack(_SIGNATURE_FORMAT, *signature) if signature else b'',
+                shingle_count=len(hashes),
+            )
+            FingerprintBand.objects.bulk_create([
+                FingerprintBand(
+                    fingerprint=fingerprint, assignment_id=submission.assignment_id, band=band, bucket=bucket)
+                for band, bucket in (band_buckets(signature) if signature else [])
+            ])
+    except IntegrityError:
+        # Fingerprinted concurrently
+        return False
+    return True
+
+
+def fingerprint_pending(submission_id):
+    """Fingerprint a queued submission, if it still exists"""
+    submission = AssignmentSubmission.objects.filter(pk=submission_id).first()
+    if submission is not None:
+        fingerprint_submission(submission)
+
+
+def _drain():
+    while True:
+        submission_id = _pending.get()
+        try:
+            fingerprint_pending(submission_id)
+        except Exception:
+            logger.exception('Could not fingerprint submission %s', submission_id)
+        finally:
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+
+
+def _start_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, name='submission-fingerprints', daemon=True)
+            _worker.start()
+
+
+def _enqueue(submission_id):
+    try:
+        _pending.put_nowait(submission_id)
+    except queue.Full:
+        # Left for the index_submissions command
+        pass
+    else:
+        _start_worker()
+
+
+def fingerprint_on_commit(submission):
+    """
+    Fingerprint a new submission on a background thread once the
+    transaction saving it commits, keeping MinHash off the request
+    """
+    submission_id = submission.pk
+    transaction.on_commit(lambda: _enqueue(submission_id))
+
+
+def index_assignment(assignment):
+    """
+    Fingerprint the submissions of an assignment that have none yet
+
+    Submissions are fingerprinted in the background after they are saved;
+    this catches up on older ones and on any the queue dropped (see the
+    index_submissions command). Returns the number of
+    submissions indexed.
+    """
+    new_submissions = assignment.submissions.filter(fingerprint__isnull=True)
+    return sum(fingerprint_submission(submission) for submission in new_submissions.iterator(chunk_size=100))
+
+
+def similar_pairs(assignment, threshold=DEFAULT_THRESHOLD):
+    """
+    Likely-copied submission pairs of an assignment, most similar first
+
+    Candidates are fingerprints sharing at least one LSH bucket, found from
+    the band rows in one indexed scan; only those are compared, so the work
+    grows with the number of submissions rather than the number of pairs.
+    Buckets larger than MAX_BUCKET_SIZE are skipped. Returns (submission_id, submission_id, similarity) tuples.
+    """
+    buckets = defaultdict(list)
+    band_rows = FingerprintBand.objects.filter(assignment=assignment).values_list(
+        'band', 'bucket', 'fingerprint__submission_id'
+    )
+    for band, bucket, submission_id in band_rows.iterator(chunk_size=2000):
+        buckets[(band, bucket)].append(submission_id)
+
+    candidates = set()
+    for members in buckets.values():
+        if 1 < len(members) <= MAX_BUCKET_SIZE:
+            candidates.update(combinations(sorted(members), 2))
+    if not candidates:
+        return []
+
+    involved = {submission_id for pair in candidates for submission_id in pair}
+    signatures = {
+        submission_id: unpack_signature(signature)
+        for submission_id, signature in SubmissionFingerprint.objects.filter(
+            submission_id__in=involved
+        ).values_list('submission_id', 'signature')
+    }
+
+    pairs = []
+    for first, second in candidates:
+        similarity = estimated_similarity(signatures[first], signatures[second])
+        if similarity >= threshold:
+            pairs.append((first, second, similarity))
+
+    pairs.sort(key=lambda pair: pair[2], reverse=True)
+    return pairs
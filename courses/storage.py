@@ -0,0 +1,50 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+# Directory (inside MEDIA_ROOT) holding content-addressed files
+BLOB_DIR = 'blobs'
+
+
+def content_name(sha256, filename):
+    """Storage name of a file with the given SHA-256, keeping its extension"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{BLOB_DIR}/{sha256[:2]}/{sha256}{extension}'
+
+
+def content_sha256(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the SHA-256 of their content
+
+    Identical uploads map to the same file, so re-uploading never adds a
+    random suffix and the same PDF attached in several places is stored
+    once. Files are shared, so they must only be deleted by
+    collect_media_garbage, which checks the StoredFile reference counts.
+    """
+
+    def _save(self, name, content):
+        name = content_name(content_sha256(content), name)
+        try:
+            # Touch the shared file so collect_media_garbage sees it as in use
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            pass
+        # If a concurrent upload of the same content wins the race, the base
+        # class falls back to a suffixed name, which only costs a duplicate
+        return super()._save(name, content)
+
+
+content_addressed_storage = ContentAddressedStorage()
@@ -0,0 +1,51 @@
+"""Minimal model instances for the courses tests"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import (
+    Answer, Assignment, AssignmentSubmission, Course, Enrollment, Lesson, Question, Quiz
+)
+
+
+def make_user(username, role=User.Role.STUDENT, **fields):
+    return User.objects.create(username=username, role=role, **fields)
+
+
+def make_lesson(instructor, **fields):
+    course = Course.objects.create(
+        title='Course', description='A course', instructor=instructor, is_published=True)
+    return Lesson.objects.create(
+        course=course, title='Lesson', description='A lesson', is_published=True, **fields)
+
+
+def make_quiz(lesson, questions=2, **fields):
+    """A quiz whose questions have a correct first answer and a wrong second one"""
+    quiz = Quiz.objects.create(lesson=lesson, title='Quiz', **fields)
+    for order in range(1, questions + 1):
+        question = Question.objects.create(quiz=quiz, question_text=f'Question {order}?', order=order)
+        Answer.objects.create(question=question, answer_text='Right', is_correct=True, order=1)
+        Answer.objects.create(question=question, answer_text='Wrong', order=2)
+    return quiz
+
+
+def correct_answers(quiz):
+    return {
+        f'question_{question.pk}': question.answers.get(is_correct=True).pk
+        for question in quiz.questions.all()
+    }
+
+
+def make_assignment(lesson, **fields):
+    fields.setdefault('due_date', timezone.now() + timedelta(days=7))
+    return Assignment.objects.create(lesson=lesson, title='Essay', description='Write an essay', **fields)
+
+
+def enroll(student, course):
+    return Enrollment.objects.create(student=student, course=course)
+
+
+def make_submission(assignment, student, **fields):
+    fields.setdefault('submission_file', f'submissions/{student.username}.pdf')
+    return AssignmentSubmission.objects.create(assignment=assignment, student=student, **fields)
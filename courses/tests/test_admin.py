@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from courses.caching import namespace_version
+from courses.dashboards import instructor_summary
+from courses.models import (
+    AssignmentSubmission, Certificate, Course, Enrollment, Lesson, LessonProgress, QuizAttempt
+)
+from .factories import enroll, make_assignment, make_lesson, make_quiz, make_submission, make_user
+
+
+class ChangelistTests(TestCase):
+    """Changelists run the same queries whatever the number of rows"""
+
+    MODELS = [Course, Lesson, Enrollment, LessonProgress, QuizAttempt, AssignmentSubmission, Certificate]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', User.Role.ADMIN, is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            lesson = make_lesson(make_user(f'teacher{User.objects.count()}', User.Role.INSTRUCTOR))
+            assignment = make_assignment(lesson)
+            quiz = make_quiz(lesson, questions=1)
+            student = make_user(f'student{User.objects.count()}')
+            enrollment = enroll(student, lesson.course)
+            LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+            QuizAttempt.objects.create(student=student, quiz=quiz, score=50, submitted_at=lesson.created_at)
+            make_submission(assignment, student)
+            Certificate.objects.create(enrollment=enrollment)
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:courses_{model._meta.model_name}_changelist')
+        # The first request also caches the session and user
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(captured)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_rows(1)
+        few = {model: self.changelist_queries(model) for model in self.MODELS}
+        self.add_rows(5)
+        for model in self.MODELS:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self.changelist_queries(model), few[model])
+
+    def test_submission_changelist_defers_text_columns(self):
+        self.add_rows(1)
+        url = reverse('admin:courses_assignmentsubmission_changelist')
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(url)
+        select = next(query['sql'] for query in captured if 'FROM "courses_assignmentsubmission"' in query['sql']
+                      and '"courses_assignmentsubmission"."status"' in query['sql'])
+        self.assertNotIn('"submission_text"', select)
+        self.assertNotIn('"feedback"', select)
+
+    def test_change_form_loads_deferred_columns(self):
+        self.add_rows(1)
+        submission = AssignmentSubmission.objects.get()
+        url = reverse('admin:courses_assignmentsubmission_change', args=[submission.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class AdminActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', User.Role.ADMIN, is_staff=True, is_superuser=True)
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.lesson = make_lesson(cls.instructor)
+        cls.course = cls.lesson.course
+        Lesson.objects.create(course=cls.course, title='Second', content='...', order=2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def run_action(self, model, action, pks):
+        url = reverse(f'admin:courses_{model._meta.model_name}_changelist')
+        return self.client.post(url, {'action': action, '_selected_action': pks})
+
+    def test_recompute_progress(self):
+        enrollment = enroll(make_user('student'), self.course)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=self.lesson, is_completed=True)
+        instructor_summary(self.instructor)
+        self.run_action(Enrollment, 'recompute_progress', [enrollment.pk])
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.progress, 50.0)
+        self.assertEqual(instructor_summary(self.instructor)['my_courses'][0].average_progress, 50.0)
+
+    def test_unpublish_invalidates_the_instructor_summary(self):
+        key = f'instructor_summary:{self.instructor.pk}'
+        cache.set(key, 'stale')
+        self.run_action(Course, 'unpublish_courses', [self.course.pk])
+        self.assertFalse(Course.objects.get(pk=self.course.pk).is_published)
+        self.assertIsNone(cache.get(key))
+
+    def test_publish_actions_invalidate_the_catalog(self):
+        for action in ('unpublish_courses', 'publish_courses'):
+            version = namespace_version('catalog')
+            self.run_action(Course, action, [self.course.pk])
+            self.assertNotEqual(namespace_version('catalog'), version)
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.analytics import (
+    completion_distribution, course_stats, lesson_funnel, progress_histogram, refresh_course_stats,
+)
+from courses.models import CourseStats, Enrollment, Lesson, LessonProgress
+from .factories import enroll, make_lesson, make_user
+
+
+class StatsHelperTests(SimpleTestCase):
+    def test_progress_histogram_counts_100_in_the_last_bucket(self):
+        histogram = progress_histogram([0, 9.9, 10, 55, 100])
+        self.assertEqual([bucket['count'] for bucket in histogram], [2, 1, 0, 0, 0, 1, 0, 0, 0, 1])
+        self.assertEqual(histogram[0]['label'], '0-10%')
+
+    def test_lesson_funnel_drop_off(self):
+        funnel = lesson_funnel([(1, 'Intro'), (2, 'Next')], {1: 8, 2: 5}, 10)
+        self.assertEqual([(step['completed'], step['drop_off']) for step in funnel], [(8, 2), (5, 3)])
+        self.assertEqual(funnel[0]['percent'], 80.0)
+
+    def test_completion_distribution(self):
+        summary = completion_distribution([3, 10, 100])
+        self.assertEqual([bucket['count'] for bucket in summary['buckets']], [1, 1, 0, 0, 0, 1])
+        self.assertEqual(summary['median_days'], 10)
+
+    def test_completion_distribution_without_completions(self):
+        summary = completion_distribution([])
+        self.assertIsNone(summary['median_days'])
+        self.assertIsNone(summary['p90_days'])
+
+
+class CourseStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.lesson = make_lesson(cls.instructor)
+        cls.course = cls.lesson.course
+        cls.second = Lesson.objects.create(course=cls.course, title='Second', content='...', order=2)
+        now = timezone.now()
+        for number, progress in enumerate([100, 50, 0]):
+            enrollment = enroll(make_user(f'student{number}'), cls.course)
+            Enrollment.objects.filter(pk=enrollment.pk).update(
+                progress=progress, enrolled_at=now - timedelta(days=10),
+                completed_at=now if progress == 100 else None,
+            )
+            if progress:
+                LessonProgress.objects.create(enrollment=enrollment, lesson=cls.lesson, is_completed=True)
+        # Inactive enrollments are left out of the cohort
+        inactive = enroll(make_user('dropped'), cls.course)
+        Enrollment.objects.filter(pk=inactive.pk).update(is_active=False, progress=100)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats(self):
+        data = refresh_course_stats(self.course).data
+        self.assertEqual(data['students'], 3)
+        self.assertEqual(data['completed'], 1)
+        self.assertEqual(data['average_progress'], 50.0)
+        self.assertEqual([step['completed'] for step in data['funnel']], [2, 0])
+        self.assertEqual(data['time_to_complete']['median_days'], 10.0)
+
+    def test_computed_on_first_use_then_served_from_cache(self):
+        course_stats(self.course)
+        self.assertTrue(CourseStats.objects.filter(course=self.course).exists())
+        with self.assertNumQueries(0):
+            course_stats(self.course)
+
+    def test_cache_miss_reads_the_table(self):
+        refresh_course_stats(self.course)
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(course_stats(self.course).data['students'], 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('compute_course_stats', stdout=out)
+        self.assertIn('1 course(s)', out.getvalue())
+        self.assertEqual(CourseStats.objects.get(course=self.course).data['students'], 3)
+
+    def test_view_refresh(self):
+        url = reverse('courses:course_analytics', args=[self.course.pk])
+        self.client.force_login(self.instructor)
+        self.assertEqual(self.client.get(url).context['stats']['students'], 3)
+
+        enroll(make_user('newcomer'), self.course)
+        self.assertEqual(self.client.get(url).context['stats']['students'], 3)
+        self.client.post(url)
+        self.assertEqual(self.client.get(url).context['stats']['students'], 4)
+
+    def test_view_is_for_the_course_instructor_only(self):
+        self.client.force_login(make_user('other', User.Role.INSTRUCTOR))
+        url = reverse('courses:course_analytics', args=[self.course.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,169 @@
+import threading
+from unittest import mock
+
+from django.contrib.messages import constants, get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from courses import caching
+from courses.caching import bump_namespace, cache_per_segment, get_or_compute, namespace_version
+from courses.models import Course
+from .factories import enroll, make_lesson, make_user
+
+
+class NamespaceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_changes_the_version(self):
+        version = namespace_version('catalog')
+        self.assertEqual(namespace_version('catalog'), version)
+        bump_namespace('catalog')
+        self.assertNotEqual(namespace_version('catalog'), version)
+
+    def test_evicted_version_does_not_come_back(self):
+        version = namespace_version('catalog')
+        cache.delete('ns:catalog')
+        bump_namespace('catalog')
+        self.assertGreater(namespace_version('catalog'), version)
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_computes_once(self):
+        self.assertEqual(get_or_compute('key', self.compute, 60), 1)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_refreshes_early_near_expiry(self):
+        get_or_compute('key', self.compute, 60)
+        # A draw of 1e-12 makes the next request treat the entry as expired
+        with mock.patch.object(caching.random, 'random', return_value=0):
+            value, delta, expires = cache.get('key')
+            cache.set('key', (value, 1.0, expires - 59))
+            self.assertEqual(get_or_compute('key', self.compute, 60), 2)
+
+    def test_early_refresh_keeps_serving_while_another_worker_holds_the_lock(self):
+        get_or_compute('key', self.compute, 60)
+        cache.add('lock:key', 1)
+        with mock.patch.object(caching.random, 'random', return_value=0):
+            value, _, expires = cache.get('key')
+            cache.set('key', (value, 1.0, expires - 59))
+            self.assertEqual(get_or_compute('key', self.compute, 60), 1)
+        self.assertEqual(self.calls, 1)
+
+    @mock.patch.object(caching, 'LOCK_WAIT', 1.0)
+    def test_cold_miss_waits_for_the_winner(self):
+        cache.add('lock:key', 1)
+        timer = threading.Timer(0.1, caching.refresh_computed, ['key', lambda: 'winner', 60])
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'winner')
+        self.assertEqual(self.calls, 0)
+
+    @mock.patch.object(caching, 'LOCK_WAIT', 0.1)
+    def test_cold_miss_computes_when_the_winner_is_gone(self):
+        cache.add('lock:key', 1)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 1)
+
+
+class CachePerSegmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_user('student')
+        cls.other = make_user('other')
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+
+    def view(self, segment='role'):
+        @cache_per_segment(60, segment=segment, namespaces=['catalog'])
+        def page(request):
+            self.calls += 1
+            return HttpResponse(f'render {self.calls}')
+        return page
+
+    def get(self, view, user, path='/', method='get', message=None):
+        request = getattr(self.factory, method)(path)
+        request.user = user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        if message:
+            request._messages.add(constants.SUCCESS, message)
+        return request, view(request)
+
+    def test_cached_per_user(self):
+        view = self.view(segment='user')
+        self.assertEqual(self.get(view, self.student)[1].content, b'render 1')
+        self.assertEqual(self.get(view, self.student)[1].content, b'render 1')
+        self.assertEqual(self.get(view, self.other)[1].content, b'render 2')
+
+    def test_cached_per_role(self):
+        view = self.view()
+        self.get(view, self.student)
+        self.assertEqual(self.get(view, self.other)[1].content, b'render 1')
+
+    def test_query_string_is_part_of_the_key(self):
+        view = self.view()
+        self.get(view, self.student, '/?level=BEGINNER')
+        self.assertEqual(self.get(view, self.student, '/?level=ADVANCED')[1].content, b'render 2')
+
+    def test_bump_namespace_drops_the_page(self):
+        view = self.view()
+        self.get(view, self.student)
+        bump_namespace('catalog')
+        self.assertEqual(self.get(view, self.student)[1].content, b'render 2')
+
+    def test_post_is_not_cached(self):
+        view = self.view()
+        self.get(view, self.student, method='post')
+        self.get(view, self.student, method='post')
+        self.assertEqual(self.calls, 2)
+
+    def test_pending_messages_skip_the_cache(self):
+        view = self.view()
+        self.get(view, self.student)
+        request, response = self.get(view, self.student, message='Enrolled')
+        self.assertEqual(response.content, b'render 2')
+        self.assertEqual(len(get_messages(request)), 1)
+
+    def test_stored_pages_are_private(self):
+        _, response = self.get(self.view(), self.student)
+        self.assertIn('private', response['Cache-Control'])
+
+
+class CourseListCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_user('student')
+        cls.course = make_lesson(make_user('teacher', User.Role.INSTRUCTOR)).course
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def test_enrollment_refreshes_the_catalog(self):
+        url = reverse('courses:course_list')
+        self.assertContains(self.client.get(url), 'Course')
+        enroll(make_user('newcomer'), self.course)
+        response = self.client.get(url)
+        self.assertEqual(response.context['courses'][0].enrolled_count, 1)
+
+    def test_new_course_refreshes_the_catalog(self):
+        url = reverse('courses:course_list')
+        self.client.get(url)
+        Course.objects.create(title='Fresh', description='New', instructor=self.course.instructor, is_published=True)
+        self.assertContains(self.client.get(url), 'Fresh')
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from courses.pagination import PAGE_SIZE
+from .factories import enroll, make_assignment, make_lesson, make_user
+
+
+class CourseRosterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.lesson = make_lesson(cls.instructor)
+        cls.course = cls.lesson.course
+        make_assignment(cls.lesson)
+        cls.url = reverse('courses:course_manage', args=[cls.course.pk])
+
+    def setUp(self):
+        self.client.force_login(self.instructor)
+
+    def add_students(self, count, first=0):
+        for number in range(first, first + count):
+            enroll(make_user(f'student{number:03}'), self.course)
+
+    def usernames(self, response):
+        return [enrollment.student.username for enrollment in response.context['enrollments']]
+
+    def test_pages_cover_the_roster_once_in_username_order(self):
+        self.add_students(PAGE_SIZE + 5)
+        first = self.client.get(self.url)
+        self.assertTrue(first.context['is_first_page'])
+        self.assertEqual(len(self.usernames(first)), PAGE_SIZE)
+
+        second = self.client.get(self.url, {'after': first.context['next_cursor']})
+        self.assertFalse(second.context['is_first_page'])
+        self.assertIsNone(second.context['next_cursor'])
+        usernames = self.usernames(first) + self.usernames(second)
+        self.assertEqual(usernames, [f'student{number:03}' for number in range(PAGE_SIZE + 5)])
+
+    def test_search(self):
+        self.add_students(3)
+        response = self.client.get(self.url, {'search': 'student001'})
+        self.assertEqual(self.usernames(response), ['student001'])
+
+    def test_invalid_cursor_shows_the_first_page(self):
+        self.add_students(3)
+        response = self.client.get(self.url, {'after': 'not-a-cursor'})
+        self.assertEqual(len(self.usernames(response)), 3)
+
+    def test_query_count_does_not_grow_with_the_roster(self):
+        self.add_students(2)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        self.add_students(PAGE_SIZE, first=2)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(many), len(few))
+
+    def test_other_instructors_get_404(self):
+        self.client.force_login(make_user('other', User.Role.INSTRUCTOR))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from courses.dashboards import instructor_summary
+from courses.models import AssignmentSubmission, Enrollment
+from .factories import enroll, make_assignment, make_lesson, make_submission, make_user
+
+
+class InstructorSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.lesson = make_lesson(cls.instructor)
+        cls.course = cls.lesson.course
+        cls.assignment = make_assignment(cls.lesson)
+        cls.students = [make_user(f'student{number}') for number in range(3)]
+        for student in cls.students:
+            enroll(student, cls.course)
+        make_submission(cls.assignment, cls.students[0])
+
+    def setUp(self):
+        cache.clear()
+
+    def summary(self):
+        return instructor_summary(self.instructor)
+
+    def test_figures(self):
+        Enrollment.objects.filter(student=self.students[0]).update(progress=60)
+        summary = self.summary()
+        self.assertEqual(summary['total_students'], 3)
+        self.assertEqual(summary['pending_submissions'], 1)
+        [course] = summary['my_courses']
+        self.assertEqual(course.enrolled_count, 3)
+        self.assertAlmostEqual(course.average_progress, 20)
+
+    def test_one_query_whatever_the_number_of_courses(self):
+        for _ in range(3):
+            make_lesson(self.instructor)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.summary()['my_courses']), 4)
+
+    def test_served_from_the_cache(self):
+        self.summary()
+        with self.assertNumQueries(0):
+            self.summary()
+
+    def test_new_enrollment_invalidates(self):
+        self.summary()
+        enroll(make_user('newcomer'), self.course)
+        self.assertEqual(self.summary()['total_students'], 4)
+
+    def test_new_submission_invalidates(self):
+        self.summary()
+        make_submission(self.assignment, self.students[1])
+        self.assertEqual(self.summary()['pending_submissions'], 2)
+
+    def test_deleting_a_deferred_submission_invalidates(self):
+        self.summary()
+        AssignmentSubmission.objects.only('id').get().delete()
+        self.assertEqual(self.summary()['pending_submissions'], 0)
+
+    def test_bulk_grading_invalidates(self):
+        self.summary()
+        self.client.force_login(self.instructor)
+        submission = AssignmentSubmission.objects.get()
+        self.client.post(reverse('courses:assignment_grade_bulk', args=[self.assignment.pk]), {
+            'form-TOTAL_FORMS': 1, 'form-INITIAL_FORMS': 1, 'form-0-id': submission.pk,
+            'form-0-grade': 90, 'form-0-status': AssignmentSubmission.Status.GRADED, 'form-0-feedback': '',
+        })
+        self.assertEqual(self.summary()['pending_submissions'], 0)
+
+    def test_dashboard_renders_the_summary(self):
+        self.client.force_login(self.instructor)
+        self.client.get(reverse('courses:dashboard'))
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('courses:dashboard'))
+        self.assertContains(response, '3 students')
+        self.assertFalse(any('courses_course' in query['sql'] for query in captured))
@@ -0,0 +1,66 @@
+import csv
+import io
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from courses.models import AssignmentSubmission
+from eduvolve.testing import TemporaryMediaMixin
+from .factories import make_assignment, make_lesson, make_submission, make_user
+
+
+class SubmissionsZipTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.assignment = make_assignment(make_lesson(cls.instructor))
+        cls.url = reverse('courses:assignment_download_all', args=[cls.assignment.pk])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.instructor)
+
+    def submit(self, username, content, filename='essay.pdf'):
+        submission = AssignmentSubmission(assignment=self.assignment, student=make_user(username))
+        submission.submission_file.save(filename, ContentFile(content), save=False)
+        submission.save()
+        return submission
+
+    def download(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def manifest(self, archive):
+        return list(csv.DictReader(io.StringIO(archive.read('manifest.csv').decode())))
+
+    def test_archive_holds_every_file_and_a_manifest(self):
+        self.submit('alice', b'alice essay')
+        self.submit('bob', b'bob essay', 'essay.PDF')
+        archive = self.download()
+        self.assertEqual(archive.read('submissions/alice.pdf'), b'alice essay')
+        self.assertEqual(archive.read('submissions/bob.pdf'), b'bob essay')
+        self.assertEqual(
+            [(row['username'], row['file']) for row in self.manifest(archive)],
+            [('alice', 'submissions/alice.pdf'), ('bob', 'submissions/bob.pdf')])
+
+    def test_missing_files_are_listed_in_the_manifest(self):
+        make_submission(self.assignment, make_user('carol'))
+        archive = self.download()
+        self.assertEqual(archive.namelist(), ['manifest.csv'])
+        self.assertEqual(self.manifest(archive)[0]['file'], 'missing')
+
+    def test_large_files_are_streamed_in_pieces(self):
+        self.submit('alice', b'x' * (3 * 64 * 1024))
+        response = self.client.get(self.url)
+        pieces = list(response.streaming_content)
+        self.assertGreater(len(pieces), 2)
+        self.assertLess(max(len(piece) for piece in pieces), 3 * 64 * 1024)
+
+    def test_other_instructors_are_refused(self):
+        self.client.force_login(make_user('other', User.Role.INSTRUCTOR))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,83 @@
+import csv
+import io
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.exports import stream_gradebook_csv
+from courses.models import Lesson, QuizAttempt
+from .factories import enroll, make_assignment, make_lesson, make_quiz, make_submission, make_user
+
+
+class GradebookTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        first = make_lesson(cls.instructor, order=1)
+        cls.course = first.course
+        second = Lesson.objects.create(course=cls.course, title='Second', description='', order=2)
+        cls.quiz = make_quiz(first)
+        cls.assignment = make_assignment(second)
+        cls.url = reverse('courses:course_gradebook', args=[cls.course.pk])
+
+    def setUp(self):
+        self.client.force_login(self.instructor)
+
+    def add_students(self, count, first=0):
+        students = []
+        for number in range(first, first + count):
+            student = make_user(f'student{number:03d}')
+            enroll(student, self.course)
+            QuizAttempt.objects.create(
+                student=student, quiz=self.quiz, score=number, submitted_at=timezone.now())
+            make_submission(self.assignment, student, grade=50 + number)
+            students.append(student)
+        return students
+
+    def test_rows_align_scores_with_columns(self):
+        self.add_students(2)
+        latecomer = make_user('student999')
+        enroll(latecomer, self.course)
+        rows = {row['student__username']: row for row in self.client.get(self.url).context['rows']}
+        self.assertEqual(rows['student001']['quiz_scores'], [1])
+        self.assertEqual(rows['student001']['assignment_grades'][0]['grade'], 51)
+        self.assertEqual(rows['student999']['quiz_scores'], [None])
+        self.assertEqual(rows['student999']['assignment_grades'], [None])
+
+    def test_query_count_does_not_grow_with_students(self):
+        self.add_students(2)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        self.add_students(10, first=2)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(many), len(few))
+
+    def test_search(self):
+        self.add_students(12)
+        rows = self.client.get(self.url, {'search': 'student011'}).context['rows']
+        self.assertEqual([row['student__username'] for row in rows], ['student011'])
+
+    def test_csv_export_streams_every_student(self):
+        self.add_students(5)
+        response = self.client.get(reverse('courses:course_gradebook_export', args=[self.course.pk]))
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['username', 'first_name', 'last_name', 'email', 'progress',
+                                   'Quiz: Quiz (%)', 'Assignment: Essay (%)'])
+        self.assertEqual([row[0] for row in rows[1:]], [f'student{number:03d}' for number in range(5)])
+        self.assertEqual(rows[3][5:], ['2.0', '52.0'])
+
+    def test_csv_chunks_cover_every_student_once(self):
+        self.add_students(5)
+        lines = list(stream_gradebook_csv(self.course, chunk_size=2))
+        self.assertEqual(len(lines), 6)
+
+    def test_other_instructors_are_refused(self):
+        self.client.force_login(make_user('other', User.Role.INSTRUCTOR))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
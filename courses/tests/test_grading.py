@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from courses.grading import BULK_GRADING_PAGE_SIZE, apply_grades, parse_grade_csv
+from courses.models import AssignmentSubmission
+from .factories import make_assignment, make_lesson, make_submission, make_user
+
+PENDING = AssignmentSubmission.Status.PENDING
+GRADED = AssignmentSubmission.Status.GRADED
+
+
+def formset_data(formset, **changes):
+    """POST data of a rendered formset, with changes applied to every row"""
+    data = {
+        f'{formset.prefix}-TOTAL_FORMS': len(formset.forms),
+        f'{formset.prefix}-INITIAL_FORMS': len(formset.forms),
+    }
+    for form in formset.forms:
+        values = {'id': form.instance.pk, 'grade': form.instance.grade or '',
+                  'status': form.instance.status, 'feedback': form.instance.feedback, **changes}
+        data.update({f'{form.prefix}-{field}': value for field, value in values.items()})
+    return data
+
+
+class GradingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.assignment = make_assignment(make_lesson(cls.instructor), max_points=50)
+
+    def setUp(self):
+        self.client.force_login(self.instructor)
+
+    def points(self, student):
+        return User.objects.get(pk=student.pk).total_points
+
+
+class BulkGradingTests(GradingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        students = User.objects.bulk_create([User(username=f'student{number}') for number in range(300)])
+        AssignmentSubmission.objects.bulk_create([
+            AssignmentSubmission(assignment=cls.assignment, student=student, submission_file='submissions/a.pdf')
+            for student in students
+        ])
+        cls.url = reverse('courses:assignment_grade_bulk', args=[cls.assignment.pk])
+
+    def test_pages_stay_below_the_field_limit(self):
+        response = self.client.get(self.url)
+        formset = response.context['formset']
+        self.assertEqual(len(formset.forms), BULK_GRADING_PAGE_SIZE)
+        data = formset_data(formset, grade=90, status=GRADED)
+        self.assertLess(len(data), settings.DATA_UPLOAD_MAX_NUMBER_FIELDS)
+
+        response = self.client.post(self.url, data)
+        self.assertRedirects(response, reverse('courses:assignment_submissions', args=[self.assignment.pk]))
+        self.assertEqual(self.assignment.submissions.filter(status=GRADED).count(), BULK_GRADING_PAGE_SIZE)
+        self.assertEqual(User.objects.filter(total_points=45).count(), BULK_GRADING_PAGE_SIZE)
+
+    def test_pages_cover_every_submission_once(self):
+        seen = []
+        response = self.client.get(self.url)
+        while True:
+            seen += [form.instance.pk for form in response.context['formset'].forms]
+            if not response.context['next_cursor']:
+                break
+            response = self.client.get(self.url, {'after': response.context['next_cursor']})
+        self.assertEqual(sorted(seen), sorted(self.assignment.submissions.values_list('pk', flat=True)))
+
+    def test_graded_rows_move_behind_pending_ones(self):
+        self.client.post(self.url, formset_data(self.client.get(self.url).context['formset'], grade=90, status=GRADED))
+        forms = self.client.get(self.url).context['formset'].forms
+        self.assertTrue(all(form.instance.status == PENDING for form in forms))
+
+    def test_regrading_does_not_pay_twice(self):
+        formset = self.client.get(self.url).context['formset']
+        student = formset.forms[0].instance.student
+        self.client.post(self.url, formset_data(formset, grade=90, status=GRADED))
+        self.client.post(self.url, formset_data(formset, grade=100, status=GRADED))
+        self.assertEqual(self.points(student), 45)
+        self.assertEqual(AssignmentSubmission.objects.get(pk=formset.forms[0].instance.pk).grade, 100)
+
+    def test_rows_of_other_assignments_are_ignored(self):
+        other = make_submission(make_assignment(make_lesson(make_user('other', User.Role.INSTRUCTOR))),
+                                make_user('outsider'))
+        formset = self.client.get(self.url).context['formset']
+        data = formset_data(formset, grade=90, status=GRADED)
+        data[f'{formset.forms[0].prefix}-id'] = other.pk
+        self.client.post(self.url, data)
+        self.assertEqual(AssignmentSubmission.objects.get(pk=other.pk).status, PENDING)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile(
+            'grades.csv', b'username,grade,feedback,status\nstudent1,80,Good,graded\nstudent2,60,,GRADED\n')
+        response = self.client.post(self.url, {'upload': '1', 'csv_file': upload})
+        self.assertRedirects(response, reverse('courses:assignment_submissions', args=[self.assignment.pk]))
+        self.assertEqual(self.points(User.objects.get(username='student1')), 40)
+        self.assertEqual(self.assignment.submissions.filter(status=GRADED).count(), 2)
+
+    def test_csv_without_feedback_or_status_keeps_them(self):
+        AssignmentSubmission.objects.filter(student__username='student1').update(
+            feedback='Well argued', status=GRADED, grade=70)
+        upload = SimpleUploadedFile('grades.csv', b'username,grade\nstudent1,80\nstudent2,60\n')
+        self.client.post(self.url, {'upload': '1', 'csv_file': upload})
+        first = AssignmentSubmission.objects.get(student__username='student1')
+        second = AssignmentSubmission.objects.get(student__username='student2')
+        self.assertEqual((first.grade, first.feedback, first.status), (80, 'Well argued', GRADED))
+        self.assertEqual((second.grade, second.status), (60, PENDING))
+
+    def test_overlapping_imports_pay_once(self):
+        sheet = b'username,grade,status\nstudent1,80,GRADED\n'
+        first, errors = parse_grade_csv(self.assignment, SimpleUploadedFile('a.csv', sheet))
+        second, _ = parse_grade_csv(self.assignment, SimpleUploadedFile('b.csv', sheet))
+        self.assertEqual(errors, [])
+        apply_grades(first, self.instructor)
+        apply_grades(second, self.instructor)
+        self.assertEqual(self.points(User.objects.get(username='student1')), 40)
+
+    def test_csv_with_an_invalid_row_saves_nothing(self):
+        upload = SimpleUploadedFile('grades.csv', b'username,grade\nstudent1,80\nnobody,60\nstudent2,150\n')
+        response = self.client.post(self.url, {'upload': '1', 'csv_file': upload})
+        self.assertEqual([line for line, _ in response.context['row_errors']], [3, 4])
+        self.assertFalse(self.assignment.submissions.filter(status=GRADED).exists())
+
+
+class SingleGradingTests(GradingTestCase):
+    def grade(self, submission, grade, status=GRADED):
+        return self.client.post(reverse('courses:assignment_grade', args=[submission.pk]), {
+            'grade': grade, 'feedback': '', 'status': status})
+
+    def test_points_are_paid_when_first_graded(self):
+        student = make_user('student')
+        submission = make_submission(self.assignment, student)
+        self.grade(submission, 80)
+        self.assertEqual(self.points(student), 40)
+
+    def test_regrading_does_not_pay_twice(self):
+        student = make_user('student')
+        submission = make_submission(self.assignment, student)
+        self.grade(submission, 80)
+        self.grade(submission, 100)
+        self.assertEqual(self.points(student), 40)
+        self.assertEqual(AssignmentSubmission.objects.get(pk=submission.pk).grade, 100)
+
+    def test_returned_submissions_earn_nothing(self):
+        student = make_user('student')
+        self.grade(make_submission(self.assignment, student), 80, AssignmentSubmission.Status.RETURNED)
+        self.assertEqual(self.points(student), 0)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import AssignmentSubmission
+from courses.pagination import PAGE_SIZE
+from .factories import make_assignment, make_lesson, make_submission, make_user
+
+PENDING = AssignmentSubmission.Status.PENDING
+GRADED = AssignmentSubmission.Status.GRADED
+
+
+class GradingQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.assignment = make_assignment(make_lesson(cls.instructor))
+        cls.url = reverse('courses:assignment_submissions', args=[cls.assignment.pk])
+
+    def setUp(self):
+        self.client.force_login(self.instructor)
+
+    def add_submissions(self, count, status=PENDING, first=0):
+        """Submissions submitted a minute apart, the lower numbers earlier"""
+        submissions = []
+        for number in range(first, first + count):
+            submission = make_submission(self.assignment, make_user(f'student{number}'), status=status)
+            AssignmentSubmission.objects.filter(pk=submission.pk).update(
+                submitted_at=timezone.now() - timedelta(minutes=1000 - number))
+            submissions.append(submission)
+        return submissions
+
+    def test_counts_by_status(self):
+        self.add_submissions(3)
+        self.add_submissions(2, GRADED, first=3)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['total_submissions'], 5)
+        self.assertEqual(response.context['pending_count'], 3)
+        self.assertEqual(response.context['graded_count'], 2)
+
+    def test_query_count_does_not_grow_with_submissions(self):
+        self.add_submissions(2)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        self.add_submissions(20, first=2)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(many), len(few))
+
+    def test_pending_first_oldest_first(self):
+        graded = self.add_submissions(2, GRADED)
+        pending = self.add_submissions(2, first=2)
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['submissions']), pending + graded)
+
+    def test_status_filter(self):
+        self.add_submissions(2, GRADED)
+        pending = self.add_submissions(2, first=2)
+        response = self.client.get(self.url, {'status': PENDING})
+        self.assertEqual(list(response.context['submissions']), pending)
+
+    def test_keyset_pages_cover_the_queue_once(self):
+        submissions = self.add_submissions(PAGE_SIZE + 5)
+        first = self.client.get(self.url)
+        self.assertEqual(len(first.context['submissions']), PAGE_SIZE)
+        second = self.client.get(self.url, {'after': first.context['next_cursor']})
+        self.assertIsNone(second.context['next_cursor'])
+        self.assertEqual(
+            list(first.context['submissions']) + list(second.context['submissions']), submissions)
+
+    def test_malformed_cursor_starts_over(self):
+        submissions = self.add_submissions(2)
+        response = self.client.get(self.url, {'after': 'not-a-cursor'})
+        self.assertEqual(list(response.context['submissions']), submissions)
+
+    def test_grade_next_jumps_to_oldest_pending(self):
+        self.add_submissions(1, GRADED)
+        oldest, newer = self.add_submissions(2, first=1)
+        response = self.client.get(reverse('courses:assignment_grade_next', args=[self.assignment.pk]))
+        self.assertRedirects(response, reverse('courses:assignment_grade', args=[oldest.pk]))
+
+    def test_save_and_grade_next(self):
+        oldest, newer = self.add_submissions(2)
+        response = self.client.post(reverse('courses:assignment_grade', args=[oldest.pk]), {
+            'grade': 80, 'feedback': '', 'status': GRADED, 'grade_next': '1'})
+        self.assertRedirects(response, reverse('courses:assignment_grade', args=[newer.pk]))
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from courses.models import Assignment, AssignmentSubmission, Course, Enrollment, Quiz, QuizAttempt
+from eduvolve.testing import QueryPlanTestCase
+
+
+class HotQueryIndexTests(QueryPlanTestCase):
+    def setUp(self):
+        self.enrollment = Enrollment.objects.select_related('course', 'student').first()
+
+    def test_course_roster(self):
+        self.assertUsesIndex(
+            Enrollment.objects.filter(course=self.enrollment.course, is_active=True),
+            'enrollment_active_idx', ordered=True)
+
+    def test_student_enrollments(self):
+        self.assertUsesIndex(Enrollment.objects.filter(student=self.enrollment.student, is_active=True))
+
+    def test_completed_lessons(self):
+        self.assertUsesIndex(
+            self.enrollment.lesson_progress.filter(is_completed=True).order_by(), 'progress_completed_idx')
+
+    def test_quiz_attempt_of_student(self):
+        self.assertUsesIndex(QuizAttempt.objects.filter(student=self.enrollment.student, quiz=Quiz.objects.first()))
+
+    def test_grading_queue(self):
+        assignment = Assignment.objects.create(
+            lesson=self.enrollment.course.lessons.first(), title='Essay', description='Write an essay',
+            due_date=timezone.now() + timedelta(days=7))
+        self.assertUsesIndex(
+            AssignmentSubmission.objects.filter(
+                assignment=assignment, status=AssignmentSubmission.Status.PENDING).order_by('submitted_at'),
+            'submission_queue_idx', ordered=True)
+
+    def test_published_catalog(self):
+        self.assertUsesIndex(Course.objects.filter(is_published=True), 'course_catalog_idx', ordered=True)
+
+    def test_published_lessons_of_course(self):
+        self.assertUsesIndex(self.enrollment.course.lessons.filter(is_published=True), ordered=True)
@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.dashboards import compute_platform_stats, platform_stats
+from courses.models import AssignmentSubmission, Course, Enrollment, PlatformSnapshot
+from .factories import enroll, make_assignment, make_lesson, make_submission, make_user
+
+
+class EmptyPlatformStatsTests(TestCase):
+    def test_empty_tables_count_zero(self):
+        stats = compute_platform_stats()
+        self.assertEqual(set(stats.values()), {0})
+
+
+class PlatformStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', User.Role.ADMIN)
+        lesson = make_lesson(make_user('teacher', User.Role.INSTRUCTOR))
+        draft = make_lesson(lesson.course.instructor).course
+        Course.objects.filter(pk=draft.pk).update(is_published=False)
+        assignment = make_assignment(lesson)
+        for number in range(3):
+            student = make_user(f'student{number}', last_activity_date=timezone.localdate())
+            enroll(student, lesson.course)
+            status = AssignmentSubmission.Status.GRADED if number else AssignmentSubmission.Status.PENDING
+            make_submission(assignment, student, status=status)
+        Enrollment.objects.filter(student__username='student0').update(completed_at=timezone.now())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts(self):
+        self.assertEqual(compute_platform_stats(), {
+            'total_users': 5, 'students': 3, 'instructors': 1, 'admins': 1, 'active_students': 3,
+            'courses': 2, 'published_courses': 1, 'enrollments': 3, 'completions': 1,
+            'pending_submissions': 1,
+        })
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            compute_platform_stats()
+
+    def test_cached_and_recorded_as_todays_snapshot(self):
+        platform_stats()
+        self.assertEqual(PlatformSnapshot.objects.get(taken_on=timezone.localdate()).students, 3)
+        with self.assertNumQueries(0):
+            platform_stats()
+
+    def test_command_refreshes_the_cache(self):
+        platform_stats()
+        make_user('newcomer')
+        call_command('snapshot_platform_stats', stdout=StringIO())
+        self.assertEqual(platform_stats()['total_users'], 6)
+        self.assertEqual(PlatformSnapshot.objects.get().total_users, 6)
+
+    def test_admin_dashboard(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('courses:dashboard'))
+        self.assertEqual(response.context['stats']['enrollments'], 3)
+        self.assertEqual(len(response.context['trend']), 1)
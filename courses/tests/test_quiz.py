@@ -0,0 +1,96 @@
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses import autosave
+from courses.models import QuizAttempt, QuizSession
+from .factories import correct_answers, make_lesson, make_quiz, make_user
+
+
+class QuizTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.student = make_user('student')
+        cls.quiz = make_quiz(make_lesson(cls.instructor), time_limit_minutes=10)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+        self.take_url = reverse('courses:quiz_take', args=[self.quiz.pk])
+        self.autosave_url = reverse('courses:quiz_autosave', args=[self.quiz.pk])
+
+    def backdate_session(self, minutes):
+        QuizSession.objects.filter(student=self.student, quiz=self.quiz).update(
+            started_at=timezone.now() - timedelta(minutes=minutes))
+
+    def submit(self, answers, token=None):
+        return self.client.post(self.take_url, {**answers, 'submission_token': token or uuid.uuid4()})
+
+
+class QuizTimeLimitTests(QuizTestCase):
+    def test_reload_after_cache_loss_keeps_the_start_time(self):
+        self.client.get(self.take_url)
+        self.backdate_session(8)
+        cache.clear()
+
+        response = self.client.get(self.take_url)
+        self.assertLessEqual(response.context['seconds_remaining'], 120)
+        self.assertEqual(QuizSession.objects.filter(student=self.student, quiz=self.quiz).count(), 1)
+
+    def test_answers_posted_after_expiry_are_ignored(self):
+        self.client.get(self.take_url)
+        self.backdate_session(20)
+        cache.clear()
+
+        self.assertEqual(self.client.get(self.take_url).context['seconds_remaining'], 0)
+        self.submit(correct_answers(self.quiz))
+        self.assertEqual(QuizAttempt.objects.get(student=self.student, quiz=self.quiz).score, 0)
+
+    def test_answers_buffered_in_time_count_after_expiry(self):
+        self.client.get(self.take_url)
+        self.client.post(self.autosave_url, correct_answers(self.quiz))
+        self.backdate_session(20)
+
+        self.submit({})
+        self.assertEqual(QuizAttempt.objects.get(student=self.student, quiz=self.quiz).score, 100)
+
+    def test_answers_posted_in_time_are_graded(self):
+        self.client.get(self.take_url)
+        self.submit(correct_answers(self.quiz))
+        self.assertEqual(QuizAttempt.objects.get(student=self.student, quiz=self.quiz).score, 100)
+        self.assertFalse(QuizSession.objects.filter(student=self.student, quiz=self.quiz).exists())
+
+    def test_autosave_after_expiry_is_rejected(self):
+        self.client.get(self.take_url)
+        self.backdate_session(20)
+        self.assertEqual(self.client.post(self.autosave_url, correct_answers(self.quiz)).status_code, 403)
+
+    def test_autosave_needs_a_started_session(self):
+        self.assertEqual(self.client.post(self.autosave_url, correct_answers(self.quiz)).status_code, 400)
+
+
+class QuizAutosaveTests(QuizTestCase):
+    def test_saves_of_different_questions_are_kept(self):
+        session = autosave.start_session(self.student, self.quiz)
+        first, second = self.quiz.questions.all()
+        # Two requests that loaded the session before either saved
+        autosave.save_answers(self.quiz, session, {first.pk: first.answers.first().pk})
+        autosave.save_answers(self.quiz, session, {second.pk: second.answers.first().pk})
+
+        saved = autosave.saved_answers(session, self.quiz.questions.all())
+        self.assertEqual(set(saved), {first.pk, second.pk})
+
+    def test_reload_shows_buffered_answers(self):
+        self.client.get(self.take_url)
+        response = self.client.post(self.autosave_url, correct_answers(self.quiz))
+        self.assertEqual(response.json()['saved'], 2)
+        saved = self.client.get(self.take_url).context['saved_answers']
+        self.assertEqual(
+            {f'question_{question_id}': answer_id for question_id, answer_id in saved.items()},
+            correct_answers(self.quiz))
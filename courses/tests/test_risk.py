@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import Enrollment, QuizAttempt
+from courses.risk import at_risk_enrollments, risk_score, score_enrollments
+from .factories import enroll, make_assignment, make_lesson, make_quiz, make_submission, make_user
+
+
+class RiskScoreTests(SimpleTestCase):
+    def score(self, **signals):
+        defaults = {
+            'progress': 100, 'days_enrolled': 28, 'duration_days': 28, 'days_inactive': 0,
+            'missing': 0, 'past_due': 0, 'quiz_average': None,
+        }
+        return risk_score(**{**defaults, **signals})
+
+    def test_on_track_student_scores_zero(self):
+        self.assertEqual(self.score(), 0)
+
+    def test_every_signal_saturated_scores_100(self):
+        self.assertEqual(self.score(progress=0, days_inactive=30, missing=2, past_due=2, quiz_average=0), 100)
+
+    def test_progress_is_measured_against_the_schedule(self):
+        # Half way through the course at half progress is on schedule
+        self.assertEqual(self.score(progress=50, days_enrolled=14), 0)
+        self.assertEqual(self.score(progress=0, days_enrolled=14), 17.5)
+
+    def test_no_quiz_attempt_is_neutral(self):
+        self.assertEqual(self.score(quiz_average=None), self.score(quiz_average=100))
+
+
+class ScoreEnrollmentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lesson = make_lesson(make_user('teacher', User.Role.INSTRUCTOR))
+        cls.course = cls.lesson.course
+        cls.assignment = make_assignment(cls.lesson, due_date=timezone.now() - timedelta(days=1))
+        quiz = make_quiz(cls.lesson)
+        today = timezone.localdate()
+
+        cls.diligent = enroll(make_user('diligent', last_activity_date=today), cls.course)
+        make_submission(cls.assignment, cls.diligent.student)
+        QuizAttempt.objects.create(student=cls.diligent.student, quiz=quiz, score=100, submitted_at=timezone.now())
+
+        cls.absent = enroll(make_user('absent', last_activity_date=today - timedelta(days=30)), cls.course)
+        QuizAttempt.objects.create(student=cls.absent.student, quiz=quiz, score=0, submitted_at=timezone.now())
+
+        Enrollment.objects.filter(pk__in=[cls.diligent.pk, cls.absent.pk]).update(
+            enrolled_at=timezone.now() - timedelta(weeks=4))
+        Enrollment.objects.filter(pk=cls.diligent.pk).update(progress=100)
+
+        cls.inactive = enroll(make_user('inactive'), cls.course)
+        Enrollment.objects.filter(pk=cls.inactive.pk).update(is_active=False)
+
+    def test_scores_active_enrollments(self):
+        self.assertEqual(score_enrollments(), 2)
+        scores = dict(Enrollment.objects.values_list('student__username', 'risk_score'))
+        self.assertEqual(scores['diligent'], 0)
+        self.assertEqual(scores['absent'], 100)
+        self.assertIsNone(scores['inactive'])
+
+    def test_query_count_does_not_grow_with_enrollments(self):
+        with CaptureQueriesContext(connection) as few:
+            score_enrollments()
+        for number in range(10):
+            enroll(make_user(f'student{number}'), self.course)
+        with CaptureQueriesContext(connection) as many:
+            score_enrollments()
+        self.assertEqual(len(many), len(few))
+
+    def test_at_risk_enrollments(self):
+        score_enrollments()
+        self.assertEqual(list(at_risk_enrollments(self.course)), [self.absent])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('score_at_risk', stdout=out)
+        self.assertIn('Successfully scored 2 enrollment(s)!', out.getvalue())
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from courses.benchmarks import load_baseline, regressions, run_benchmarks
+from courses.models import Enrollment, LessonProgress, QuizAttempt, QuizSession
+from eduvolve.testing import seed_small_scale
+
+
+class SeedScaleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_small_scale()
+
+    def test_generates_users_and_activity(self):
+        self.assertEqual(User.objects.filter(role=User.Role.STUDENT).count(), 40)
+        self.assertEqual(User.objects.filter(role=User.Role.INSTRUCTOR).count(), 3)
+        self.assertTrue(User.objects.filter(role=User.Role.ADMIN, is_staff=True).exists())
+        self.assertTrue(Enrollment.objects.exists())
+        self.assertTrue(LessonProgress.objects.filter(is_completed=True).exists())
+        self.assertTrue(QuizAttempt.objects.exists())
+
+    def test_progress_matches_completed_lessons(self):
+        for enrollment in Enrollment.objects.prefetch_related('lesson_progress', 'course__lessons'):
+            completed = sum(progress.is_completed for progress in enrollment.lesson_progress.all())
+            lessons = len(enrollment.course.lessons.all())
+            self.assertAlmostEqual(enrollment.progress, round(completed * 100 / lessons, 2))
+            self.assertEqual(enrollment.completed_at is not None, completed == lessons)
+
+    def test_timestamps_follow_the_enrollment(self):
+        now = timezone.now()
+        for enrollment in Enrollment.objects.prefetch_related('lesson_progress'):
+            self.assertLess(enrollment.enrolled_at, now - timedelta(hours=23))
+            if enrollment.completed_at:
+                self.assertLessEqual(enrollment.enrolled_at, enrollment.completed_at)
+            for progress in enrollment.lesson_progress.all():
+                if progress.completed_at:
+                    self.assertLessEqual(enrollment.enrolled_at, progress.completed_at)
+                    self.assertLessEqual(progress.completed_at, enrollment.completed_at or now)
+        for attempt in QuizAttempt.objects.all():
+            self.assertLess(attempt.started_at, attempt.submitted_at)
+
+    def test_last_activity_is_the_latest_enrollment_or_completion(self):
+        for student in User.objects.filter(role=User.Role.STUDENT).prefetch_related(
+                'enrollments__lesson_progress'):
+            times = [
+                moment
+                for enrollment in student.enrollments.all()
+                for moment in [enrollment.enrolled_at] + [
+                    progress.completed_at for progress in enrollment.lesson_progress.all() if progress.completed_at]
+            ]
+            self.assertEqual(student.last_activity_date, timezone.localdate(max(times)))
+
+    def test_refuses_to_reuse_a_prefix(self):
+        with self.assertRaises(CommandError):
+            seed_small_scale()
+
+
+class ViewBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_small_scale()
+
+    def test_every_baseline_scenario_runs(self):
+        results = run_benchmarks(iterations=1)
+        self.assertEqual(set(results), set(load_baseline()))
+
+    def test_shared_cache_is_left_alone(self):
+        cache.set('kept', 1)
+        run_benchmarks(iterations=1, names=['course_list'])
+        self.assertEqual(cache.get('kept'), 1)
+
+    def test_measured_data_is_left_unchanged(self):
+        points = list(User.objects.order_by('pk').values_list('total_points', flat=True))
+        run_benchmarks(iterations=2, names=['complete_lesson', 'quiz_take'])
+        self.assertEqual(list(User.objects.order_by('pk').values_list('total_points', flat=True)), points)
+        self.assertFalse(QuizSession.objects.exists())
+
+    def test_query_counts_within_baseline(self):
+        # Latency depends on the machine; query counts must never grow
+        results = run_benchmarks(iterations=2)
+        self.assertEqual(regressions(results, load_baseline(), latency_tolerance=0), [])
@@ -0,0 +1,123 @@
+import queue
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from courses import similarity
+from courses.models import SubmissionFingerprint
+from courses.similarity import fingerprint_submission
+from eduvolve.testing import TemporaryMediaMixin
+from .factories import enroll, make_assignment, make_lesson, make_submission, make_user
+
+ESSAY = 'The quick brown fox jumps over the lazy dog while the cat watches from the warm windowsill ' * 5
+
+
+class SimilarityTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.lesson = make_lesson(cls.instructor)
+        cls.assignment = make_assignment(cls.lesson)
+        cls.report_url = reverse('courses:assignment_similarity', args=[cls.assignment.pk])
+
+    def setUp(self):
+        super().setUp()
+        self.pending = queue.Queue()
+        patches = [
+            mock.patch.object(similarity, '_pending', self.pending),
+            mock.patch.object(similarity, '_start_worker'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def submit(self, username, text, filename='essay.pdf', content=b'%PDF'):
+        student = make_user(username)
+        enroll(student, self.lesson.course)
+        self.client.force_login(student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('courses:assignment_submit', args=[self.assignment.pk]), {
+                'submission_file': SimpleUploadedFile(filename, content),
+                'submission_text': text,
+                'submission_token': uuid.uuid4(),
+            })
+        # Run what the background thread would
+        while not self.pending.empty():
+            similarity.fingerprint_pending(self.pending.get_nowait())
+        return student.submissions.get()
+
+    def report(self):
+        self.client.force_login(self.instructor)
+        return self.client.get(self.report_url)
+
+    def test_submissions_are_fingerprinted_on_submit(self):
+        submission = self.submit('alice', ESSAY)
+        self.assertGreater(submission.fingerprint.shingle_count, 0)
+        self.assertEqual(submission.fingerprint.bands.count(), 32)
+
+    def test_fingerprinting_happens_off_the_request(self):
+        student = make_user('alice')
+        enroll(student, self.lesson.course)
+        self.client.force_login(student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('courses:assignment_submit', args=[self.assignment.pk]), {
+                'submission_file': SimpleUploadedFile('essay.pdf', b'%PDF'),
+                'submission_text': ESSAY,
+                'submission_token': uuid.uuid4(),
+            })
+        self.assertFalse(SubmissionFingerprint.objects.exists())
+        self.assertEqual(self.pending.get_nowait(), student.submissions.get().pk)
+        similarity._start_worker.assert_called_once()
+
+    def test_text_uploads_are_fingerprinted(self):
+        submission = self.submit('alice', '', 'essay.txt', ESSAY.encode())
+        self.assertGreater(submission.fingerprint.shingle_count, 0)
+
+    def test_submissions_without_text_get_an_empty_signature(self):
+        submission = self.submit('alice', '')
+        self.assertEqual(bytes(submission.fingerprint.signature), b'')
+        self.assertFalse(submission.fingerprint.bands.exists())
+
+    def test_short_notes_are_not_banded(self):
+        submissions = [
+            make_submission(self.assignment, make_user(f'student{i}'), submission_text='See attached PDF.')
+            for i in range(5)
+        ]
+        for submission in submissions:
+            fingerprint_submission(submission)
+        self.assertFalse(SubmissionFingerprint.objects.exclude(signature=b'').exists())
+        self.assertEqual(self.report().context['pairs'], [])
+
+    def test_oversized_buckets_are_skipped(self):
+        for i in range(4):
+            fingerprint_submission(make_submission(self.assignment, make_user(f'student{i}'), submission_text=ESSAY))
+        self.assertEqual(len(self.report().context['pairs']), 6)
+        with mock.patch.object(similarity, 'MAX_BUCKET_SIZE', 3):
+            self.assertEqual(self.report().context['pairs'], [])
+
+    def test_report_pairs_near_duplicates(self):
+        first = self.submit('alice', ESSAY)
+        second = self.submit('bob', ESSAY + ' and then it rains')
+        self.submit('carol', 'Something entirely different about database indexes and query plans')
+        pairs = self.report().context['pairs']
+        self.assertEqual(len(pairs), 1)
+        self.assertEqual({pairs[0]['first'], pairs[0]['second']}, {first, second})
+
+    def test_report_is_read_only(self):
+        make_submission(self.assignment, make_user('old'), submission_text=ESSAY)
+        response = self.report()
+        self.assertEqual(response.context['unindexed_count'], 1)
+        self.assertFalse(SubmissionFingerprint.objects.exists())
+
+    def test_command_indexes_older_submissions(self):
+        make_submission(self.assignment, make_user('old'), submission_text=ESSAY)
+        make_submission(self.assignment, make_user('empty'))
+        call_command('index_submissions', stdout=StringIO())
+        self.assertEqual(SubmissionFingerprint.objects.count(), 2)
+        self.assertEqual(self.report().context['unindexed_count'], 0)
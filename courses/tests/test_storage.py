@@ -0,0 +1,146 @@
+import os
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import User
+from courses.models import AssignmentSubmission, StoredFile
+from courses.storage import content_addressed_storage
+from eduvolve.testing import TemporaryMediaMixin
+from .factories import make_assignment, make_lesson, make_user
+
+
+class StorageTestCase(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assignment = make_assignment(make_lesson(make_user('teacher', User.Role.INSTRUCTOR)))
+
+    def submit(self, username, content):
+        submission = AssignmentSubmission(assignment=self.assignment, student=make_user(username))
+        submission.submission_file.save('essay.pdf', ContentFile(content), save=False)
+        submission.save()
+        return submission
+
+    def ref_count(self, name):
+        return StoredFile.objects.filter(name=name).values_list('ref_count', flat=True).first() or 0
+
+    def age(self, name, hours):
+        stamp = time.time() - hours * 3600
+        os.utime(content_addressed_storage.path(name), (stamp, stamp))
+
+    def collect(self):
+        call_command('collect_media_garbage', stdout=StringIO())
+
+
+class ReferenceCountTests(StorageTestCase):
+    def test_create(self):
+        name = self.submit('student', b'essay').submission_file.name
+        self.assertTrue(name.startswith('blobs/'))
+        self.assertEqual(self.ref_count(name), 1)
+
+    def test_replace(self):
+        submission = self.submit('student', b'draft')
+        old = submission.submission_file.name
+        submission.submission_file.save('essay.pdf', ContentFile(b'final'), save=False)
+        submission.save()
+        self.assertEqual(self.ref_count(old), 0)
+        self.assertEqual(self.ref_count(submission.submission_file.name), 1)
+
+    def test_delete(self):
+        submission = self.submit('student', b'essay')
+        submission.delete()
+        self.assertEqual(self.ref_count(submission.submission_file.name), 0)
+
+    def test_delete_of_a_deferred_instance(self):
+        name = self.submit('student', b'essay').submission_file.name
+        AssignmentSubmission.objects.only('id').get().delete()
+        self.assertEqual(self.ref_count(name), 0)
+
+    def test_shared_blob(self):
+        first = self.submit('first', b'same')
+        second = self.submit('second', b'same')
+        self.assertEqual(first.submission_file.name, second.submission_file.name)
+        self.assertEqual(self.ref_count(first.submission_file.name), 2)
+        first.delete()
+        self.assertEqual(self.ref_count(first.submission_file.name), 1)
+
+    def test_saving_a_deferred_instance_keeps_references(self):
+        name = self.submit('student', b'essay').submission_file.name
+        submission = AssignmentSubmission.objects.only('id', 'feedback').get()
+        submission.feedback = 'Good'
+        submission.save()
+        self.assertEqual(self.ref_count(name), 1)
+
+    def test_replacing_a_file_loaded_after_deferral(self):
+        old = self.submit('student', b'draft').submission_file.name
+        submission = AssignmentSubmission.objects.only('id').get()
+        submission.submission_file.save('essay.pdf', ContentFile(b'final'), save=False)
+        submission.save()
+        self.assertEqual(self.ref_count(old), 0)
+        self.assertEqual(self.ref_count(submission.submission_file.name), 1)
+
+    def test_deferred_loads_do_not_fetch_files(self):
+        self.submit('student', b'essay')
+        with self.assertNumQueries(1):
+            AssignmentSubmission.objects.only('id').first()
+
+
+class CollectMediaGarbageTests(StorageTestCase):
+    def test_deletes_old_unreferenced_files(self):
+        submission = self.submit('student', b'essay')
+        name = submission.submission_file.name
+        submission.delete()
+        self.age(name, 48)
+        self.collect()
+        self.assertFalse(content_addressed_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_keeps_referenced_files(self):
+        name = self.submit('student', b'essay').submission_file.name
+        self.age(name, 48)
+        self.collect()
+        self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_keeps_shared_file_while_one_reference_is_left(self):
+        first = self.submit('first', b'same')
+        self.submit('second', b'same')
+        first.delete()
+        self.age(first.submission_file.name, 48)
+        self.collect()
+        self.assertTrue(content_addressed_storage.exists(first.submission_file.name))
+
+    def test_keeps_recent_files(self):
+        submission = self.submit('student', b'essay')
+        submission.delete()
+        self.collect()
+        self.assertTrue(content_addressed_storage.exists(submission.submission_file.name))
+
+    def test_deduplicated_upload_refreshes_an_old_file(self):
+        submission = self.submit('first', b'essay')
+        name = submission.submission_file.name
+        submission.delete()
+        self.age(name, 48)
+        # The same content is uploaded again before it is referenced
+        self.assertEqual(content_addressed_storage.save('essay.pdf', ContentFile(b'essay')), name)
+        self.collect()
+        self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_rechecks_references_before_deleting(self):
+        submission = self.submit('student', b'essay')
+        name = submission.submission_file.name
+        submission.delete()
+        self.age(name, 48)
+        listdir = content_addressed_storage.listdir
+
+        def referenced_meanwhile(path):
+            # Re-referenced after the first pass read the reference counts
+            StoredFile.objects.filter(name=name).update(ref_count=1)
+            return listdir(path)
+
+        with mock.patch.object(content_addressed_storage, 'listdir', referenced_meanwhile):
+            self.collect()
+        self.assertTrue(content_addressed_storage.exists(name))
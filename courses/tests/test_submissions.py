@@ -0,0 +1,107 @@
+import uuid
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from courses import autosave
+from courses.models import AssignmentSubmission, QuizAttempt
+from eduvolve.testing import TemporaryMediaMixin
+from .factories import correct_answers, enroll, make_assignment, make_lesson, make_quiz, make_user
+
+
+class QuizSubmissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_user('student')
+        cls.quiz = make_quiz(make_lesson(make_user('teacher', User.Role.INSTRUCTOR)))
+
+    def setUp(self):
+        self.client.force_login(self.student)
+        self.url = reverse('courses:quiz_take', args=[self.quiz.pk])
+        self.client.get(self.url)
+
+    def submit(self, token):
+        return self.client.post(self.url, {**correct_answers(self.quiz), 'submission_token': token})
+
+    def points(self):
+        return User.objects.get(pk=self.student.pk).total_points
+
+    def test_replayed_token_returns_the_original_result(self):
+        token = uuid.uuid4()
+        first = self.submit(token)
+        replay = self.submit(token)
+
+        attempt = QuizAttempt.objects.get(student=self.student, quiz=self.quiz)
+        self.assertRedirects(first, reverse('courses:quiz_result', args=[attempt.pk]))
+        self.assertRedirects(replay, reverse('courses:quiz_result', args=[attempt.pk]))
+        self.assertEqual(attempt.submission_token, token)
+        self.assertEqual(self.points(), attempt.points_earned)
+
+    def test_second_submit_is_not_graded_again(self):
+        self.submit(uuid.uuid4())
+        self.submit(uuid.uuid4())
+        self.assertEqual(QuizAttempt.objects.filter(student=self.student, quiz=self.quiz).count(), 1)
+        self.assertEqual(self.points(), self.quiz.get_total_points())
+
+    def test_concurrent_submit_loses_to_the_unique_constraint(self):
+        # select_for_update is a no-op on SQLite; the constraint must reject the duplicate
+        start_session = autosave.start_session
+
+        def submitted_meanwhile(student, quiz):
+            QuizAttempt.objects.create(
+                student=student, quiz=quiz, score=0, submitted_at=self.quiz.created_at)
+            return start_session(student, quiz)
+
+        with mock.patch.object(autosave, 'start_session', submitted_meanwhile):
+            response = self.submit(uuid.uuid4())
+
+        attempt = QuizAttempt.objects.get(student=self.student, quiz=self.quiz)
+        self.assertRedirects(response, reverse('courses:quiz_result', args=[attempt.pk]))
+        self.assertEqual(attempt.score, 0)
+        self.assertEqual(self.points(), 0)
+
+    def test_database_rejects_a_second_attempt(self):
+        self.submit(uuid.uuid4())
+        with self.assertRaises(IntegrityError):
+            QuizAttempt.objects.create(student=self.student, quiz=self.quiz, score=0, submitted_at=self.quiz.created_at)
+
+
+class AssignmentSubmissionTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_user('student')
+        lesson = make_lesson(make_user('teacher', User.Role.INSTRUCTOR))
+        cls.assignment = make_assignment(lesson)
+        enroll(cls.student, lesson.course)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.student)
+        self.url = reverse('courses:assignment_submit', args=[self.assignment.pk])
+
+    def submit(self, token, content=b'essay'):
+        return self.client.post(self.url, {
+            'submission_file': SimpleUploadedFile('essay.pdf', content),
+            'submission_token': token,
+        }, follow=True)
+
+    def test_replayed_token_reports_success_once_stored(self):
+        token = uuid.uuid4()
+        self.submit(token)
+        replay = self.submit(token, b'changed')
+
+        submission = AssignmentSubmission.objects.get(student=self.student, assignment=self.assignment)
+        self.assertEqual(submission.submission_token, token)
+        self.assertEqual(submission.submission_file.read(), b'essay')
+        self.assertEqual(
+            [str(message) for message in replay.context['messages']], ['Assignment submitted successfully!'])
+
+    def test_second_submit_is_refused(self):
+        self.submit(uuid.uuid4())
+        response = self.submit(uuid.uuid4(), b'changed')
+        self.assertEqual(AssignmentSubmission.objects.filter(student=self.student).count(), 1)
+        self.assertIn('already submitted', str(list(response.context['messages'])[0]))
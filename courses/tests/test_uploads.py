@@ -0,0 +1,169 @@
+import hashlib
+import os
+import time
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from courses.models import AssignmentSubmission, ChunkedUpload
+from eduvolve.testing import TemporaryMediaMixin
+from .factories import enroll, make_assignment, make_lesson, make_submission, make_user
+
+CONTENT = b'0123456789' * 100
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ChunkedUploadTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_user('student')
+        lesson = make_lesson(make_user('teacher', User.Role.INSTRUCTOR))
+        cls.assignment = make_assignment(lesson)
+        enroll(cls.student, lesson.course)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.student)
+
+    def start(self, content=CONTENT):
+        response = self.client.post(reverse('courses:upload_init', args=[self.assignment.pk]), {
+            'filename': 'essay.pdf', 'size': len(content), 'sha256': sha256(content)})
+        return response
+
+    def send(self, upload_id, offset, chunk, digest=None):
+        return self.client.post(
+            reverse('courses:upload_chunk', args=[upload_id]), chunk,
+            content_type='application/octet-stream',
+            headers={'X-Upload-Offset': str(offset), 'X-Chunk-SHA256': digest or sha256(chunk)})
+
+    def complete(self, upload_id, digest=sha256(CONTENT), token=None):
+        data = {'submission_token': token or uuid.uuid4()}
+        if digest is not None:
+            data['sha256'] = digest
+        return self.client.post(reverse('courses:upload_complete', args=[upload_id]), data)
+
+    def upload(self, content=CONTENT):
+        upload_id = self.start(content).json()['upload_id']
+        self.send(upload_id, 0, content)
+        return upload_id
+
+    def test_resume_continues_at_the_stored_offset(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, CONTENT[:400])
+
+        resumed = self.start()
+        self.assertEqual(resumed.status_code, 200)
+        self.assertEqual(resumed.json()['upload_id'], upload_id)
+        self.assertEqual(resumed.json()['offset'], 400)
+        self.assertEqual(self.send(upload_id, 400, CONTENT[400:]).json()['offset'], len(CONTENT))
+
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 200)
+        submission = AssignmentSubmission.objects.get(student=self.student)
+        self.assertEqual(submission.submission_file.read(), CONTENT)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_offset_mismatch_reports_the_current_offset(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, CONTENT[:400])
+        response = self.send(upload_id, 200, CONTENT[200:600])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 400)
+
+    def test_chunk_sha_mismatch_truncates_the_chunk(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, CONTENT[:400])
+        response = self.send(upload_id, 400, CONTENT[400:800], digest=sha256(b'other'))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload_id).get_offset(), 400)
+
+    def test_file_sha_mismatch_discards_the_upload(self):
+        upload_id = self.upload()
+        response = self.complete(upload_id, digest=sha256(b'other'))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(AssignmentSubmission.objects.exists())
+
+    def test_file_sha_is_required(self):
+        upload_id = self.upload()
+        self.assertEqual(self.complete(upload_id, digest=None).status_code, 400)
+        self.assertFalse(AssignmentSubmission.objects.exists())
+
+    def test_incomplete_upload_is_refused(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, CONTENT[:400])
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 400)
+
+    def test_retried_completion_returns_the_submission(self):
+        token = uuid.uuid4()
+        upload_id = self.upload()
+        first = self.complete(upload_id, token=token)
+        retry = self.complete(upload_id, token=token)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json()['submission_id'], first.json()['submission_id'])
+
+    def test_losing_a_race_returns_conflict(self):
+        upload_id = self.upload()
+        # Submitted by another tab between init and completion
+        make_submission(self.assignment, self.student)
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(AssignmentSubmission.objects.filter(student=self.student).count(), 1)
+
+
+class ExpireChunkedUploadsTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        student = make_user('student')
+        self.assignment = make_assignment(make_lesson(make_user('teacher', User.Role.INSTRUCTOR)))
+        self.upload = ChunkedUpload.objects.create(
+            student=student, assignment=self.assignment, filename='essay.pdf', size=len(CONTENT))
+        self.upload.get_path().parent.mkdir(parents=True)
+        self.upload.get_path().write_bytes(CONTENT[:100])
+
+    def age(self, path, hours):
+        stamp = time.time() - hours * 3600
+        os.utime(path, (stamp, stamp))
+
+    def expire(self):
+        call_command('expire_chunked_uploads', stdout=StringIO())
+
+    def backdate_upload(self, hours):
+        ChunkedUpload.objects.filter(pk=self.upload.pk).update(
+            created_at=self.upload.created_at - timedelta(hours=hours))
+
+    def test_abandoned_upload_is_deleted_with_its_file(self):
+        self.backdate_upload(48)
+        self.age(self.upload.get_path(), 48)
+        self.expire()
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(self.upload.get_path().exists())
+
+    def test_upload_receiving_chunks_is_kept(self):
+        self.backdate_upload(48)
+        self.expire()
+        self.assertTrue(ChunkedUpload.objects.exists())
+        self.assertTrue(self.upload.get_path().exists())
+
+    def test_orphaned_partial_files_are_deleted(self):
+        orphan = self.upload.get_path().with_name(f'{uuid.uuid4()}.part')
+        orphan.write_bytes(b'left behind')
+        recent = self.upload.get_path().with_name(f'{uuid.uuid4()}.part')
+        recent.write_bytes(b'just written')
+        self.age(orphan, settings.CHUNKED_UPLOAD_EXPIRY_HOURS + 1)
+        self.expire()
+        self.assertFalse(orphan.exists())
+        self.assertTrue(recent.exists())
+        self.assertTrue(self.upload.get_path().exists())
+
@@ -0,0 +1,104 @@
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import ChunkedUpload
+
+# Block size used when streaming request bodies and files
+BLOCK_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A chunk was rejected; the partial file is left as it was"""
+
+
+def append_chunk(upload, stream, offset, length, expected_sha256):
+    """
+    Stream one chunk from stream onto the end of the upload's partial file
+
+    The chunk must start at the current end of the file and is hashed while
+    it is written; on a size or SHA-256 mismatch the file is truncated back
+    to offset so the client can simply retry the chunk.
+    """
+    current = upload.get_offset()
+    if offset != current:
+        raise ChunkError(f'Expected offset {current}.')
+    if length <= 0 or length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise ChunkError('Invalid chunk size.')
+    if offset + length > upload.size:
+        raise ChunkError('Chunk goes past the declared file size.')
+
+    path = upload.get_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    received = 0
+    with open(path, 'ab') as destination:
+        try:
+            while received < length:
+                block = stream.read(min(BLOCK_SIZE, length - received))
+                if not block:
+                    break
+                digest.update(block)
+                destination.write(block)
+                received += len(block)
+
+            if received != length:
+                raise ChunkError('Chunk body is shorter than its Content-Length.')
+            if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+                raise ChunkError('Chunk SHA-256 does not match.')
+        except ChunkError:
+            destination.truncate(offset)
+            raise
+
+    return offset + received
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in blocks so memory use stays constant"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discard(upload):
+    """Delete an upload and its partial file"""
+    upload.get_path().unlink(missing_ok=True)
+    upload.delete()
+
+
+def expire_uploads(cutoff, dry_run=False):
+    """
+    Delete uploads without a chunk since cutoff (a timestamp), and partial
+    files older than cutoff that no upload refers to any more
+
+    Each upload is locked and re-checked before it is deleted, so a chunk
+    arriving meanwhile keeps it alive. Returns (uploads, files) deleted.
+    """
+    expired = 0
+    for pk in ChunkedUpload.objects.filter(
+        created_at__lt=datetime.fromtimestamp(cutoff, tz=timezone.utc)
+    ).values_list('pk', flat=True).iterator():
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().filter(pk=pk).first()
+            if upload is None or upload.last_activity() >= cutoff:
+                continue
+            if not dry_run:
+                discard(upload)
+            expired += 1
+
+    orphans = 0
+    root = Path(settings.CHUNKED_UPLOAD_ROOT)
+    if root.is_dir():
+        known = {str(pk) for pk in ChunkedUpload.objects.values_list('pk', flat=True)}
+        for path in root.glob('*.part'):
+            if path.stem not in known and path.stat().st_mtime < cutoff:
+                if not dry_run:
+                    path.unlink(missing_ok=True)
+                orphans += 1
+    return expired, orphans
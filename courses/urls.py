@@ -16,6 +16,11 @@ urlpatterns = [
     path('course/create/', views.course_create, name='course_create'),
     path('course/<int:pk>/edit/', views.course_edit, name='course_edit'),
     path('course/<int:pk>/manage/', views.course_manage, name='course_manage'),
+    path('course/<int:pk>/analytics/', views.course_analytics, name='course_analytics'),
+    path('course/<int:pk>/gradebook/',
+         views.course_gradebook, name='course_gradebook'),
+    path('course/<int:pk>/gradebook/export/',
+         views.course_gradebook_export, name='course_gradebook_export'),
     path('course//edit/', views.course_edit, name='course_edit'),
     path('course//delete/', views.course_delete, name='course_delete'),
     path('course//lesson/create/', views.lesson_create, name='lesson_create'),
@@ -56,16 +61,30 @@ urlpatterns = [
          views.assignment_delete, name='assignment_delete'),
     path('assignment/<int:pk>/submissions/',
          views.assignment_submissions, name='assignment_submissions'),
+    path('assignment/<int:pk>/download/',
+         views.assignment_download_all, name='assignment_download_all'),
+    path('assignment/<int:pk>/similarity/',
+         views.assignment_similarity, name='assignment_similarity'),
+    path('assignment/<int:pk>/grade-bulk/',
+         views.assignment_grade_bulk, name='assignment_grade_bulk'),
+    path('assignment/<int:pk>/grade-next/',
+         views.assignment_grade_next, name='assignment_grade_next'),
     path('submission/<int:pk>/grade/',
          views.assignment_grade, name='assignment_grade'),
 
     # Student - Quiz
     path('quiz/<int:pk>/take/', views.quiz_take, name='quiz_take'),
+    path('quiz/<int:pk>/autosave/', views.quiz_autosave, name='quiz_autosave'),
     path('quiz/result/<int:pk>/', views.quiz_result, name='quiz_result'),
 
     # Student - Assignment
     path('assignment/<int:pk>/submit/',
          views.assignment_submit, name='assignment_submit'),
+    path('assignment/<int:pk>/upload/',
+         views.upload_init, name='upload_init'),
+    path('upload/<uuid:pk>/', views.upload_chunk, name='upload_chunk'),
+    path('upload/<uuid:pk>/complete/',
+         views.upload_complete, name='upload_complete'),
 
 
 ]
@@ -1,18 +1,60 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Case, When, Value, IntegerField, Prefetch
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+import os
+import time
+import uuid
 from accounts.models import User
+from eduvolve.replicas import read_from_replica
 from .models import (
-    Course, Lesson, Quiz, Question, Answer, Assignment,
-    Enrollment, LessonProgress, QuizAttempt, AssignmentSubmission, Certificate
+    Course, Lesson, Quiz, Question, Assignment,
+    Enrollment, LessonProgress, QuizAttempt, AssignmentSubmission, Certificate,
+    ChunkedUpload
 )
+from . import autosave
+from .pagination import keyset_paginate
+from .risk import at_risk_enrollments
 from .forms import (
     CourseForm, LessonForm, QuizForm, QuestionForm, AnswerFormSet,
-    AssignmentForm, AssignmentSubmissionForm, AssignmentGradeForm
+    AssignmentForm, AssignmentSubmissionForm, AssignmentGradeForm,
+    AssignmentGradeFormSet, GradeUploadForm
 )
+from .analytics import course_stats, refresh_course_stats
+from .caching import cache_per_segment
+from .dashboards import instructor_summary, platform_stats, platform_trend
+from .exports import stream_gradebook_csv, stream_submissions_zip
+from .gradebook import gradebook_columns, gradebook_enrollments, gradebook_rows
+from .grading import (
+    BULK_GRADING_PAGE_SIZE, apply_grades, parse_grade_csv, posted_pks, submission_points
+)
+from .metrics import (
+    ENROLLMENTS, LESSON_COMPLETIONS, QUIZ_GRADING_SECONDS, QUIZ_SUBMISSIONS,
+    SUBMISSIONS_GRADED, UPLOAD_BYTES, UPLOAD_SECONDS, record_grading_turnaround
+)
+from .similarity import DEFAULT_THRESHOLD, fingerprint_on_commit, similar_pairs
+from .uploads import ChunkError, append_chunk, discard, file_sha256
+
+
+def _submission_token(data):
+    """Parse the idempotency token posted with a submission form"""
+    try:
+        return uuid.UUID(data.get('submission_token', ''))
+    except ValueError:
+        return None
+
+
+def _lock_student(user):
+    """Serialise concurrent submissions by the same student"""
+    User.objects.select_for_update().only('pk').get(pk=user.pk)
 
 
 @login_required
@@ -27,21 +69,15 @@ def dashboard(request):
 
 
 @login_required
+@read_from_replica()
 def admin_dashboard(request):
     """Admin dashboard"""
-    total_users = User.objects.count()
-    total_courses = Course.objects.count()
-    total_students = User.objects.filter(role='STUDENT').count()
-    total_instructors = User.objects.filter(role='INSTRUCTOR').count()
-
-    recent_courses = Course.objects.all()[:5]
+    recent_courses = Course.objects.select_related('instructor')[:5]
     recent_users = User.objects.all()[:10]
 
     context = {
-        'total_users': total_users,
-        'total_courses': total_courses,
-        'total_students': total_students,
-        'total_instructors': total_instructors,
+        'stats': platform_stats(),
+        'trend': platform_trend(),
         'recent_courses': recent_courses,
         'recent_users': recent_users,
     }
@@ -51,23 +87,7 @@ def admin_dashboard(request):
 @login_required
 def instructor_dashboard(request):
     """Instructor dashboard"""
-    my_courses = Course.objects.filter(instructor=request.user)
-    total_students = Enrollment.objects.filter(
-        course__instructor=request.user,
-        is_active=True
-    ).count()
-
-    # Pending submissions
-    pending_submissions = AssignmentSubmission.objects.filter(
-        assignment__lesson__course__instructor=request.user,
-        status='PENDING'
-    ).count()
-
-    context = {
-        'my_courses': my_courses,
-        'total_students': total_students,
-        'pending_submissions': pending_submissions,
-    }
+    context = instructor_summary(request.user)
     return render(request, 'courses/instructor_dashboard.html', context)
 
 
@@ -98,10 +118,12 @@ def student_dashboard(request):
 
 
 @login_required
+@cache_per_segment(60, segment='user', namespaces=['catalog'])
 def course_list(request):
     """List all published courses"""
     courses = Course.objects.filter(
-        is_published=True).select_related('instructor')
+        is_published=True).select_related('instructor').annotate(
+        enrolled_count=Count('enrollments', filter=Q(enrollments__is_active=True)))
 
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -127,8 +149,16 @@ def course_list(request):
 @login_required
 def course_detail(request, pk):
     """Course detail page"""
-    course = get_object_or_404(Course, pk=pk, is_published=True)
-    lessons = course.lessons.filter(is_published=True)
+    course = get_object_or_404(
+        Course.objects.select_related('instructor').annotate(
+            enrolled_count=Count('enrollments', filter=Q(enrollments__is_active=True), distinct=True),
+            total_lessons=Count('lessons', distinct=True),
+        ),
+        pk=pk, is_published=True,
+    )
+    # Each lesson row shows its quiz points and assignment count
+    lessons = course.lessons.filter(is_published=True).select_related('quiz').prefetch_related(
+        'quiz__questions', 'assignments')
 
     is_enrolled = False
     enrollment = None
@@ -168,6 +198,7 @@ def enroll_course(request, pk):
     if created:
         messages.success(request, f'Successfully enrolled in {course.title}!')
         request.user.add_points(10)  # Award points for enrollment
+        ENROLLMENTS.inc()
     else:
         enrollment.is_active = True
         enrollment.save()
@@ -179,7 +210,10 @@ def enroll_course(request, pk):
 @login_required
 def lesson_view(request, pk):
     """View a lesson"""
-    lesson = get_object_or_404(Lesson, pk=pk, is_published=True)
+    lesson = get_object_or_404(
+        Lesson.objects.select_related('course', 'quiz').prefetch_related('quiz__questions', 'assignments'),
+        pk=pk, is_published=True,
+    )
 
     # Check enrollment
     if request.user.is_student():
@@ -205,14 +239,13 @@ def lesson_view(request, pk):
             ).first()
 
         # Get assignment submissions
-        assignment_submissions = {}
-        for assignment in lesson.assignments.all():
-            submission = AssignmentSubmission.objects.filter(
+        assignment_submissions = {
+            submission.assignment_id: submission
+            for submission in AssignmentSubmission.objects.filter(
                 student=request.user,
-                assignment=assignment
-            ).first()
-            if submission:
-                assignment_submissions[assignment.id] = submission
+                assignment__lesson=lesson
+            )
+        }
     else:
         enrollment = None
         progress = None
@@ -262,6 +295,7 @@ def complete_lesson(request, pk):
 
         # Award points
         request.user.add_points(20)
+        LESSON_COMPLETIONS.inc()
 
         return JsonResponse({
             'success': True,
@@ -284,56 +318,110 @@ def quiz_take(request, pk):
     ).first()
 
     if existing_attempt:
-        messages.warning(
-            request, 'You have already taken this quiz. You can only take it once.')
+        token = _submission_token(request.POST)
+        if request.method != 'POST' or token is None or existing_attempt.submission_token != token:
+            messages.warning(
+                request, 'You have already taken this quiz. You can only take it once.')
+        # A replayed submit gets the original result without re-grading
         return redirect('courses:quiz_result', pk=existing_attempt.id)
 
     questions = quiz.questions.prefetch_related('answers').all()
+    session = autosave.start_session(request.user, quiz)
 
     if request.method == 'POST':
-        # Calculate score
-        total_points = quiz.get_total_points()
+        # Answers buffered by autosave are the baseline; answers posted with
+        # the final submission only count while the time limit holds
+        answers = autosave.saved_answers(session, questions)
+        if autosave.is_expired(quiz, session):
+            messages.warning(
+                request, 'Time limit reached. Only answers saved in time were graded.')
+        else:
+            answers.update(autosave.parse_answers(request.POST, questions))
+
+        # Calculate score from the prefetched answers
+        grading_started = time.perf_counter()
+        total_points = 0
         earned_points = 0
 
         for question in questions:
-            answer_id = request.POST.get(f'question_{question.id}')
-            if answer_id:
-                answer = Answer.objects.filter(
-                    id=answer_id,
-                    question=question,
-                    is_correct=True
-                ).first()
-
-                if answer:
-                    earned_points += question.points
+            total_points += question.points
+            answer_id = answers.get(question.id)
+            if answer_id and any(
+                answer.id == answer_id and answer.is_correct
+                for answer in question.answers.all()
+            ):
+                earned_points += question.points
 
         score = (earned_points / total_points * 100) if total_points > 0 else 0
         is_passed = score >= quiz.passing_score
 
-        # Save attempt
-        attempt = QuizAttempt.objects.create(
-            student=request.user,
-            quiz=quiz,
-            score=score,
-            points_earned=earned_points,
-            is_passed=is_passed,
-            submitted_at=timezone.now()
-        )
-
-        # Award points if passed
-        if is_passed:
-            request.user.add_points(earned_points)
-
+        # Save attempt and award points in one transaction; the unique
+        # (student, quiz) constraint rejects a concurrent duplicate
+        try:
+            with transaction.atomic():
+                _lock_student(request.user)
+                attempt = QuizAttempt.objects.create(
+                    student=request.user,
+                    quiz=quiz,
+                    score=score,
+                    points_earned=earned_points,
+                    is_passed=is_passed,
+                    submitted_at=timezone.now(),
+                    submission_token=_submission_token(request.POST)
+                )
+
+                # Award points if passed
+                if is_passed:
+                    request.user.add_points(earned_points)
+        except IntegrityError:
+            attempt = QuizAttempt.objects.get(student=request.user, quiz=quiz)
+            return redirect('courses:quiz_result', pk=attempt.id)
+
+        QUIZ_GRADING_SECONDS.observe(time.perf_counter() - grading_started)
+        QUIZ_SUBMISSIONS.inc(result='passed' if is_passed else 'failed')
+        autosave.clear_session(session, questions)
         messages.success(request, f'Quiz submitted! Score: {score:.1f}%')
         return redirect('courses:quiz_result', pk=attempt.id)
 
     context = {
         'quiz': quiz,
         'questions': questions,
+        'saved_answers': autosave.saved_answers(session, questions),
+        'submission_token': uuid.uuid4(),
+        'seconds_remaining': autosave.seconds_remaining(quiz, session),
     }
     return render(request, 'courses/quiz_take.html', context)
 
 
+@login_required
+def quiz_autosave(request, pk):
+    """Buffer partial quiz answers in the cache until final submission"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    quiz = get_object_or_404(Quiz, pk=pk)
+
+    if QuizAttempt.objects.filter(student=request.user, quiz=quiz).exists():
+        return JsonResponse({'error': 'Quiz already submitted'}, status=409)
+
+    session = autosave.get_session(request.user, quiz)
+    if session is None:
+        return JsonResponse({'error': 'Quiz session not started'}, status=400)
+
+    if autosave.is_expired(quiz, session):
+        return JsonResponse({'error': 'Time limit reached'}, status=403)
+
+    questions = quiz.questions.prefetch_related('answers').all()
+    answers = autosave.parse_answers(request.POST, questions)
+    autosave.save_answers(quiz, session, answers)
+
+    return JsonResponse({
+        'success': True,
+        'saved': len(autosave.saved_answers(session, questions)),
+        'seconds_remaining': autosave.seconds_remaining(quiz, session),
+    })
+
+
 @login_required
 def quiz_result(request, pk):
     """View quiz result"""
@@ -366,29 +454,207 @@ def assignment_submit(request, pk):
     ).first()
 
     if existing_submission:
-        messages.warning(
-            request, 'You have already submitted this assignment. You can only submit once.')
+        token = _submission_token(request.POST)
+        if request.method == 'POST' and token is not None and existing_submission.submission_token == token:
+            # A replayed submit lands where the original one did
+            messages.success(request, 'Assignment submitted successfully!')
+        else:
+            messages.warning(
+                request, 'You have already submitted this assignment. You can only submit once.')
         return redirect('courses:lesson_view', pk=assignment.lesson.id)
 
     if request.method == 'POST':
-        form = AssignmentSubmissionForm(request.POST, request.FILES)
+        form = AssignmentSubmissionForm(request.POST, request.FILES, assignment=assignment)
         if form.is_valid():
             submission = form.save(commit=False)
             submission.student = request.user
             submission.assignment = assignment
-            submission.save()
-            messages.success(request, 'Assignment submitted successfully!')
+            submission.submission_token = _submission_token(request.POST)
+            if _save_submission(request.user, submission):
+                fingerprint_on_commit(submission)
+                messages.success(request, 'Assignment submitted successfully!')
+                if submission.submission_file:
+                    UPLOAD_BYTES.observe(submission.submission_file.size, method='form')
             return redirect('courses:lesson_view', pk=assignment.lesson.id)
+        submission_token = request.POST.get('submission_token')
     else:
-        form = AssignmentSubmissionForm()
+        form = AssignmentSubmissionForm(assignment=assignment)
+        submission_token = uuid.uuid4()
 
     context = {
         'assignment': assignment,
         'form': form,
+        'submission_token': submission_token,
+        'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
     }
     return render(request, 'courses/assignment_submit.html', context)
 
 
+def _save_submission(user, submission):
+    """Save a new submission, returning False if a concurrent request won the race"""
+    try:
+        with transaction.atomic():
+            _lock_student(user)
+            submission.save()
+    except IntegrityError:
+        return False
+    return True
+
+
+def _get_upload(request, pk):
+    return get_object_or_404(
+        ChunkedUpload.objects.select_related('assignment__lesson'),
+        pk=pk, student=request.user)
+
+
+@login_required
+def upload_init(request, pk):
+    """Start (or resume) a chunked upload for an assignment submission"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    assignment = get_object_or_404(Assignment, pk=pk)
+    if not Enrollment.objects.filter(
+        student=request.user,
+        course__lessons__assignments=assignment,
+        is_active=True
+    ).exists():
+        return JsonResponse({'error': 'Not enrolled in this course'}, status=403)
+
+    if AssignmentSubmission.objects.filter(student=request.user, assignment=assignment).exists():
+        return JsonResponse({'error': 'Assignment already submitted'}, status=409)
+
+    filename = os.path.basename(request.POST.get('filename', '').strip())
+    sha256 = request.POST.get('sha256', '').strip().lower()
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid file size'}, status=400)
+
+    if not filename or size <= 0:
+        return JsonResponse({'error': 'Filename and size are required'}, status=400)
+
+    # Reject oversized or disallowed files before any of the body is sent
+    try:
+        assignment.validate_upload(filename, size)
+    except ValidationError as e:
+        return JsonResponse({'error': ' '.join(e.messages)}, status=400)
+
+    upload, created = ChunkedUpload.objects.get_or_create(
+        student=request.user,
+        assignment=assignment,
+        filename=filename,
+        size=size,
+        defaults={'sha256': sha256}
+    )
+
+    return JsonResponse({
+        'upload_id': str(upload.id),
+        'offset': upload.get_offset(),
+        'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+    }, status=201 if created else 200)
+
+
+@login_required
+def upload_chunk(request, pk):
+    """Report the offset of a chunked upload (GET) or append a chunk (POST)"""
+    upload = _get_upload(request, pk)
+
+    if request.method == 'GET':
+        return JsonResponse({'offset': upload.get_offset(), 'size': upload.size})
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    try:
+        offset = int(request.headers.get('X-Upload-Offset', ''))
+        length = int(request.headers.get('Content-Length', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Offset and Content-Length are required'}, status=400)
+
+    try:
+        with transaction.atomic():
+            # Serialise appends to the same upload
+            ChunkedUpload.objects.select_for_update().only('pk').get(pk=upload.pk)
+            offset = append_chunk(
+                upload, request, offset, length, request.headers.get('X-Chunk-SHA256', ''))
+    except ChunkError as e:
+        return JsonResponse({'error': str(e), 'offset': upload.get_offset()}, status=409)
+
+    return JsonResponse({'offset': offset, 'size': upload.size})
+
+
+@login_required
+def upload_complete(request, pk):
+    """Verify a finished chunked upload and attach it to a new submission"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    # A retried completion whose first try went through finds its submission
+    token = _submission_token(request.POST)
+    if token is not None:
+        submission = AssignmentSubmission.objects.filter(
+            student=request.user, submission_token=token).select_related('assignment__lesson').first()
+        if submission is not None:
+            return _upload_completed(submission)
+
+    upload = _get_upload(request, pk)
+    assignment = upload.assignment
+    path = upload.get_path()
+
+    if upload.get_offset() != upload.size:
+        return JsonResponse({'error': 'Upload is incomplete', 'offset': upload.get_offset()}, status=409)
+
+    # The whole-file digest is required, so a client cannot skip every integrity check
+    sha256 = request.POST.get('sha256', '').strip().lower()
+    if not sha256:
+        return JsonResponse({'error': 'File SHA-256 is required'}, status=400)
+    actual = file_sha256(path)
+    if actual != sha256 or (upload.sha256 and actual != upload.sha256):
+        # Corrupt file: start over rather than keep appending to it
+        discard(upload)
+        return JsonResponse({'error': 'File SHA-256 does not match'}, status=400)
+
+    form = AssignmentSubmissionForm(request.POST, assignment=assignment)
+    form.fields['submission_file'].required = False
+    if not form.is_valid():
+        return JsonResponse({'error': form.errors}, status=400)
+
+    submission = form.save(commit=False)
+    submission.student = request.user
+    submission.assignment = assignment
+    submission.submission_token = token
+    with open(path, 'rb') as source:
+        submission.submission_file.save(upload.filename, File(source), save=False)
+
+    created = _save_submission(request.user, submission)
+    discard(upload)
+    if not created:
+        # A concurrent submission won; its blob is left for collect_media_garbage
+        winner = AssignmentSubmission.objects.select_related('assignment__lesson').get(
+            student=request.user, assignment=assignment)
+        if token is None or winner.submission_token != token:
+            return JsonResponse({
+                'error': 'Assignment already submitted',
+                'redirect_url': reverse('courses:lesson_view', args=[assignment.lesson.id]),
+            }, status=409)
+        return _upload_completed(winner)
+
+    fingerprint_on_commit(submission)
+    messages.success(request, 'Assignment submitted successfully!')
+    UPLOAD_BYTES.observe(upload.size, method='chunked')
+    UPLOAD_SECONDS.observe((timezone.now() - upload.created_at).total_seconds())
+    return _upload_completed(submission)
+
+
+def _upload_completed(submission):
+    return JsonResponse({
+        'success': True,
+        'submission_id': submission.id,
+        'redirect_url': reverse('courses:lesson_view', args=[submission.assignment.lesson.id]),
+    })
+
+
 @login_required
 def course_create(request):
     """Create a new course (Instructor only)"""
@@ -446,15 +712,105 @@ def course_edit(request, pk):
 def course_manage(request, pk):
     """Manage course content (Instructor only)"""
     course = get_object_or_404(Course, pk=pk, instructor=request.user)
-    lessons = course.lessons.all().order_by('order')
+    assignments = Assignment.objects.annotate(
+        pending_count=Count('submissions', filter=Q(submissions__status=AssignmentSubmission.Status.PENDING))
+    )
+    lessons = course.lessons.select_related('quiz').prefetch_related(
+        Prefetch('assignments', queryset=assignments)
+    ).order_by('order')
+
+    # Roster: only the columns the table shows, one page at a time
+    enrollments = course.enrollments.select_related('student').only(
+        'course', 'enrolled_at', 'progress', 'is_active',
+        'student__username', 'student__first_name', 'student__last_name',
+    )
+    search_query = request.GET.get('search', '')
+    if search_query:
+        enrollments = enrollments.filter(
+            Q(student__username__icontains=search_query) |
+            Q(student__first_name__icontains=search_query) |
+            Q(student__last_name__icontains=search_query)
+        )
+
+    cursor = request.GET.get('after')
+    enrollments, next_cursor = keyset_paginate(
+        enrollments, ['student__username', 'id'], cursor)
 
     context = {
         'course': course,
         'lessons': lessons,
+        'enrollments': enrollments,
+        'at_risk': at_risk_enrollments(course)[:10],
+        'search_query': search_query,
+        'is_first_page': not cursor,
+        'next_cursor': next_cursor,
     }
     return render(request, 'courses/course_manage.html', context)
 
 
+@login_required
+@read_from_replica()
+def course_analytics(request, pk):
+    """Cohort progress analytics of a course (Instructor only)"""
+    course = get_object_or_404(Course, pk=pk, instructor=request.user)
+
+    if request.method == 'POST':
+        refresh_course_stats(course)
+        messages.success(request, 'Analytics refreshed.')
+        return redirect('courses:course_analytics', pk=pk)
+
+    stats = course_stats(course)
+    context = {
+        'course': course,
+        'stats': stats.data,
+        'computed_at': stats.computed_at,
+    }
+    return render(request, 'courses/course_analytics.html', context)
+
+
+@login_required
+@read_from_replica()
+def course_gradebook(request, pk):
+    """Students x quizzes/assignments grade matrix (Instructor only)"""
+    course = get_object_or_404(Course, pk=pk, instructor=request.user)
+    quizzes, assignments = gradebook_columns(course)
+
+    enrollments = gradebook_enrollments(course)
+    search_query = request.GET.get('search', '')
+    if search_query:
+        enrollments = enrollments.filter(
+            Q(student__username__icontains=search_query) |
+            Q(student__first_name__icontains=search_query) |
+            Q(student__last_name__icontains=search_query)
+        )
+
+    cursor = request.GET.get('after')
+    enrollments, next_cursor = keyset_paginate(
+        enrollments, ['student__username', 'id'], cursor)
+
+    context = {
+        'course': course,
+        'quizzes': quizzes,
+        'assignments': assignments,
+        'rows': gradebook_rows(course, enrollments, quizzes, assignments),
+        'search_query': search_query,
+        'is_first_page': not cursor,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'courses/gradebook.html', context)
+
+
+@login_required
+def course_gradebook_export(request, pk):
+    """Stream the course gradebook as CSV (Instructor only)"""
+    course = get_object_or_404(Course, pk=pk, instructor=request.user)
+
+    response = StreamingHttpResponse(stream_gradebook_csv(course), content_type='text/csv')
+    filename = get_valid_filename(f'{course.title} gradebook.csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @login_required
 def lesson_create(request, course_pk):
     """Create a new lesson (Instructor only)"""
@@ -818,24 +1174,139 @@ def assignment_delete(request, pk):
 def assignment_submissions(request, pk):
     """View all submissions for an assignment (Instructor only)"""
     assignment = get_object_or_404(
-        Assignment, pk=pk, lesson__course__instructor=request.user)
-    submissions = assignment.submissions.all().select_related('student')
+        Assignment.objects.select_related('lesson__course'),
+        pk=pk, lesson__course__instructor=request.user)
+
+    # Get statistics in a single pass
+    stats = assignment.submissions.aggregate(
+        total_submissions=Count('id'),
+        pending_count=Count('id', filter=Q(status=AssignmentSubmission.Status.PENDING)),
+        graded_count=Count('id', filter=Q(status=AssignmentSubmission.Status.GRADED)),
+    )
+
+    # Grading queue: pending first, oldest first
+    submissions = assignment.submissions.select_related('student')
+
+    status = request.GET.get('status', '')
+    if status in AssignmentSubmission.Status.values:
+        submissions = submissions.filter(status=status)
+        ordering = ['submitted_at', 'id']
+    else:
+        status = ''
+        submissions = submissions.annotate(
+            queue_priority=Case(
+                When(status=AssignmentSubmission.Status.PENDING, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        ordering = ['queue_priority', 'submitted_at', 'id']
 
-    # Get statistics
-    total_submissions = submissions.count()
-    pending_count = submissions.filter(status='PENDING').count()
-    graded_count = submissions.filter(status='GRADED').count()
+    search_query = request.GET.get('search', '')
+    if search_query:
+        submissions = submissions.filter(
+            Q(student__username__icontains=search_query) |
+            Q(student__first_name__icontains=search_query) |
+            Q(student__last_name__icontains=search_query) |
+            Q(student__email__icontains=search_query)
+        )
+
+    cursor = request.GET.get('after')
+    submissions, next_cursor = keyset_paginate(submissions, ordering, cursor)
 
     context = {
         'assignment': assignment,
         'submissions': submissions,
-        'total_submissions': total_submissions,
-        'pending_count': pending_count,
-        'graded_count': graded_count,
+        'status': status,
+        'status_choices': AssignmentSubmission.Status.choices,
+        'search_query': search_query,
+        'is_first_page': not cursor,
+        'next_cursor': next_cursor,
+        **stats,
     }
     return render(request, 'courses/assignment_submissions.html', context)
 
 
+@login_required
+def assignment_download_all(request, pk):
+    """Download every submission of an assignment as one ZIP (Instructor only)"""
+    assignment = get_object_or_404(
+        Assignment, pk=pk, lesson__course__instructor=request.user)
+    submissions = assignment.submissions.select_related('student').order_by(
+        'student__username'
+    ).iterator(chunk_size=200)
+
+    response = StreamingHttpResponse(
+        stream_submissions_zip(assignment, submissions),
+        content_type='application/zip'
+    )
+    filename = get_valid_filename(f'{assignment.title} submissions.zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def assignment_similarity(request, pk):
+    """Report likely-copied submission pairs (Instructor only)"""
+    assignment = get_object_or_404(
+        Assignment.objects.select_related('lesson__course'),
+        pk=pk, lesson__course__instructor=request.user)
+
+    try:
+        threshold = min(max(float(request.GET.get('threshold', DEFAULT_THRESHOLD)), 0.1), 1.0)
+    except ValueError:
+        threshold = DEFAULT_THRESHOLD
+
+    # Submissions are fingerprinted when they are saved; the report only reads
+    pairs = similar_pairs(assignment, threshold)
+
+    submission_ids = {submission_id for first, second, _ in pairs for submission_id in (first, second)}
+    submissions = assignment.submissions.select_related('student').in_bulk(submission_ids)
+
+    context = {
+        'assignment': assignment,
+        'pairs': [
+            {
+                'first': submissions[first],
+                'second': submissions[second],
+                'similarity': round(similarity * 100),
+            }
+            for first, second, similarity in pairs
+        ],
+        'threshold': threshold,
+        'indexed_count': assignment.fingerprints.count(),
+        'unindexed_count': assignment.submissions.filter(fingerprint__isnull=True).count(),
+    }
+    return render(request, 'courses/assignment_similarity.html', context)
+
+
+def _next_pending_submission(assignment, after=None):
+    """Oldest pending submission of an assignment, optionally after a given one"""
+    submissions = assignment.submissions.filter(
+        status=AssignmentSubmission.Status.PENDING
+    ).order_by('submitted_at', 'id')
+    if after is not None:
+        submissions = submissions.filter(
+            Q(submitted_at__gt=after.submitted_at) |
+            Q(submitted_at=after.submitted_at, id__gt=after.id)
+        )
+    return submissions.only('id').first()
+
+
+@login_required
+def assignment_grade_next(request, pk):
+    """Jump to the next ungraded submission (Instructor only)"""
+    assignment = get_object_or_404(
+        Assignment, pk=pk, lesson__course__instructor=request.user)
+
+    submission = _next_pending_submission(assignment)
+    if submission is None:
+        messages.info(request, 'All submissions have been graded.')
+        return redirect('courses:assignment_submissions', pk=assignment.id)
+
+    return redirect('courses:assignment_grade', pk=submission.id)
+
+
 @login_required
 def assignment_grade(request, pk):
     """Grade an assignment submission (Instructor only)"""
@@ -851,15 +1322,30 @@ def assignment_grade(request, pk):
             graded_submission = form.save(commit=False)
             graded_submission.graded_by = request.user
             graded_submission.graded_at = timezone.now()
-            graded_submission.save()
-
-            # Award points to student if graded
-            if graded_submission.status == 'GRADED' and graded_submission.grade:
-                points = int((graded_submission.grade / 100) *
-                             submission.assignment.max_points)
-                submission.student.add_points(points)
+            with transaction.atomic():
+                # Points are only awarded when the submission becomes graded,
+                # judged under a row lock so regrading or a concurrent grade
+                # does not pay the student again
+                previous_status = AssignmentSubmission.objects.select_for_update().values_list(
+                    'status', flat=True).get(pk=submission.pk)
+                graded_submission.save()
+                newly_graded = graded_submission.status == 'GRADED' and previous_status != 'GRADED'
+                if newly_graded and graded_submission.grade:
+                    submission.student.add_points(submission_points(graded_submission))
+            if newly_graded:
+                SUBMISSIONS_GRADED.inc(mode='single')
+                record_grading_turnaround([graded_submission])
 
             messages.success(request, f'Submission graded successfully!')
+
+            if 'grade_next' in request.POST:
+                next_submission = _next_pending_submission(submission.assignment, after=submission)
+                if next_submission is None:
+                    # Wrap around to pending submissions older than this one
+                    next_submission = _next_pending_submission(submission.assignment)
+                if next_submission is not None:
+                    return redirect('courses:assignment_grade', pk=next_submission.id)
+
             return redirect('courses:assignment_submissions', pk=submission.assignment.id)
         else:
             messages.error(request, 'Please correct the errors below.')
@@ -872,3 +1358,64 @@ def assignment_grade(request, pk):
         'assignment': submission.assignment,
     }
     return render(request, 'courses/assignment_grade.html', context)
+
+
+@login_required
+def assignment_grade_bulk(request, pk):
+    """Grade many submissions of an assignment at once (Instructor only)"""
+    assignment = get_object_or_404(
+        Assignment.objects.select_related('lesson__course'),
+        pk=pk, lesson__course__instructor=request.user)
+    submissions = assignment.submissions.select_related('student', 'assignment').annotate(
+        queue_priority=Case(
+            When(status=AssignmentSubmission.Status.PENDING, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    )
+    ordering = ['queue_priority', 'submitted_at', 'id']
+
+    formset = None
+    upload_form = GradeUploadForm()
+    row_errors = []
+    cursor = request.GET.get('after')
+    next_cursor = None
+
+    if request.method == 'POST' and 'upload' in request.POST:
+        upload_form = GradeUploadForm(request.POST, request.FILES)
+        if upload_form.is_valid():
+            graded, row_errors = parse_grade_csv(assignment, upload_form.cleaned_data['csv_file'])
+            if row_errors:
+                messages.error(request, 'No grades were saved. Fix the rows below and upload again.')
+            else:
+                apply_grades(graded, request.user)
+                messages.success(request, f'{len(graded)} submission(s) graded from CSV!')
+                return redirect('courses:assignment_submissions', pk=assignment.id)
+    elif request.method == 'POST':
+        # Bind to the posted rows only; the page may have shifted since it was rendered
+        formset = AssignmentGradeFormSet(
+            request.POST, queryset=submissions.filter(pk__in=posted_pks(request.POST)).order_by(*ordering))
+        if formset.is_valid():
+            graded = [form.instance for form in formset.forms
+                      if form.has_changed() and form.instance.pk is not None]
+            apply_grades(graded, request.user)
+            messages.success(request, f'{len(graded)} submission(s) graded successfully!')
+            return redirect('courses:assignment_submissions', pk=assignment.id)
+        else:
+            messages.error(request, 'Please correct the errors below.')
+
+    if formset is None:
+        # One page at a time keeps the POST under DATA_UPLOAD_MAX_NUMBER_FIELDS
+        page, next_cursor = keyset_paginate(submissions, ordering, cursor, BULK_GRADING_PAGE_SIZE)
+        formset = AssignmentGradeFormSet(
+            queryset=submissions.filter(pk__in=[row.pk for row in page]).order_by(*ordering))
+
+    context = {
+        'assignment': assignment,
+        'formset': formset,
+        'upload_form': upload_form,
+        'row_errors': row_errors,
+        'is_first_page': not cursor,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'courses/assignment_grade_bulk.html', context)
@@ -0,0 +1,328 @@
+"""
+Prometheus metrics shared by all worker processes (METRICS_DIR)
+
+Each process adds to the float values of its own memory-mapped file in
+METRICS_DIR, so updates never wait on another process; /metrics reads
+every file and sums the values. A value is stored next to its key
+(metric, type, help, sample name and labels), which lets the endpoint
+render metrics it has never seen registered. Each process removes the
+files of exited processes when it opens its own (as does the
+clean_metrics command), so the totals only cover live workers; Prometheus
+sees the drop as a counter reset.
+"""
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+INITIAL_FILE_SIZE = 64 * 1024
+
+# Seconds; suits request latencies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_HEADER = struct.Struct('i4x')
+_KEY_LENGTH = struct.Struct('i')
+_VALUE = struct.Struct('d')
+
+
+class MmapValues:
+    """
+    Float values of one process, keyed by string, in a growable mmap'd file
+
+    Layout: an 8-byte header holding the bytes used, then entries of a
+    4-byte key length, the UTF-8 key padded to 8-byte alignment and an
+    8-byte double. The header is written after each new entry, so readers
+    never see a partial one.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')
+        capacity = os.fstat(self.file.fileno()).st_size
+        if capacity == 0:
+            capacity = INITIAL_FILE_SIZE
+            self.file.truncate(capacity)
+        self.map = mmap.mmap(self.file.fileno(), capacity)
+        self.used = _HEADER.unpack_from(self.map, 0)[0] or _HEADER.size
+        self.positions = {key: position for key, _, position in _entries(self.map, self.used)}
+
+    def add(self, key, amount):
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = _VALUE.unpack_from(self.map, position)[0]
+            _VALUE.pack_into(self.map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(_KEY_LENGTH.size + len(encoded)) % 8)
+        size = _KEY_LENGTH.size + padded + _VALUE.size
+        if self.used + size > len(self.map):
+            capacity = len(self.map)
+            while self.used + size > capacity:
+                capacity *= 2
+            self.map.close()
+            self.file.truncate(capacity)
+            self.map = mmap.mmap(self.file.fileno(), capacity)
+
+        _KEY_LENGTH.pack_into(self.map, self.used, len(encoded))
+        self.map[self.used + _KEY_LENGTH.size:self.used + _KEY_LENGTH.size + len(encoded)] = encoded
+        position = self.used + _KEY_LENGTH.size + padded
+        _VALUE.pack_into(self.map, position, 0.0)
+        self.used += size
+        _HEADER.pack_into(self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+
+def _entries(data, used):
+    offset = _HEADER.size
+    while offset < used:
+        length = _KEY_LENGTH.unpack_from(data, offset)[0]
+        start = offset + _KEY_LENGTH.size
+        key = bytes(data[start:start + length]).decode()
+        position = start + length + (-(_KEY_LENGTH.size + length) % 8)
+        yield key, _VALUE.unpack_from(data, position)[0], position
+        offset = position + _VALUE.size
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running as another user
+        return True
+    return True
+
+
+def remove_dead_process_files():
+    """Delete the files of exited processes from METRICS_DIR; returns how many"""
+    removed = 0
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.db')):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if not name.isdigit() or _process_alive(int(name)):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Removed by another process
+            continue
+        removed += 1
+    return removed
+
+
+_values = None
+_values_pid = None
+_values_lock = threading.Lock()
+
+
+def process_values():
+    """This process's MmapValues, reopened after a fork"""
+    global _values, _values_pid
+    pid = os.getpid()
+    if _values_pid != pid:
+        with _values_lock:
+            if _values_pid != pid:
+                os.makedirs(settings.METRICS_DIR, exist_ok=True)
+                remove_dead_process_files()
+                _values = MmapValues(os.path.join(settings.METRICS_DIR, f'{pid}.db'))
+                _values_pid = pid
+    return _values
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.keys = {}
+
+    def key(self, sample, labels, extra=()):
+        cache_key = (sample, tuple(labels.get(name, '') for name in self.labelnames), extra)
+        key = self.keys.get(cache_key)
+        if key is None:
+            if set(labels) != set(self.labelnames):
+                raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+            sample_labels = [[name, str(labels[name])] for name in self.labelnames] + list(extra)
+            key = json.dumps([self.name, self.kind, self.documentation, sample, sample_labels])
+            self.keys[cache_key] = key
+        return key
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError('Counters only go up')
+        process_values().add(self.key(f'{self.name}_total', labels), amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.series = {}
+
+    def series_keys(self, values, labels):
+        """Bucket keys of a label set, all written to this process's file on first use"""
+        series_key = (os.getpid(), tuple(labels.get(name, '') for name in self.labelnames))
+        keys = self.series.get(series_key)
+        if keys is None:
+            keys = [
+                self.key(f'{self.name}_bucket', labels, (('le', _format_value(bound)),))
+                for bound in self.buckets
+            ]
+            for key in keys:
+                values.add(key, 0)
+            self.series[series_key] = keys
+        return keys
+
+    def observe(self, value, **labels):
+        values = process_values()
+        # Only the matching bucket is counted; the endpoint makes them cumulative
+        index = next(index for index, bound in enumerate(self.buckets) if value <= bound)
+        values.add(self.series_keys(values, labels)[index], 1)
+        values.add(self.key(f'{self.name}_sum', labels), value)
+        values.add(self.key(f'{self.name}_count', labels), 1)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return f'{value:.1f}'
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def collect():
+    """Values of every process summed per sample, grouped by metric"""
+    families = {}
+    samples = defaultdict(float)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.db')):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # The file of an exited process, just removed
+            continue
+        if len(data) < _HEADER.size:
+            continue
+        for key, value, _ in _entries(data, _HEADER.unpack_from(data, 0)[0]):
+            name, kind, documentation, sample, labels = json.loads(key)
+            families[name] = (kind, documentation)
+            samples[name, sample, tuple(map(tuple, labels))] += value
+
+    by_family = defaultdict(list)
+    for (name, sample, labels), value in samples.items():
+        by_family[name].append((sample, labels, value))
+    return families, by_family
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    families, by_family = collect()
+    lines = []
+    for name in sorted(families):
+        kind, documentation = families[name]
+        lines.append(f'# HELP {name} {_escape(documentation)}')
+        lines.append(f'# TYPE {name} {kind}')
+        rows = by_family[name]
+        if kind == 'histogram':
+            rows = _cumulative_buckets(name, rows)
+        for sample, labels, value in sorted(rows, key=_sort_key):
+            lines.append(f'{sample}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _cumulative_buckets(name, rows):
+    buckets = defaultdict(list)
+    other = []
+    for sample, labels, value in rows:
+        if sample == f'{name}_bucket':
+            series = tuple(label for label in labels if label[0] != 'le')
+            bound = float(dict(labels)['le'].replace('+Inf', 'inf'))
+            buckets[series].append((bound, labels, value))
+        else:
+            other.append((sample, labels, value))
+    for series in buckets.values():
+        total = 0
+        for bound, labels, value in sorted(series):
+            total += value
+            other.append((f'{name}_bucket', labels, total))
+    return other
+
+
+def _sort_key(row):
+    sample, labels, _ = row
+    plain = tuple(label for label in labels if label[0] != 'le')
+    le = dict(labels).get('le')
+    return sample, plain, float(le.replace('+Inf', 'inf')) if le else 0
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; needs 'Authorization: Bearer <METRICS_TOKEN>'
+
+    Without a METRICS_TOKEN the endpoint is only open while DEBUG is on:
+    behind a reverse proxy every request comes from an internal address,
+    so the client address cannot tell a scraper from the public.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        allowed = settings.DEBUG
+    else:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+VIEW_LATENCY = Histogram(
+    'eduvolve_view_duration_seconds',
+    'Time to produce a response, per view',
+    ['view', 'method', 'status'],
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        VIEW_LATENCY.observe(
+            time.perf_counter() - start,
+            view=match.view_name if match else '<unresolved>',
+            method=request.method,
+            status=f'{response.status_code // 100}xx',
+        )
+        return response
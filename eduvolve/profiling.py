@@ -0,0 +1,184 @@
+"""
+Per-request query and timing instrumentation (PROFILING_SAMPLE_RATE)
+
+A sampled request records every SQL query (count, time, call site), the
+time spent rendering templates and the wall time. The totals go out as a
+Server-Timing header and one structured log line per request; query
+shapes repeated PROFILING_N_PLUS_ONE_THRESHOLD times or more are
+reported as likely N+1s together with the template line or Python line
+that issued them. Requests that are not sampled only pay for one
+random() call.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('eduvolve.requests')
+
+_profile = ContextVar('request_profile', default=None)
+_request = ContextVar('request', default=None)
+
+# Collapse IN (%s, %s, ...) lists so batches of different sizes share a shape
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+_DJANGO_DIR = os.path.dirname(sys.modules['django'].__file__)
+# Skipped when looking for the call site, like Django itself
+_INSTRUMENTATION_DIR = os.path.dirname(__file__)
+
+
+def query_shape(sql):
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def current_view():
+    """Name of the view handling the current request, if any"""
+    match = getattr(_request.get(), 'resolver_match', None)
+    return match.view_name if match else ''
+
+
+def call_site():
+    """Template line, or else first project source line, that issued the current query"""
+    frame = sys._getframe(2)
+    python_site = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name or origin.name}:{token.lineno}'
+        elif python_site is None and not code.co_filename.startswith(
+                (_DJANGO_DIR, _INSTRUMENTATION_DIR, sys.prefix)):
+            python_site = f'{os.path.relpath(code.co_filename, settings.BASE_DIR)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return python_site or 'unknown'
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.shapes = defaultdict(lambda: {'count': 0, 'time': 0.0, 'sites': set()})
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            shape = self.shapes[query_shape(sql)]
+            shape['count'] += 1
+            shape['time'] += elapsed
+            shape['sites'].add(call_site())
+
+    def n_plus_one(self):
+        threshold = settings.PROFILING_N_PLUS_ONE_THRESHOLD
+        return sorted(
+            (
+                {
+                    'sql': sql[:300],
+                    'count': shape['count'],
+                    'ms': round(shape['time'] * 1000, 2),
+                    'sites': sorted(shape['sites']),
+                }
+                for sql, shape in self.shapes.items()
+                if shape['count'] >= threshold
+            ),
+            key=lambda item: item['count'],
+            reverse=True,
+        )
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request.set(request)
+        try:
+            if random.random() >= settings.PROFILING_SAMPLE_RATE:
+                return self.get_response(request)
+            return self.profile(request)
+        finally:
+            _request.reset(token)
+
+    def profile(self, request):
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _profile.reset(token)
+
+        total = time.perf_counter() - profile.started
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries"',
+            f'tpl;dur={profile.template_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+        n_plus_one = profile.n_plus_one()
+        match = request.resolver_match
+        logger.log(
+            logging.WARNING if n_plus_one else logging.INFO,
+            json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'queries': profile.queries,
+                'db_ms': round(profile.db_time * 1000, 2),
+                'template_ms': round(profile.template_time * 1000, 2),
+                'total_ms': round(total * 1000, 2),
+                'n_plus_one': n_plus_one,
+            }),
+        )
+        return response
+
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        profile = _profile.get()
+        if profile is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            profile.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds render time to the request profile"""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
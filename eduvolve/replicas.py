@@ -0,0 +1,106 @@
+"""
+Read replicas for reporting views (REPLICA_DATABASE_URLS)
+
+Only code wrapped in read_from_replica() reads from a replica; everything
+else keeps using the primary. A request that writes, and every request
+from the same browser for REPLICA_PIN_SECONDS afterwards, reads from the
+primary as well, so users always see their own changes despite
+replication lag. Values computed for the cache are read inside
+read_from_primary(), since the cache would keep a lagging copy long after
+the replica caught up.
+"""
+import random
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PIN_COOKIE = 'db_pinned_until'
+
+_use_replica = ContextVar('use_replica', default=False)
+_pinned = ContextVar('pinned', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+class read_from_replica(ContextDecorator):
+    """Send reads inside this block (or decorated view) to a replica"""
+
+    def __enter__(self):
+        self.token = _use_replica.set(True)
+        return self
+
+    def __exit__(self, *exc_info):
+        _use_replica.reset(self.token)
+        return False
+
+
+class read_from_primary(ContextDecorator):
+    """Send reads inside this block to the primary, even within read_from_replica()"""
+
+    def __enter__(self):
+        self.token = _pinned.set(True)
+        return self
+
+    def __exit__(self, *exc_info):
+        _pinned.reset(self.token)
+        return False
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = replica_aliases()
+
+    def db_for_read(self, model, **hints):
+        # _wrote is checked apart from _pinned: leaving read_from_primary()
+        # restores the pin it found, but must not undo a write made inside
+        if self.replicas and _use_replica.get() and not _pinned.get() and not _wrote.get():
+            return random.choice(self.replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaPinningMiddleware:
+    """Keep a browser on the primary for a while after it writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        pinned = request.method not in ('GET', 'HEAD', 'OPTIONS') or pinned_until > time.time()
+
+        pinned_token = _pinned.set(pinned)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                response.set_cookie(
+                    PIN_COOKIE,
+                    str(int(time.time()) + settings.REPLICA_PIN_SECONDS),
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
+        return response
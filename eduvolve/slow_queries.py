@@ -0,0 +1,122 @@
+"""
+Slow-query log (SLOW_QUERY_THRESHOLD_MS)
+
+Every connection times its queries; one over the threshold is handed,
+with its parameters, view and call site, to a background thread that
+runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) on a connection of its own
+and stores the result as a courses.SlowQuery row. Only the latest
+SLOW_QUERY_LOG_SIZE rows are kept, and entries are dropped rather than
+queued without bound when the thread falls behind.
+"""
+import logging
+import queue
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .profiling import call_site, current_view
+
+logger = logging.getLogger('eduvolve.slow_queries')
+
+# Slow queries waiting for their plan; more are dropped
+QUEUE_SIZE = 100
+
+# Statements whose plan is worth capturing; EXPLAIN without ANALYZE never runs them
+_EXPLAINABLE = re.compile(r'\s*(SELECT|WITH|UPDATE|DELETE)\b', re.IGNORECASE)
+
+_pending = queue.Queue(maxsize=QUEUE_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+_capturing = ContextVar('capturing_slow_query', default=False)
+
+
+def explain(alias, sql, params):
+    """Plan of a query as text, run on the calling thread's connection to alias"""
+    if not _EXPLAINABLE.match(sql):
+        return ''
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail): indent each step under its parent
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+
+def store(entry):
+    SlowQuery = apps.get_model('courses', 'SlowQuery')
+    try:
+        entry['plan'] = explain(entry['database'], entry['sql'], entry.pop('raw_params'))
+    except DatabaseError as exc:
+        entry['plan'] = f'EXPLAIN failed: {exc}'
+    slow_query = SlowQuery.objects.create(**entry)
+    SlowQuery.objects.filter(pk__lte=slow_query.pk - settings.SLOW_QUERY_LOG_SIZE).delete()
+
+
+def _drain():
+    _capturing.set(True)
+    while True:
+        entry = _pending.get()
+        try:
+            store(entry)
+        except Exception:
+            logger.exception('Could not store slow query')
+        finally:
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+
+
+def _start_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, name='slow-query-log', daemon=True)
+            _worker.start()
+
+
+def record_slow_queries(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook installed on every connection"""
+    if _capturing.get():
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS and not many:
+            entry = {
+                'sql': sql,
+                'params': repr(params)[:2000],
+                'raw_params': params,
+                'duration_ms': round(duration_ms, 2),
+                'database': context['connection'].alias,
+                'view': current_view(),
+                'call_site': call_site()[:300],
+            }
+            logger.warning('Slow query (%.0f ms) at %s: %s', duration_ms, entry['call_site'], sql[:500])
+            try:
+                _pending.put_nowait(entry)
+            except queue.Full:
+                pass
+            else:
+                _start_worker()
+
+
+@receiver(connection_created)
+def install_slow_query_log(sender, connection, **kwargs):
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0 and record_slow_queries not in connection.execute_wrappers:
+        # First in the list, since execute_wrapper() blocks pop the last one on exit
+        connection.execute_wrappers.insert(0, record_slow_queries)
@@ -0,0 +1,25 @@
+"""
+Opt-in SQLite tuning for small deployments (SQLITE_PERFORMANCE_MODE)
+
+WAL lets readers run alongside the single writer, and busy_timeout makes a
+blocked writer wait for the lock instead of failing with "database is
+locked". Write transactions are started with BEGIN IMMEDIATE (see
+settings.py) so they take the write lock up front: a deferred transaction
+that reads first and writes later cannot wait out a busy lock and fails
+immediately.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(connection):
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_PERFORMANCE_MODE:
+        apply_pragmas(connection)
@@ -0,0 +1,75 @@
+"""Helpers shared by the test suites of every app"""
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the tests with profiling off (tests of it turn it on with
+    override_settings()) and metrics written to a temporary METRICS_DIR
+    rather than the one a development server reads
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._saved_settings = {name: getattr(settings, name) for name in ('PROFILING_SAMPLE_RATE', 'METRICS_DIR')}
+        self._metrics_dir = tempfile.TemporaryDirectory()
+        settings.PROFILING_SAMPLE_RATE = 0
+        settings.METRICS_DIR = self._metrics_dir.name
+
+    def teardown_test_environment(self, **kwargs):
+        for name, value in self._saved_settings.items():
+            setattr(settings, name, value)
+        self._metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
+
+
+def seed_small_scale(**options):
+    """A seed_scale data set small enough for the test database"""
+    defaults = dict(students=40, instructors=3, courses=6, lessons=4, quiz_every=2, questions=3, enrollments=2)
+    call_command('seed_scale', **{**defaults, **options}, stdout=StringIO())
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Asserts on SQLite EXPLAIN QUERY PLAN output')
+class QueryPlanTestCase(TestCase):
+    """Checks that hot queries search an index rather than scan a table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_small_scale()
+
+    def assertUsesIndex(self, queryset, index=None, ordered=False):
+        plan = queryset.explain()
+        table = queryset.model._meta.db_table
+        self.assertIsNone(re.search(rf'SCAN {table}(?! USING)', plan), plan)
+        self.assertIn('INDEX', plan)
+        if index:
+            self.assertIn(index, plan)
+        if ordered:
+            # The index already returns rows in the requested order
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TemporaryMediaMixin:
+    """Stores uploaded and partial files in a temporary directory removed after each test"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        media = override_settings(
+            MEDIA_ROOT=os.path.join(directory, 'media'),
+            CHUNKED_UPLOAD_ROOT=os.path.join(directory, 'chunked_uploads'),
+        )
+        media.enable()
+        self.addCleanup(media.disable)
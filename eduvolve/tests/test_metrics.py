@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings as django_settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from eduvolve import metrics
+from eduvolve.metrics import INITIAL_FILE_SIZE, Counter, Histogram, MmapValues, render_metrics
+
+
+class MetricsDirMixin:
+    """A fresh METRICS_DIR, and a fresh file for this process, per test"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(METRICS_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Histograms remember which series this process's file already holds
+        for patch in (mock.patch.object(metrics, '_values_pid', None),
+                      mock.patch.object(metrics.VIEW_LATENCY, 'series', {})):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+
+class MmapValuesTests(MetricsDirMixin, SimpleTestCase):
+    def test_values_survive_reopening(self):
+        path = os.path.join(self.directory, 'values.db')
+        values = MmapValues(path)
+        values.add('a', 1.5)
+        values.add('a', 1)
+        values.add('b', 2)
+        reopened = MmapValues(path)
+        self.assertEqual((_value(reopened, 'a'), _value(reopened, 'b')), (2.5, 2))
+
+    def test_file_grows(self):
+        values = MmapValues(os.path.join(self.directory, 'values.db'))
+        for number in range(INITIAL_FILE_SIZE // 16):
+            values.add(f'key-{number}', number)
+        self.assertGreater(len(values.map), INITIAL_FILE_SIZE)
+        self.assertEqual(_value(values, 'key-0'), 0)
+        self.assertEqual(_value(values, f'key-{INITIAL_FILE_SIZE // 16 - 1}'), INITIAL_FILE_SIZE // 16 - 1)
+
+
+def _value(values, key):
+    return metrics._VALUE.unpack_from(values.map, values.positions[key])[0]
+
+
+class RenderTests(MetricsDirMixin, SimpleTestCase):
+    def test_counter(self):
+        counter = Counter('test_events', 'Events seen', ['kind'])
+        counter.inc(kind='a')
+        counter.inc(2, kind='a')
+        counter.inc(kind='b "quoted"')
+        output = render_metrics()
+        self.assertIn('# HELP test_events Events seen\n# TYPE test_events counter\n', output)
+        self.assertIn('test_events_total{kind="a"} 3.0\n', output)
+        self.assertIn('test_events_total{kind="b \\"quoted\\""} 1.0\n', output)
+
+    def test_counter_rejects_decrements_and_unknown_labels(self):
+        counter = Counter('test_events', 'Events seen', ['kind'])
+        with self.assertRaises(ValueError):
+            counter.inc(-1, kind='a')
+        with self.assertRaises(ValueError):
+            counter.inc(other='a')
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('test_seconds', 'Durations', buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+        output = render_metrics()
+        self.assertIn('test_seconds_bucket{le="0.1"} 1.0\n'
+                      'test_seconds_bucket{le="1.0"} 2.0\n'
+                      'test_seconds_bucket{le="+Inf"} 3.0\n', output)
+        self.assertIn('test_seconds_count 3.0\n', output)
+        self.assertIn('test_seconds_sum 5.55\n', output)
+
+    def test_processes_are_summed(self):
+        counter = Counter('test_events', 'Events seen')
+        counter.inc()
+        # Another worker's file, with a metric this process never registered
+        other = MmapValues(os.path.join(self.directory, 'other.db'))
+        other.add(counter.key('test_events_total', {}), 4)
+        other.add(Counter('test_other', 'Only elsewhere').key('test_other_total', {}), 1)
+        output = render_metrics()
+        self.assertIn('test_events_total 5.0\n', output)
+        self.assertIn('test_other_total 1.0\n', output)
+
+
+class CleanupTests(MetricsDirMixin, SimpleTestCase):
+    def exited_pid(self):
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        return process.pid
+
+    def test_files_of_exited_processes_are_removed(self):
+        dead = MmapValues(os.path.join(self.directory, f'{self.exited_pid()}.db'))
+        dead.add('key', 1)
+        live = os.path.join(self.directory, f'{os.getpid()}.db')
+        MmapValues(live)
+        call_command('clean_metrics', stdout=StringIO())
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(live)])
+
+    def test_starting_process_removes_them(self):
+        MmapValues(os.path.join(self.directory, f'{self.exited_pid()}.db')).add('key', 1)
+        Counter('test_events', 'Events seen').inc()
+        self.assertEqual(os.listdir(self.directory), [f'{os.getpid()}.db'])
+
+class TestRunnerTests(SimpleTestCase):
+    def test_metrics_are_kept_out_of_the_configured_dir(self):
+        self.assertNotEqual(django_settings.METRICS_DIR, str(django_settings.BASE_DIR / 'metrics'))
+
+
+class MetricsViewTests(MetricsDirMixin, SimpleTestCase):
+    url = reverse('metrics')
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_open_without_a_token_in_debug(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requests_are_timed(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertIn('eduvolve_view_duration_seconds_count{view="metrics",method="GET",status="4xx"} 1.0',
+                      response.content.decode())
@@ -0,0 +1,162 @@
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from accounts.models import User
+from courses.analytics import course_stats
+from courses.dashboards import instructor_summary, platform_stats
+from courses.tests.factories import make_lesson, make_user
+from eduvolve import replicas
+from eduvolve.replicas import (
+    PIN_COOKIE, ReplicaPinningMiddleware, ReplicaRouter, read_from_primary, read_from_replica,
+)
+
+
+class UnpinnedMixin:
+    """Start each test unpinned; writes of earlier tests pin the thread, as they would a command"""
+
+    def setUp(self):
+        super().setUp()
+        pinned_token = replicas._pinned.set(False)
+        wrote_token = replicas._wrote.set(False)
+        self.addCleanup(replicas._pinned.reset, pinned_token)
+        self.addCleanup(replicas._wrote.reset, wrote_token)
+
+
+class ReplicaRouterTests(UnpinnedMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.router = ReplicaRouter()
+        self.router.replicas = ['replica_1']
+
+    def test_reads_use_the_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_reads_inside_read_from_replica(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'replica_1')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_read_from_primary_wins_over_read_from_replica(self):
+        with read_from_replica(), read_from_primary():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        with read_from_primary(), read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_writes_pin_later_reads(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_writes_inside_read_from_primary_stay_pinned(self):
+        with read_from_replica():
+            with read_from_primary():
+                self.router.db_for_write(User)
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_without_replicas(self):
+        self.router.replicas = []
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+
+@override_settings(REPLICA_PIN_SECONDS=10)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        self.router.replicas = ['replica_1']
+
+    def respond(self, request, write=False):
+        reads = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(User)
+            with read_from_replica():
+                reads.append(self.router.db_for_read(User))
+            return HttpResponse()
+
+        return ReplicaPinningMiddleware(view)(request), reads
+
+    def test_get_reads_from_the_replica(self):
+        response, reads = self.respond(self.factory.get('/'))
+        self.assertEqual(reads, ['replica_1'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_post_reads_from_the_primary(self):
+        _, reads = self.respond(self.factory.post('/'))
+        self.assertEqual(reads, ['default'])
+
+    def test_write_sets_the_pin_cookie(self):
+        response, _ = self.respond(self.factory.get('/'), write=True)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+
+    def test_pinned_browser_reads_from_the_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = str(time.time() + 5)
+        _, reads = self.respond(request)
+        self.assertEqual(reads, ['default'])
+
+    def test_expired_or_invalid_pin_is_ignored(self):
+        for value in (str(time.time() - 5), 'garbage'):
+            request = self.factory.get('/')
+            request.COOKIES[PIN_COOKIE] = value
+            self.assertEqual(self.respond(request)[1], ['replica_1'])
+
+
+@contextmanager
+def replica_reads():
+    """Models the installed router would read from a replica; the reads still run on default"""
+    replica_router = next(r for r in router.routers if isinstance(r, ReplicaRouter))
+    db_for_read = replica_router.db_for_read
+    models = []
+
+    def spy(model, **hints):
+        if db_for_read(model, **hints) != 'default':
+            models.append(model)
+        return 'default'
+
+    with mock.patch.object(replica_router, 'replicas', ['replica_1']), \
+            mock.patch.object(replica_router, 'db_for_read', spy):
+        yield models
+
+
+class CachedValuesTests(UnpinnedMixin, TestCase):
+    """Values stored in the cache are read from the primary, never a lagging replica"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = make_user('teacher', User.Role.INSTRUCTOR)
+        cls.course = make_lesson(cls.instructor).course
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_instructor_summary(self):
+        with replica_reads() as models, read_from_replica():
+            instructor_summary(self.instructor)
+        self.assertEqual(models, [])
+
+    def test_platform_stats(self):
+        with replica_reads() as models, read_from_replica():
+            platform_stats()
+        self.assertEqual(models, [])
+
+    def test_course_stats(self):
+        with replica_reads() as models, read_from_replica():
+            course_stats(self.course)
+            cache.clear()
+            course_stats(self.course)
+        self.assertEqual(models, [])
+
+    def test_uncached_reads_still_use_the_replica(self):
+        with replica_reads() as models, read_from_replica():
+            list(User.objects.all())
+        self.assertEqual(models, [User])
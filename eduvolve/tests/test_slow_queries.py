@@ -0,0 +1,84 @@
+import queue
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from courses.models import SlowQuery
+from eduvolve import slow_queries
+from eduvolve.slow_queries import explain, record_slow_queries, store
+
+
+class ExplainTests(TestCase):
+    def test_sqlite_plan_is_indented_by_step(self):
+        sql = 'SELECT * FROM accounts_user WHERE id IN (SELECT student_id FROM courses_enrollment)'
+        plan = explain('default', sql, [])
+        self.assertIn('accounts_user', plan)
+        self.assertTrue(any(line.startswith('  ') for line in plan.splitlines()))
+
+    def test_only_reads_updates_and_deletes_are_explained(self):
+        self.assertEqual(explain('default', 'INSERT INTO courses_slowquery (sql) VALUES (%s)', ['x']), '')
+
+
+class StoreTests(TestCase):
+    def entry(self, sql='SELECT id FROM accounts_user WHERE username = %s'):
+        return {
+            'sql': sql, 'params': "('ada',)", 'raw_params': ('ada',), 'duration_ms': 250.0,
+            'database': 'default', 'view': 'accounts:leaderboard', 'call_site': 'accounts/views.py:1',
+        }
+
+    def test_stores_the_query_with_its_plan(self):
+        store(self.entry())
+        slow_query = SlowQuery.objects.get()
+        self.assertEqual(slow_query.view, 'accounts:leaderboard')
+        self.assertIn('accounts_user', slow_query.plan)
+
+    def test_failed_explain_is_recorded(self):
+        store(self.entry('SELECT * FROM missing_table'))
+        self.assertTrue(SlowQuery.objects.get().plan.startswith('EXPLAIN failed:'))
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=2)
+    def test_keeps_the_latest_entries(self):
+        for _ in range(4):
+            store(self.entry())
+        self.assertEqual(SlowQuery.objects.count(), 2)
+
+
+class RecordSlowQueriesTests(TestCase):
+    def setUp(self):
+        self.pending = queue.Queue(maxsize=1)
+        patches = [
+            mock.patch.object(slow_queries, '_pending', self.pending),
+            mock.patch.object(slow_queries, '_start_worker'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def run_query(self, sql='SELECT 1'):
+        return record_slow_queries(lambda *args: 'result', sql, (), False, {'connection': connection})
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=1000)
+    def test_fast_queries_are_ignored(self):
+        with self.assertNoLogs('eduvolve.slow_queries'):
+            self.assertEqual(self.run_query(), 'result')
+        self.assertTrue(self.pending.empty())
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+    def test_slow_query_is_queued_for_its_plan(self):
+        with self.assertLogs('eduvolve.slow_queries', 'WARNING'):
+            self.run_query()
+        entry = self.pending.get_nowait()
+        self.assertEqual((entry['sql'], entry['database']), ('SELECT 1', 'default'))
+        slow_queries._start_worker.assert_called_once()
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+    def test_full_queue_drops_entries(self):
+        with self.assertLogs('eduvolve.slow_queries', 'WARNING'):
+            self.run_query()
+            self.run_query('SELECT 2')
+        self.assertEqual(self.pending.get_nowait()['sql'], 'SELECT 1')
+        self.assertTrue(self.pending.empty())
+
+    def test_installed_on_connections(self):
+        self.assertIn(record_slow_queries, connection.execute_wrappers)
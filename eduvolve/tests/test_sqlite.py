@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import override_settings
+
+ALIAS = 'sqlite_test'
+
+
+@contextmanager
+def scratch_database(**options):
+    """A connection to an empty SQLite file, removed afterwards"""
+    with tempfile.TemporaryDirectory() as directory:
+        connections.settings[ALIAS] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(directory, 'scratch.sqlite3'),
+            'OPTIONS': options,
+            'TEST': {},
+        }
+        try:
+            yield connections[ALIAS]
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class SqlitePerformanceModeTests(unittest.TestCase):
+    # Scratch connections are opened outside the test database, which
+    # Django's test cases forbid
+
+    @override_settings(SQLITE_PERFORMANCE_MODE=True)
+    def test_pragmas_are_applied_to_new_connections(self):
+        with scratch_database() as connection:
+            self.assertEqual(pragma(connection, 'journal_mode'), 'wal')
+            self.assertEqual(pragma(connection, 'busy_timeout'), 5000)
+            # NORMAL
+            self.assertEqual(pragma(connection, 'synchronous'), 1)
+
+    @override_settings(SQLITE_PERFORMANCE_MODE=False)
+    def test_off_by_default(self):
+        with scratch_database() as connection:
+            self.assertEqual(pragma(connection, 'journal_mode'), 'delete')
+
+    @override_settings(SQLITE_PERFORMANCE_MODE=True)
+    def test_immediate_transactions_take_the_write_lock_up_front(self):
+        with scratch_database(transaction_mode='IMMEDIATE') as connection:
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE TABLE counter (value INTEGER)')
+            other = sqlite3.connect(connection.settings_dict['NAME'], timeout=0)
+            self.addCleanup(other.close)
+            with transaction.atomic(using=ALIAS):
+                # Only read so far, yet another writer is already locked out
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) FROM counter')
+                with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+                    other.execute('INSERT INTO counter VALUES (1)')
+
+    # Lock waits would be logged as slow queries of a database that is gone
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_stress_command(self):
+        out = StringIO()
+        call_command('stress_sqlite', writers=1, readers=1, seconds=0.2, stdout=out)
+        self.assertIn('performance:', out.getvalue())